@@ -14,6 +14,51 @@ LOCAL_BOT_API_REMOTE_DIR = os.getenv("LOCAL_BOT_API_REMOTE_DIR", "").strip()
 LOCAL_BOT_API_DATA_DIR = os.getenv("LOCAL_BOT_API_DATA_DIR")
 # Каталог для локального кеша загруженных файлов (используется для сжатия видео и резервных копий)
 LOCAL_BOT_API_CACHE_DIR = os.getenv("LOCAL_BOT_API_CACHE_DIR", "").strip()
+# Параметры загрузки больших файлов с Bot API (параллельные диапазоны и докачка)
+DOWNLOAD_PARALLEL_CONNECTIONS = int(os.getenv("DOWNLOAD_PARALLEL_CONNECTIONS", "4"))
+DOWNLOAD_SEGMENT_SIZE_MB = int(os.getenv("DOWNLOAD_SEGMENT_SIZE_MB", "64"))
+DOWNLOAD_BUFFER_SIZE_KB = int(os.getenv("DOWNLOAD_BUFFER_SIZE_KB", "4096"))
+DOWNLOAD_MAX_RETRIES = int(os.getenv("DOWNLOAD_MAX_RETRIES", "5"))
+# Бюджет локального кеша: LRU-вытеснение по объёму и возрасту файлов
+CACHE_MAX_SIZE_MB = int(os.getenv("CACHE_MAX_SIZE_MB", "10240"))
+CACHE_MAX_AGE_HOURS = int(os.getenv("CACHE_MAX_AGE_HOURS", "72"))
+CACHE_SWEEP_INTERVAL_SECONDS = int(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "600"))
+# Пул сжатия видео: 0 воркеров — по числу ядер, делённому на потоки одного кодирования
+TRANSCODE_WORKERS = int(os.getenv("TRANSCODE_WORKERS", "0"))
+TRANSCODE_THREADS_PER_ENCODE = int(os.getenv("TRANSCODE_THREADS_PER_ENCODE", "4"))
+# Каталог файлов-слотов: лимит TRANSCODE_WORKERS общий для всех процессов,
+# использующих один каталог (по умолчанию — во временном каталоге системы)
+TRANSCODE_SLOT_DIR = os.getenv("TRANSCODE_SLOT_DIR", "").strip()
+# Допустимый перерасход размера, при котором H.264/yuv420p только переупаковывается
+VIDEO_REMUX_TOLERANCE_PERCENT = int(os.getenv("VIDEO_REMUX_TOLERANCE_PERCENT", "10"))
+# Длительность превью-ролика рядом с видео (0 — только постер)
+VIDEO_PREVIEW_SECONDS = int(os.getenv("VIDEO_PREVIEW_SECONDS", "10"))
+# Длина сегмента HLS для потокового просмотра видео (0 — HLS не создаётся)
+VIDEO_HLS_SEGMENT_SECONDS = int(os.getenv("VIDEO_HLS_SEGMENT_SECONDS", "0"))
+# Хранилище состояний FSM: postgres (по умолчанию) или redis/совместимый сервер
+FSM_STORAGE = os.getenv("FSM_STORAGE", "postgres").strip().lower()
+FSM_REDIS_URL = os.getenv("FSM_REDIS_URL", "redis://localhost:6379/0").strip()
+FSM_STATE_TTL_HOURS = int(os.getenv("FSM_STATE_TTL_HOURS", "72"))
+FSM_SWEEP_INTERVAL_SECONDS = int(os.getenv("FSM_SWEEP_INTERVAL_SECONDS", "600"))
+# Запросы к PostgreSQL дольше порога пишутся в журнал как медленные (0 — не писать)
+DB_SLOW_QUERY_MS = int(os.getenv("DB_SLOW_QUERY_MS", "500"))
+# Блокировка event loop дольше порога пишется в журнал со стеком (0 — не следить)
+LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "200"))
+# Если задан, /metrics отдаёт метрики только с заголовком "Authorization: Bearer <токен>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+# Апдейты вебхука обрабатываются в фоне: не более WEBHOOK_WORKERS одновременно,
+# при WEBHOOK_QUEUE_LIMIT принятых апдейтах вебхук отвечает 503
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "32"))
+WEBHOOK_QUEUE_LIMIT = int(os.getenv("WEBHOOK_QUEUE_LIMIT", "1000"))
+# Сколько при остановке ждать обработчики принятых апдейтов (сжатие видео
+# идёт минутами); не успевшие к сроку отменяются
+WEBHOOK_DRAIN_TIMEOUT_SECONDS = int(os.getenv("WEBHOOK_DRAIN_TIMEOUT_SECONDS", "900"))
+# Больше одного — PROD запускает фронт и столько рабочих процессов с шардированием
+# чатов по chat_id; процессы слушают 127.0.0.1 с порта BOT_WORKER_BASE_PORT
+BOT_WORKER_PROCESSES = int(os.getenv("BOT_WORKER_PROCESSES", "1"))
+BOT_WORKER_BASE_PORT = int(os.getenv("BOT_WORKER_BASE_PORT", "8100"))
+# Как часто процесс пытается стать лидером одиночных фоновых задач (advisory lock)
+LEADER_RETRY_SECONDS = int(os.getenv("LEADER_RETRY_SECONDS", "5"))
 NGROK_PUBLIC_URL = os.getenv("NGROK_PUBLIC_URL", "").strip()
 WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook").strip()
 PUBLIC_MEDIA_ROOT = os.getenv("PUBLIC_MEDIA_ROOT", "").strip()
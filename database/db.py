@@ -1,10 +1,14 @@
 import asyncpg
 from datetime import datetime
 import json
+import logging
 from config import DB_CONFIG
 import re
 
+from utils.cache_bus import cache_bus
 from utils.logger import get_logger
+from utils.metrics import record_query
+from utils.query_stats import query_stats
 
 logger = get_logger(__name__)
 
@@ -44,16 +48,25 @@ def get_my_appeals_menu(appeals, page, total_appeals):
         keyboard.append(nav_buttons)
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
     logger.debug(
-        f"Создана клавиатура для 'Мои заявки' с {len(appeals)} заявками на странице {page}"
+        "Создана клавиатура для 'Мои заявки' с %s заявками на странице %s",
+        len(appeals),
+        page,
     )
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
+async def _init_connection(conn):
+    # Время каждого запроса уходит в метрики и статистику медленных запросов;
+    # колбэки вызываются после ответа сервера и не задерживают сам запрос
+    conn.add_query_logger(record_query)
+    conn.add_query_logger(query_stats.record)
+
+
 async def initialize_db():
     global pool
     try:
-        logger.debug(f"Connecting to PostgreSQL with config: {DB_CONFIG}")
-        pool = await asyncpg.create_pool(**DB_CONFIG)
+        logger.debug("Connecting to PostgreSQL with config: %s", DB_CONFIG)
+        pool = await asyncpg.create_pool(**DB_CONFIG, init=_init_connection)
         if pool is None:
             logger.error("Failed to create database pool: pool is None")
             raise RuntimeError("Failed to create database pool: pool is None")
@@ -62,10 +75,11 @@ async def initialize_db():
             await conn.execute("SELECT 1")
         logger.debug("Test query executed successfully")
         await create_tables()
+        cache_bus.start()
         logger.info("Подключение к базе данных PostgreSQL установлено")
         return pool
     except Exception as e:
-        logger.error(f"Ошибка подключения к базе данных PostgreSQL: {e}")
+        logger.error("Ошибка подключения к базе данных PostgreSQL: %s", e)
         raise
 
 
@@ -217,6 +231,9 @@ async def create_tables():
         await conn.execute(
             "ALTER TABLE manuals_files ADD COLUMN IF NOT EXISTS file_type TEXT NOT NULL DEFAULT 'document'"
         )
+        await conn.execute(
+            "ALTER TABLE manuals_files ADD COLUMN IF NOT EXISTS telegram_file_id TEXT"
+        )
         await conn.execute(
             """
             CREATE TABLE IF NOT EXISTS visits (
@@ -247,6 +264,55 @@ async def create_tables():
         await conn.execute(
             "ALTER TABLE manuals ADD COLUMN IF NOT EXISTS file_name TEXT"
         )
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fsm_storage (
+                storage_key TEXT PRIMARY KEY,
+                state TEXT,
+                data JSONB NOT NULL DEFAULT '{}'::jsonb,
+                ttl_seconds INTEGER,
+                expires_at TIMESTAMPTZ,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            )
+            """
+        )
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS fsm_storage_expires_at_idx ON fsm_storage (expires_at)"
+        )
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS appeals_serial_history_idx
+            ON appeals (serial, (COALESCE(created_time, '')), appeal_id)
+            """
+        )
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media_file_cache (
+                media_key TEXT PRIMARY KEY,
+                telegram_file_id TEXT NOT NULL,
+                mtime_ns BIGINT NOT NULL,
+                size BIGINT NOT NULL,
+                sha256 TEXT NOT NULL,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            )
+            """
+        )
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcode_cache (
+                file_unique_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                source_size BIGINT,
+                output_size BIGINT NOT NULL,
+                encode_seconds DOUBLE PRECISION,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                last_used_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (file_unique_id, params)
+            )
+            """
+        )
     logger.info("Таблицы базы данных созданы или проверены")
 
 
@@ -275,7 +341,9 @@ async def add_exam_record(
     async with pool.acquire() as conn:
         normalized = normalize_personal_number(personal_number)
         logger.debug(
-            f"Сохраняемый личный номер: {personal_number}, нормализованный: {normalized}"
+            "Сохраняемый личный номер: %s, нормализованный: %s",
+            personal_number,
+            normalized,
         )
         if application_date is None:
             application_date = datetime.now().strftime("%Y-%m-%dT%H:%M")
@@ -302,7 +370,7 @@ async def add_exam_record(
             user_id,
         )
         logger.info(
-            f"Экзамен №{exam_id} добавлен для {fio} с УТЦ ID {training_center_id}"
+            "Экзамен №%s добавлен для %s с УТЦ ID %s", exam_id, fio, training_center_id
         )
         return exam_id
 
@@ -333,10 +401,18 @@ async def update_exam_record(
                 exam_id,
             )
             logger.debug(
-                f"Обновление записи экзамена ID {exam_id}: video_link={video_link}, photo_links={photo_links}, accepted_date={accepted_date}, result={result}"
+                "Обновление записи экзамена ID %s: video_link=%s, photo_links=%s, accepted_date=%s, result=%s",
+                exam_id,
+                video_link,
+                photo_links,
+                accepted_date,
+                result,
             )
         logger.info(
-            f"Запись экзамена ID {exam_id} обновлена с видео {video_link} и фото {photo_links}"
+            "Запись экзамена ID %s обновлена с видео %s и фото %s",
+            exam_id,
+            video_link,
+            photo_links,
         )
 
 
@@ -348,7 +424,7 @@ async def get_exam_records():
             LEFT JOIN training_centers tc ON er.training_center_id = tc.id 
             ORDER BY er.exam_id DESC
         """)
-        logger.info(f"Запрошены записи экзаменов, найдено: {len(records)}")
+        logger.info("Запрошены записи экзаменов, найдено: %s", len(records))
         return records
 
 
@@ -356,20 +432,22 @@ async def get_exam_records_by_personal_number(personal_number):
     async with pool.acquire() as conn:
         normalized_personal_number = normalize_personal_number(personal_number)
         logger.debug(
-            f"Нормализованный личный номер для поиска: {normalized_personal_number}"
-        )
-        # Проверяем все записи для отладки
-        all_records = await conn.fetch("""
-            SELECT personal_number, encode(personal_number::bytea, 'escape') AS encoded, normalized 
-            FROM exam_records
-        """)
-        logger.debug(
-            f"Все записи в базе: {[(r['personal_number'], r['encoded'], r['normalized']) for r in all_records]}"
-        )
+            "Нормализованный личный номер для поиска: %s", normalized_personal_number
+        )
+        # Выгрузка всей таблицы нужна только для отладки
+        if logger.isEnabledFor(logging.DEBUG):
+            all_records = await conn.fetch("""
+                SELECT personal_number, encode(personal_number::bytea, 'escape') AS encoded, normalized 
+                FROM exam_records
+            """)
+            logger.debug(
+                "Все записи в базе: %s",
+                [(r['personal_number'], r['encoded'], r['normalized']) for r in all_records],
+            )
         # Поиск по числовой части
         numeric_part = re.sub(r"[^0-9]", "", normalized_personal_number)
         if numeric_part:
-            logger.debug(f"Поиск по числовой части: {numeric_part}")
+            logger.debug("Поиск по числовой части: %s", numeric_part)
             records = await conn.fetch(
                 """
                 SELECT er.*, tc.center_name 
@@ -380,7 +458,9 @@ async def get_exam_records_by_personal_number(personal_number):
                 numeric_part,
             )
             logger.debug(
-                f"Поиск по числовой части {numeric_part} нашёл: {len(records)} записей"
+                "Поиск по числовой части %s нашёл: %s записей",
+                numeric_part,
+                len(records),
             )
             if records:
                 return records
@@ -395,10 +475,14 @@ async def get_exam_records_by_personal_number(personal_number):
             normalized_personal_number,
         )
         logger.debug(
-            f"Основной поиск для {normalized_personal_number} нашёл: {len(records)} записей"
+            "Основной поиск для %s нашёл: %s записей",
+            normalized_personal_number,
+            len(records),
         )
         logger.info(
-            f"Запрошены записи экзаменов по личному номеру {personal_number}, найдено: {len(records)}"
+            "Запрошены записи экзаменов по личному номеру %s, найдено: %s",
+            personal_number,
+            len(records),
         )
         return records
 
@@ -546,15 +630,19 @@ async def validate_exam_record(
         return None
 
 
-async def get_training_centers():
+async def _load_training_centers():
     async with pool.acquire() as conn:
         centers = await conn.fetch(
             "SELECT id, center_name, chat_link FROM training_centers WHERE center_name IS NOT NULL"
         )
-        logger.info(f"Запрошены УТЦ, найдено: {len(centers)}")
+        logger.info("Запрошены УТЦ, найдено: %s", len(centers))
         return centers
 
 
+async def get_training_centers():
+    return await cache_bus.get("training_centers", _load_training_centers)
+
+
 async def get_user_training_invite(user_id: int):
     async with pool.acquire() as conn:
         record = await conn.fetchrow(
@@ -576,15 +664,19 @@ async def get_user_training_invite(user_id: int):
         return record
 
 
-async def get_code_word():
+async def _load_code_word():
     async with pool.acquire() as conn:
         code_word = await conn.fetchval(
             "SELECT code_word FROM training_centers WHERE code_word IS NOT NULL LIMIT 1"
         )
-        logger.debug(f"Запрошено кодовое слово: {code_word}")
+        logger.debug("Запрошено кодовое слово: %s", code_word)
         return code_word
 
 
+async def get_code_word():
+    return await cache_bus.get("code_word", _load_code_word)
+
+
 async def set_code_word(code_word):
     async with pool.acquire() as conn:
         # Проверяем, существует ли запись с code_word
@@ -601,7 +693,8 @@ async def set_code_word(code_word):
             await conn.execute(
                 "INSERT INTO training_centers (code_word) VALUES ($1)", code_word
             )
-        logger.info(f"Кодовое слово установлено: {code_word}")
+        await cache_bus.notify(conn, "code_word")
+        logger.info("Кодовое слово установлено: %s", code_word)
 
 
 async def add_training_center(center_name, chat_link):
@@ -611,7 +704,8 @@ async def add_training_center(center_name, chat_link):
             center_name,
             chat_link,
         )
-        logger.info(f"Добавлен УТЦ: {center_name}")
+        await cache_bus.notify(conn, "training_centers")
+        logger.info("Добавлен УТЦ: %s", center_name)
 
 
 async def update_training_center(center_id, chat_link):
@@ -621,28 +715,72 @@ async def update_training_center(center_id, chat_link):
             chat_link,
             center_id,
         )
-        logger.info(f"Обновлена ссылка для УТЦ ID {center_id}")
+        await cache_bus.notify(conn, "training_centers")
+        logger.info("Обновлена ссылка для УТЦ ID %s", center_id)
 
 
-async def get_serial_history(serial):
+async def get_serial(serial):
     async with pool.acquire() as conn:
         serial_data = await conn.fetchrow(
             "SELECT * FROM serials WHERE serial = $1", serial
         )
         if not serial_data:
-            logger.warning(f"Серийный номер {serial} не найден в базе")
-            return None, []
-        appeals = await conn.fetch(
-            "SELECT * FROM appeals WHERE serial = $1 ORDER BY created_time DESC", serial
-        )
-        logger.info(
-            f"Запрошена история серийного номера {serial}, найдено заявок: {len(appeals)}"
-        )
-        return serial_data, appeals
+            logger.warning("Серийный номер %s не найден в базе", serial)
+        return serial_data
+
+
+# Порядок истории по серийнику: сначала новые, appeal_id разводит заявки
+# с одинаковым временем создания
+_SERIAL_HISTORY_ORDER_KEY = "(COALESCE(created_time, ''), appeal_id)"
+
+
+async def get_serial_history_appeal(serial, cursor=None, direction="older"):
+    """Одна заявка из истории серийника относительно курсора.
+
+    ``cursor`` — пара ``(created_time, appeal_id)`` текущей заявки; без него
+    возвращается самая новая. ``direction`` — ``"older"`` или ``"newer"``.
+    Возвращает ``(appeal, has_newer, has_older)`` либо ``(None, False, False)``.
+    """
+
+    if direction not in ("older", "newer"):
+        raise ValueError(f"Неизвестное направление истории: {direction}")
+    newer = direction == "newer"
+    async with pool.acquire() as conn:
+        if cursor is None:
+            rows = await conn.fetch(
+                f"""
+                SELECT * FROM appeals WHERE serial = $1
+                ORDER BY {_SERIAL_HISTORY_ORDER_KEY} DESC
+                LIMIT 2
+                """,
+                serial,
+            )
+        else:
+            created_time, appeal_id = cursor
+            rows = await conn.fetch(
+                f"""
+                SELECT * FROM appeals
+                WHERE serial = $1
+                  AND {_SERIAL_HISTORY_ORDER_KEY} {'>' if newer else '<'} (COALESCE($2::text, ''), $3::integer)
+                ORDER BY {_SERIAL_HISTORY_ORDER_KEY} {'ASC' if newer else 'DESC'}
+                LIMIT 2
+                """,
+                serial,
+                created_time,
+                appeal_id,
+            )
+    if not rows:
+        return None, False, False
+    # Вторая строка нужна только чтобы узнать, есть ли куда листать дальше
+    has_more = len(rows) > 1
+    if newer:
+        return rows[0], has_more, True
+    return rows[0], False if cursor is None else True, has_more
 
 
 async def close_db():
     global pool
+    await cache_bus.stop()
     if pool:
         await pool.close()
         logger.info("Пул соединений к базе данных закрыт")
@@ -658,9 +796,9 @@ async def add_serial(serial):
                 datetime.now().strftime("%Y-%m-%dT%H:%M"),
                 "active",
             )
-            logger.info(f"Серийный номер {serial} добавлен")
+            logger.info("Серийный номер %s добавлен", serial)
         except Exception as e:
-            logger.error(f"Ошибка при добавлении серийного номера {serial}: {e}")
+            logger.error("Ошибка при добавлении серийного номера %s: %s", serial, e)
             raise
 
 
@@ -687,7 +825,7 @@ async def add_appeal(serial, username, description, media_files, user_id):
                 user_id,
                 datetime.now().strftime("%Y-%m-%dT%H:%M"),
             )
-    logger.info(f"Заявка №{appeal_id} создана для серийника {serial}")
+    logger.info("Заявка №%s создана для серийника %s", appeal_id, serial)
     return appeal_id, appeal_count
 
 
@@ -709,7 +847,7 @@ async def get_user_appeals(user_id):
             user_id,
         )
         logger.info(
-            f"Запрошены заявки пользователя ID {user_id}, найдено: {len(appeals)}"
+            "Запрошены заявки пользователя ID %s, найдено: %s", user_id, len(appeals)
         )
         return appeals
 
@@ -719,7 +857,7 @@ async def get_appeal(appeal_id):
         appeal = await conn.fetchrow(
             "SELECT * FROM appeals WHERE appeal_id = $1", appeal_id
         )
-        logger.info(f"Запрошена заявка №{appeal_id}")
+        logger.info("Запрошена заявка №%s", appeal_id)
         return appeal
 
 
@@ -738,7 +876,7 @@ async def take_appeal(appeal_id, admin_id, username):
                 admin_id,
             )
             logger.info(
-                f"Заявка №{appeal_id} взята в работу администратором ID {admin_id}"
+                "Заявка №%s взята в работу администратором ID %s", appeal_id, admin_id
             )
 
 
@@ -749,7 +887,7 @@ async def postpone_appeal(appeal_id, new_time):
             new_time,
             appeal_id,
         )
-        logger.info(f"Заявка №{appeal_id} отложена до {new_time}")
+        logger.info("Заявка №%s отложена до %s", appeal_id, new_time)
 
 
 async def save_response(appeal_id, response):
@@ -757,7 +895,7 @@ async def save_response(appeal_id, response):
         await conn.execute(
             "UPDATE appeals SET response = $1 WHERE appeal_id = $2", response, appeal_id
         )
-        logger.info(f"Ответ сохранён для заявки №{appeal_id}")
+        logger.info("Ответ сохранён для заявки №%s", appeal_id)
         return await conn.fetchrow(
             "SELECT user_id, admin_id FROM appeals WHERE appeal_id = $1", appeal_id
         )
@@ -772,7 +910,7 @@ async def close_appeal(appeal_id):
                 datetime.now().strftime("%Y-%m-%dT%H:%M"),
                 appeal_id,
             )
-    logger.info(f"Заявка №{appeal_id} закрыта")
+    logger.info("Заявка №%s закрыта", appeal_id)
 
 
 async def delegate_appeal(appeal_id, admin_id, username, current_admin_id=None):
@@ -789,7 +927,9 @@ async def delegate_appeal(appeal_id, admin_id, username, current_admin_id=None):
                         current_admin_id,
                     )
                     logger.info(
-                        f"Уменьшено appeals_taken для администратора ID {current_admin_id} для заявки №{appeal_id}"
+                        "Уменьшено appeals_taken для администратора ID %s для заявки №%s",
+                        current_admin_id,
+                        appeal_id,
                     )
             # Обновляем заявку и увеличиваем appeals_taken для нового администратора
             await conn.execute(
@@ -804,7 +944,7 @@ async def delegate_appeal(appeal_id, admin_id, username, current_admin_id=None):
                 admin_id,
             )
             logger.info(
-                f"Заявка №{appeal_id} делегирована администратору ID {admin_id}"
+                "Заявка №%s делегирована администратору ID %s", appeal_id, admin_id
             )
 
 
@@ -818,7 +958,10 @@ async def get_open_appeals(page=0, limit=10):
         )
         total = await conn.fetchval("SELECT COUNT(*) FROM appeals WHERE status = 'new'")
         logger.info(
-            f"Запрошены открытые заявки со статусом 'new', найдено: {len(appeals)}, всего: {total}, страница: {page}"
+            "Запрошены открытые заявки со статусом 'new', найдено: %s, всего: %s, страница: %s",
+            len(appeals),
+            total,
+            page,
         )
         return appeals, total
 
@@ -837,18 +980,26 @@ async def get_assigned_appeals(admin_id, page=0, limit=10):
             admin_id,
         )
         logger.info(
-            f"Запрошены заявки администратора ID {admin_id}, найдено: {len(appeals)}, всего: {total}, страница: {page}"
+            "Запрошены заявки администратора ID %s, найдено: %s, всего: %s, страница: %s",
+            admin_id,
+            len(appeals),
+            total,
+            page,
         )
         return appeals, total
 
 
-async def get_admins():
+async def _load_admins():
     async with pool.acquire() as conn:
         admins = await conn.fetch("SELECT admin_id, username FROM admins")
-        logger.info(f"Запрошены админы, найдено: {len(admins)}")
+        logger.info("Запрошены админы, найдено: %s", len(admins))
         return admins
 
 
+async def get_admins():
+    return await cache_bus.get("admins", _load_admins)
+
+
 async def add_admin(admin_id, username):
     async with pool.acquire() as conn:
         await conn.execute(
@@ -857,7 +1008,8 @@ async def add_admin(admin_id, username):
             username,
             False,
         )
-        logger.info(f"Админ @{username} (ID: {admin_id}) добавлен")
+        await cache_bus.notify(conn, "admins")
+        logger.info("Админ @%s (ID: %s) добавлен", username, admin_id)
 
 
 async def add_notification_channel(channel_id, channel_name, topic_id):
@@ -868,24 +1020,52 @@ async def add_notification_channel(channel_id, channel_name, topic_id):
             channel_name,
             topic_id,
         )
+        await cache_bus.notify(conn, "notification_channels")
         logger.info(
-            f"Канал {channel_name} (ID: {channel_id}, topic_id: {topic_id}) добавлен для уведомлений"
+            "Канал %s (ID: %s, topic_id: %s) добавлен для уведомлений",
+            channel_name,
+            channel_id,
+            topic_id,
         )
 
 
-async def get_notification_channels():
+async def delete_notification_channel(channel_id):
+    async with pool.acquire() as conn:
+        channel_name = await conn.fetchval(
+            "DELETE FROM notification_channels WHERE channel_id = $1 RETURNING channel_name",
+            channel_id,
+        )
+        await cache_bus.notify(conn, "notification_channels")
+        return channel_name
+
+
+async def update_notification_channel_topic(channel_id, topic_id):
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE notification_channels SET topic_id = $1 WHERE channel_id = $2",
+            topic_id,
+            channel_id,
+        )
+        await cache_bus.notify(conn, "notification_channels")
+
+
+async def _load_notification_channels():
     async with pool.acquire() as conn:
         channels = await conn.fetch("SELECT * FROM notification_channels")
-        logger.info(f"Запрошены каналы уведомлений, найдено: {len(channels)}")
+        logger.info("Запрошены каналы уведомлений, найдено: %s", len(channels))
         return channels
 
 
+async def get_notification_channels():
+    return await cache_bus.get("notification_channels", _load_notification_channels)
+
+
 async def mark_defect(serial, status):
     async with pool.acquire() as conn:
         await conn.execute(
             "UPDATE serials SET return_status = $1 WHERE serial = $2", status, serial
         )
-        logger.info(f"Серийный номер {serial} отмечен как {status}")
+        logger.info("Серийный номер %s отмечен как %s", serial, status)
 
 
 async def start_replacement(appeal_id, old_serial, status="replacement_process"):
@@ -895,7 +1075,7 @@ async def start_replacement(appeal_id, old_serial, status="replacement_process")
                 "SELECT status FROM appeals WHERE appeal_id = $1", appeal_id
             )
             if current_status == "replacement_process":
-                logger.warning(f"Заявка №{appeal_id} уже в статусе 'процесс замены'")
+                logger.warning("Заявка №%s уже в статусе 'процесс замены'", appeal_id)
                 raise ValueError("Заявка уже в процессе замены")
             await conn.execute(
                 "UPDATE appeals SET status = $1 WHERE appeal_id = $2", status, appeal_id
@@ -906,7 +1086,9 @@ async def start_replacement(appeal_id, old_serial, status="replacement_process")
                 old_serial,
             )
             logger.info(
-                f"Заявка №{appeal_id} переведена в статус 'процесс замены' для серийника {old_serial}"
+                "Заявка №%s переведена в статус 'процесс замены' для серийника %s",
+                appeal_id,
+                old_serial,
             )
 
 
@@ -917,7 +1099,7 @@ async def complete_replacement(appeal_id, new_serial, response=None):
                 "SELECT serial FROM serials WHERE serial = $1", new_serial
             )
             if not serial_exists:
-                logger.error(f"Новый серийный номер {new_serial} не найден в базе")
+                logger.error("Новый серийный номер %s не найден в базе", new_serial)
                 raise ValueError(f"Новый серийный номер {new_serial} не найден в базе")
             await conn.execute(
                 "UPDATE appeals SET new_serial = $1, status = $2, response = $3, closed_time = $4 WHERE appeal_id = $5",
@@ -928,7 +1110,10 @@ async def complete_replacement(appeal_id, new_serial, response=None):
                 appeal_id,
             )
             logger.info(
-                f"Замена завершена для заявки №{appeal_id}, новый серийник: {new_serial}, ответ: {response}"
+                "Замена завершена для заявки №%s, новый серийник: %s, ответ: %s",
+                appeal_id,
+                new_serial,
+                response,
             )
 
 
@@ -944,7 +1129,9 @@ async def get_replacement_appeals(serial=None):
                 "SELECT * FROM appeals WHERE status IN ('new', 'in_progress', 'postponed', 'overdue')"
             )
         logger.info(
-            f"Запрошены заявки для замены (серийник: {serial or 'все'}), найдено: {len(appeals)}"
+            "Запрошены заявки для замены (серийник: %s), найдено: %s",
+            serial or 'все',
+            len(appeals),
         )
         return appeals
 
@@ -961,7 +1148,10 @@ async def get_closed_appeals(page=0, limit=10):
             "SELECT COUNT(*) FROM appeals WHERE status = 'closed'"
         )
         logger.info(
-            f"Запрошены закрытые заявки, найдено: {len(appeals)}, всего: {total}, страница: {page}"
+            "Запрошены закрытые заявки, найдено: %s, всего: %s, страница: %s",
+            len(appeals),
+            total,
+            page,
         )
         return appeals, total
 
@@ -1027,7 +1217,7 @@ async def get_defect_reports(serial=None, serial_from=None, serial_to=None):
             reports = await conn.fetch(
                 "SELECT * FROM defect_reports ORDER BY report_date DESC"
             )
-        logger.info(f"Запрошены отчёты о неисправности, найдено: {len(reports)}")
+        logger.info("Запрошены отчёты о неисправности, найдено: %s", len(reports))
         return reports
 
 
@@ -1202,7 +1392,7 @@ async def set_manual_file(category, file_name):
                 category,
                 file_name,
             )
-        logger.info(f"Файл руководства '{category}' обновлён")
+        logger.info("Файл руководства '%s' обновлён", category)
         return previous_file
 
 
@@ -1216,7 +1406,9 @@ async def get_manual_file(category):
             record.get("file_name") or record.get("file_id")
         )
         logger.debug(
-            f"Запрошен файл руководства '{category}': {'найден' if has_record else 'отсутствует'}"
+            "Запрошен файл руководства '%s': %s",
+            category,
+            'найден' if has_record else 'отсутствует',
         )
         return dict(record) if record else None
 
@@ -1244,7 +1436,7 @@ async def get_manual_files(category: str):
     async with pool.acquire() as conn:
         rows = await conn.fetch(
             """
-            SELECT id, category, file_name, file_path, file_type, uploaded_at
+            SELECT id, category, file_name, file_path, file_type, telegram_file_id, uploaded_at
             FROM manuals_files
             WHERE category = $1
             ORDER BY id ASC
@@ -1261,7 +1453,7 @@ async def get_manual_file_by_id(file_id: int):
     async with pool.acquire() as conn:
         record = await conn.fetchrow(
             """
-            SELECT id, category, file_name, file_path, file_type, uploaded_at
+            SELECT id, category, file_name, file_path, file_type, telegram_file_id, uploaded_at
             FROM manuals_files
             WHERE id = $1
             """,
@@ -1276,6 +1468,20 @@ async def get_manual_file_by_id(file_id: int):
         return record
 
 
+async def set_manual_file_telegram_id(file_id: int, telegram_file_id) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE manuals_files SET telegram_file_id = $1 WHERE id = $2",
+            telegram_file_id,
+            file_id,
+        )
+        logger.debug(
+            "Telegram file_id файла руководства id=%s %s",
+            file_id,
+            "обновлён" if telegram_file_id else "сброшен",
+        )
+
+
 async def delete_manual_file(file_id: int) -> None:
     async with pool.acquire() as conn:
         await conn.execute("DELETE FROM manuals_files WHERE id = $1", file_id)
@@ -1286,3 +1492,111 @@ async def delete_all_manual_files(category: str) -> None:
     async with pool.acquire() as conn:
         await conn.execute("DELETE FROM manuals_files WHERE category = $1", category)
         logger.info("Удалены все файлы руководства категории %s", category)
+
+
+async def get_transcode_cache_entry(file_unique_id: str, params: str):
+    async with pool.acquire() as conn:
+        return await conn.fetchrow(
+            """
+            SELECT file_unique_id, params, output_path, source_size, output_size,
+                   encode_seconds, hits, created_at, last_used_at
+            FROM transcode_cache
+            WHERE file_unique_id = $1 AND params = $2
+            """,
+            file_unique_id,
+            params,
+        )
+
+
+async def save_transcode_cache_entry(
+    file_unique_id: str,
+    params: str,
+    output_path: str,
+    source_size,
+    output_size: int,
+    encode_seconds,
+) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO transcode_cache (
+                file_unique_id, params, output_path, source_size, output_size, encode_seconds
+            )
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (file_unique_id, params)
+            DO UPDATE SET output_path = EXCLUDED.output_path,
+                          source_size = EXCLUDED.source_size,
+                          output_size = EXCLUDED.output_size,
+                          encode_seconds = EXCLUDED.encode_seconds,
+                          last_used_at = NOW()
+            """,
+            file_unique_id,
+            params,
+            output_path,
+            source_size,
+            output_size,
+            encode_seconds,
+        )
+        logger.debug(
+            "Результат сжатия %s (%s) сохранён в кеше: %s", file_unique_id, params, output_path
+        )
+
+
+async def mark_transcode_cache_hit(file_unique_id: str, params: str) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            UPDATE transcode_cache
+            SET hits = hits + 1, last_used_at = NOW()
+            WHERE file_unique_id = $1 AND params = $2
+            """,
+            file_unique_id,
+            params,
+        )
+
+
+async def delete_transcode_cache_entry(file_unique_id: str, params: str) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "DELETE FROM transcode_cache WHERE file_unique_id = $1 AND params = $2",
+            file_unique_id,
+            params,
+        )
+        logger.debug("Запись кеша сжатия %s (%s) удалена", file_unique_id, params)
+
+
+async def get_media_file_cache_entries(media_keys: list[str]) -> dict:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT media_key, telegram_file_id, mtime_ns, size, sha256
+            FROM media_file_cache
+            WHERE media_key = ANY($1::text[])
+            """,
+            media_keys,
+        )
+        return {row["media_key"]: dict(row) for row in rows}
+
+
+async def save_media_file_cache_entry(
+    media_key: str, telegram_file_id: str, mtime_ns: int, size: int, sha256: str
+) -> None:
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            INSERT INTO media_file_cache (media_key, telegram_file_id, mtime_ns, size, sha256)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (media_key)
+            DO UPDATE SET telegram_file_id = EXCLUDED.telegram_file_id,
+                          mtime_ns = EXCLUDED.mtime_ns,
+                          size = EXCLUDED.size,
+                          sha256 = EXCLUDED.sha256,
+                          updated_at = NOW()
+            """,
+            media_key,
+            telegram_file_id,
+            mtime_ns,
+            size,
+            sha256,
+        )
+        logger.debug("Telegram file_id для %s сохранён", media_key)
@@ -29,6 +29,8 @@ from keyboards.inline import (
 from database.db import (
     add_admin,
     add_notification_channel,
+    delete_notification_channel,
+    update_notification_channel_topic,
     get_notification_channels,
     get_admins,
     get_assigned_appeals,
@@ -50,6 +52,10 @@ from database.db import (
     finish_visit,
     get_visits_for_export,
     normalize_visit_media_paths,
+    get_transcode_cache_entry,
+    save_transcode_cache_entry,
+    mark_transcode_cache_hit,
+    delete_transcode_cache_entry,
 )
 from config import (
     MAIN_ADMIN_IDS,
@@ -66,7 +72,7 @@ from config import (
     PUBLIC_MEDIA_ROOT,
 )
 from datetime import datetime
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 from io import BytesIO
 import pandas as pd
 import json
@@ -78,15 +84,27 @@ from utils.validators import (
     is_valid_callsign,
 )
 from utils.statuses import APPEAL_STATUSES
-from utils.logger import get_logger
-from utils.video import compress_video
-from utils.storage import build_public_url
+from utils.logger import get_logger, lazy
+from utils.downloads import download_file
+from utils.transcoding import (
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    TranscodeCancelled,
+    TranscodeJob,
+    transcode_params_key,
+    transcode_service,
+)
+from utils.cache import cache_manager
+from utils.storage import build_public_url, video_derivative_links, video_derivative_urls
+from utils.video import create_video_derivatives
 from utils.excel_utils import export_visits_to_excel
 import aiohttp
 from aiohttp import ClientError
 import shutil
 from pathlib import PurePosixPath
+import os
 import re
+from time import monotonic
 
 logger = get_logger(__name__)
 
@@ -211,7 +229,7 @@ def _normalize_component(component: str) -> str:
     return normalized.replace("_", "").replace("-", "").lower()
 
 
-def _safe_log_arg(arg):
+def _ascii_log_text(arg):
     if isinstance(arg, (Path, PurePosixPath)):
         arg = str(arg)
     if isinstance(arg, str):
@@ -223,6 +241,11 @@ def _safe_log_arg(arg):
         return repr(arg)
 
 
+def _safe_log_arg(arg):
+    # Преобразование выполняется, только если запись действительно попадёт в журнал
+    return lazy(_ascii_log_text, arg)
+
+
 def _safe_log_args(*args):
     return tuple(_safe_log_arg(arg) for arg in args)
 
@@ -550,17 +573,11 @@ async def download_from_local_api(file_id: str, token: str, base_dir: str) -> Do
         destination = base_path / safe_relative
         destination.parent.mkdir(parents=True, exist_ok=True)
 
-        async with session.get(
-            f"https://api.telegram.org/file/bot{token}/{telegram_relative.as_posix()}"
-        ) as file_resp:
-            if file_resp.status != 200:
-                body = await file_resp.text()
-                raise Exception(
-                    f"Ошибка загрузки файла Telegram: HTTP {file_resp.status}, ответ: {body}"
-                )
-            with destination.open("wb") as file_obj:
-                async for chunk in file_resp.content.iter_chunked(1 << 14):
-                    file_obj.write(chunk)
+        await download_file(
+            session,
+            f"https://api.telegram.org/file/bot{token}/{telegram_relative.as_posix()}",
+            destination,
+        )
         logger.debug(
             "Файл %s загружен через Telegram API: %s",
             *_safe_log_args(file_id, destination),
@@ -629,12 +646,14 @@ async def download_from_local_api(file_id: str, token: str, base_dir: str) -> Do
                         raise LocalBotAPIConfigurationError(formatted_message)
 
                     if local_path.exists():
+                        cache_manager.record_hit(local_path)
                         logger.debug(
                             "Файл %s уже скопирован локально: %s",
                             *_safe_log_args(file_id, local_path),
                         )
                         return DownloadResult(str(local_path))
 
+                    cache_manager.record_miss()
                     local_path.parent.mkdir(parents=True, exist_ok=True)
                     try:
                         await asyncio.to_thread(shutil.copy2, source_path, local_path)
@@ -650,26 +669,20 @@ async def download_from_local_api(file_id: str, token: str, base_dir: str) -> Do
                         )
 
                 if local_path.exists():
+                    cache_manager.record_hit(local_path)
                     logger.debug(
                         "Файл найден локально: %s", *_safe_log_args(local_path)
                     )
                     return DownloadResult(str(local_path))
 
+                cache_manager.record_miss()
                 url = f"{file_base_url}/{remote_relative.as_posix()}"
-                async with session.get(url, ssl=False) as file_resp:
-                    logger.debug("HTTP-запрос к %s, статус: %s", url, file_resp.status)
-                    if file_resp.status != 200:
-                        raise Exception(
-                            f"Ошибка загрузки файла: HTTP {file_resp.status}, ответ: {await file_resp.text()}"
-                        )
-                    local_path.parent.mkdir(parents=True, exist_ok=True)
-                    with local_path.open("wb") as f:
-                        async for chunk in file_resp.content.iter_chunked(1 << 14):
-                            f.write(chunk)
-                    logger.debug(
-                        "Файл загружен через локальный HTTP и сохранён: %s",
-                        *_safe_log_args(local_path),
-                    )
+                logger.debug("HTTP-загрузка файла с %s", url)
+                await download_file(session, url, local_path, ssl=False)
+                logger.debug(
+                    "Файл загружен через локальный HTTP и сохранён: %s",
+                    *_safe_log_args(local_path),
+                )
                 return DownloadResult(str(local_path))
         except LocalBotAPIConfigurationError:
             raise
@@ -687,6 +700,208 @@ async def download_from_local_api(file_id: str, token: str, base_dir: str) -> Do
             return await _download_via_telegram(session, remote_relative)
 
 
+TRANSCODE_PROGRESS_EDIT_INTERVAL = 5
+TRANSCODE_RUNNING_TEXT = (
+    "Видео получено. Выполняется сжатие, это может занять несколько минут..."
+)
+
+
+def _transcode_cancel_keyboard(job_id: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="✖️ Отменить сжатие", callback_data=f"transcode_cancel:{job_id}"
+                )
+            ]
+        ]
+    )
+
+
+def _transcode_progress_text(
+    position: int, progress: Optional[float] = None, eta_seconds: Optional[float] = None
+) -> str:
+    if position > 0:
+        return (
+            "Видео получено и поставлено в очередь на сжатие.\n"
+            f"Позиция в очереди: {position}"
+        )
+    if progress is None:
+        return TRANSCODE_RUNNING_TEXT
+    text = f"Выполняется сжатие видео: {int(progress * 100)}%"
+    if eta_seconds is not None:
+        minutes, seconds = divmod(int(eta_seconds), 60)
+        text += f"\nОсталось примерно {minutes} мин {seconds:02d} с"
+    return text
+
+
+async def _submit_transcode(
+    message: Message, source_path, *, priority: int
+) -> tuple[TranscodeJob, Message]:
+    """Ставит видео в очередь сжатия и отправляет сообщение о его состоянии."""
+
+    job = transcode_service.submit(
+        str(source_path), priority=priority, owner_id=message.from_user.id
+    )
+    if job.state == "direct":
+        progress_message = await message.answer(TRANSCODE_RUNNING_TEXT)
+    else:
+        progress_message = await message.answer(
+            _transcode_progress_text(transcode_service.position(job)),
+            reply_markup=_transcode_cancel_keyboard(job.job_id),
+        )
+    return job, progress_message
+
+
+async def _await_transcode(job: TranscodeJob, progress_message: Message) -> str:
+    """Дожидается сжатия, показывая в сообщении позицию в очереди или процент и ETA.
+
+    Смена позиции отображается сразу, а прогресс кодирования — не чаще раза
+    в TRANSCODE_PROGRESS_EDIT_INTERVAL секунд, чтобы не упираться в лимиты Telegram.
+    """
+
+    last_edit = monotonic()
+    last_position = transcode_service.position(job)
+
+    async def _on_update(updated_job: TranscodeJob) -> None:
+        nonlocal last_edit, last_position
+        position = transcode_service.position(updated_job)
+        now = monotonic()
+        if position == last_position and now - last_edit < TRANSCODE_PROGRESS_EDIT_INTERVAL:
+            return
+        last_edit, last_position = now, position
+        try:
+            await progress_message.edit_text(
+                _transcode_progress_text(
+                    position, updated_job.progress, updated_job.eta_seconds
+                ),
+                reply_markup=_transcode_cancel_keyboard(updated_job.job_id),
+            )
+        except (TelegramBadRequest, TelegramRetryAfter):
+            pass
+
+    return await transcode_service.wait(job, on_update=_on_update)
+
+
+_derivative_tasks: set[asyncio.Task] = set()
+
+
+def _schedule_video_derivatives(video_path: Path) -> None:
+    """Фоном создаёт постер и превью для сохранённого видео."""
+
+    task = asyncio.create_task(create_video_derivatives(str(video_path)))
+    _derivative_tasks.add(task)
+    task.add_done_callback(_derivative_tasks.discard)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    # Свежий mtime защищает копию от очистки кеша до переноса в хранилище
+    os.utime(target)
+
+
+async def _reuse_cached_transcode(
+    file_unique_id: Optional[str], work_dir: Path, **options
+) -> Optional[Path]:
+    """Возвращает копию ранее сжатого файла с тем же ``file_unique_id`` и параметрами.
+
+    Копия создаётся жёсткой ссылкой (или обычным копированием) в ``work_dir``,
+    поэтому вызывающий код переносит её в хранилище так же, как результат
+    сжатия. Если сохранённый файл пропал или изменился, запись удаляется.
+    """
+
+    if not file_unique_id:
+        return None
+    params = transcode_params_key(**options)
+    try:
+        entry = await get_transcode_cache_entry(file_unique_id, params)
+    except Exception as exc:
+        logger.warning("Не удалось прочитать кеш сжатия для %s: %s", file_unique_id, exc)
+        return None
+    if entry is None:
+        return None
+
+    cached_path = Path(entry["output_path"])
+    try:
+        valid = cached_path.stat().st_size == entry["output_size"]
+    except OSError:
+        valid = False
+    if not valid:
+        logger.info(
+            "Результат сжатия %s больше недоступен (%s), запись кеша удалена",
+            file_unique_id,
+            _safe_log_arg(cached_path),
+        )
+        await delete_transcode_cache_entry(file_unique_id, params)
+        return None
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    target = work_dir / f"{file_unique_id}_cached{cached_path.suffix or '.mp4'}"
+    target.unlink(missing_ok=True)
+    await asyncio.to_thread(_link_or_copy, cached_path, target)
+    await mark_transcode_cache_hit(file_unique_id, params)
+    logger.info(
+        "Повторно используем сжатое видео %s (%s)",
+        file_unique_id,
+        _safe_log_arg(cached_path),
+    )
+    return target
+
+
+async def _remember_transcode(
+    file_unique_id: Optional[str],
+    output_path: Path,
+    *,
+    source_size: Optional[int],
+    job: Optional[TranscodeJob] = None,
+    **options,
+) -> None:
+    """Запоминает итоговый файл сжатия, чтобы повторная отправка не кодировалась заново."""
+
+    if not file_unique_id:
+        return
+    encode_seconds = None
+    if job is not None and job.started_at is not None:
+        encode_seconds = monotonic() - job.started_at
+    try:
+        await save_transcode_cache_entry(
+            file_unique_id,
+            transcode_params_key(**options),
+            str(output_path.resolve()),
+            source_size,
+            output_path.stat().st_size,
+            encode_seconds,
+        )
+    except Exception as exc:
+        logger.warning("Не удалось сохранить кеш сжатия для %s: %s", file_unique_id, exc)
+
+
+@router.callback_query(F.data.startswith("transcode_cancel:"))
+async def cancel_transcode_job(callback: CallbackQuery):
+    job_id = callback.data.split(":", 1)[1]
+    job = transcode_service.get(job_id)
+    if job is None:
+        await callback.answer("Сжатие уже завершено.", show_alert=True)
+        return
+    if job.owner_id != callback.from_user.id and callback.from_user.id not in MAIN_ADMIN_IDS:
+        await callback.answer("Нельзя отменить чужую задачу.", show_alert=True)
+        return
+    transcode_service.cancel(job_id)
+    try:
+        await callback.message.edit_text("Сжатие отменено ❌")
+    except TelegramBadRequest:
+        pass
+    await callback.answer()
+    logger.info(
+        "Пользователь @%s отменил задачу сжатия %s",
+        callback.from_user.username,
+        job_id,
+    )
+
+
 @router.callback_query(F.data == "admin_panel")
 async def admin_panel_prompt(callback: CallbackQuery, **data):
     if callback.from_user.id not in MAIN_ADMIN_IDS:
@@ -699,14 +914,17 @@ async def admin_panel_prompt(callback: CallbackQuery, **data):
             ),
         )
         logger.warning(
-            f"Попытка доступа к админ-панели от неадминистратора @{callback.from_user.username}"
+            "Попытка доступа к админ-панели от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     await callback.message.edit_text(
         "Панель администратора:", reply_markup=get_admin_panel_menu()
     )
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {callback.from_user.id}) открыл панель администратора"
+        "Администратор @%s (ID: %s) открыл панель администратора",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -998,20 +1216,37 @@ async def visit_media_handler(message: Message, state: FSMContext, **data):
                 await state.clear()
                 return
             cache_dir = Path(LOCAL_BOT_API_CACHE_DIR) / "visits"
-            download_result = await download_from_local_api(
-                file_id=video_obj.file_id,
-                token=TOKEN,
-                base_dir=str(cache_dir),
+            job = None
+            compressed_path = await _reuse_cached_transcode(
+                video_obj.file_unique_id, cache_dir
             )
-            progress_message = await message.answer(
-                "Видео получено. Выполняется сжатие, это может занять несколько минут..."
-            )
-            compressed_path = await compress_video(download_result.local_path)
-            try:
-                if progress_message:
-                    await progress_message.edit_text("Сжатие завершено ✅")
-            except TelegramBadRequest:
-                pass
+            if compressed_path is not None:
+                await message.answer(
+                    "Это видео уже было сжато ранее, используем готовый файл."
+                )
+            else:
+                download_result = await download_from_local_api(
+                    file_id=video_obj.file_id,
+                    token=TOKEN,
+                    base_dir=str(cache_dir),
+                )
+                job, progress_message = await _submit_transcode(
+                    message, download_result.local_path, priority=PRIORITY_NORMAL
+                )
+                try:
+                    compressed_path = await _await_transcode(job, progress_message)
+                except TranscodeCancelled:
+                    await _cleanup_source_file(Path(download_result.local_path))
+                    await message.answer(
+                        "Сжатие отменено. Пришлите видео заново или нажмите 'Пропустить'.",
+                        reply_markup=_visit_media_keyboard(),
+                    )
+                    return
+                try:
+                    if progress_message:
+                        await progress_message.edit_text("Сжатие завершено ✅")
+                except TelegramBadRequest:
+                    pass
             compressed_file = Path(compressed_path)
             suffix = compressed_file.suffix or ".mp4"
             base_name = _visit_media_basename(subdivision, callsigns, message.from_user.id)
@@ -1020,6 +1255,16 @@ async def visit_media_handler(message: Message, state: FSMContext, **data):
             )
             final_path.parent.mkdir(parents=True, exist_ok=True)
             compressed_file.replace(final_path)
+            # job нет, если файл взят из кеша; исходник, возвращённый без сжатия
+            # (не потребовалось или ffmpeg упал), не кешируем
+            if job is None or job.encoded:
+                await _remember_transcode(
+                    video_obj.file_unique_id,
+                    final_path,
+                    source_size=getattr(video_obj, "file_size", None),
+                    job=job,
+                )
+            _schedule_video_derivatives(final_path)
             media_type = "video"
             media_path = build_public_url(final_path)
             logger.debug(
@@ -1308,11 +1553,12 @@ async def visit_export_handler(callback: CallbackQuery, **data):
     export_dir.mkdir(parents=True, exist_ok=True)
     today_suffix = datetime.now().strftime("%Y-%m-%d")
     file_path = export_dir / f"visits_{today_suffix}.xlsx"
-    await export_visits_to_excel(visits, file_path)
-    await callback.message.answer_document(
-        BufferedInputFile(file_path.read_bytes(), filename=file_path.name),
-        caption="Выгрузка всех визитов",
-    )
+    with cache_manager.pin(file_path):
+        await export_visits_to_excel(visits, file_path)
+        await callback.message.answer_document(
+            BufferedInputFile(file_path.read_bytes(), filename=file_path.name),
+            caption="Выгрузка всех визитов",
+        )
     await callback.answer()
     logger.info(
         "Все визиты выгружены пользователем @%s",
@@ -1354,7 +1600,9 @@ async def select_exam_record(callback: CallbackQuery, state: FSMContext, **data)
                 ),
             )
             logger.warning(
-                f"Запись экзамена ID {exam_id} не найдена для @{callback.from_user.username}"
+                "Запись экзамена ID %s не найдена для @%s",
+                exam_id,
+                callback.from_user.username,
             )
             return
     await state.update_data(
@@ -1380,7 +1628,7 @@ async def select_exam_record(callback: CallbackQuery, state: FSMContext, **data)
     )
     await state.set_state(AdminResponse.exam_video)
     logger.debug(
-        f"Выбрана запись экзамена ID {exam_id} для @{callback.from_user.username}"
+        "Выбрана запись экзамена ID %s для @%s", exam_id, callback.from_user.username
     )
 
 
@@ -1399,7 +1647,8 @@ async def new_exam_record(callback: CallbackQuery, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_military_unit)
     logger.debug(
-        f"Администратор @{(callback.from_user.username or 'неизвестно')} выбрал создание новой записи экзамена"
+        "Администратор @%s выбрал создание новой записи экзамена",
+        callback.from_user.username or 'неизвестно',
     )
 
 
@@ -1409,7 +1658,9 @@ async def exam_menu_prompt(callback: CallbackQuery, **data):
         return
     await callback.message.edit_text("Меню экзаменов:", reply_markup=get_exam_menu())
     logger.debug(
-        f"Пользователь @{callback.from_user.username} (ID: {callback.from_user.id}) запросил меню экзаменов"
+        "Пользователь @%s (ID: %s) запросил меню экзаменов",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -1640,7 +1891,9 @@ async def take_exam_prompt(callback: CallbackQuery, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_fio)
     logger.debug(
-        f"Пользователь @{callback.from_user.username} (ID: {callback.from_user.id}) начал процесс принятия экзамена"
+        "Пользователь @%s (ID: %s) начал процесс принятия экзамена",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -1660,7 +1913,10 @@ async def process_exam_fio(message: Message, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_personal_number)
     logger.debug(
-        f"ФИО {fio} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "ФИО %s принято от @%s (ID: %s)",
+        fio,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -1702,7 +1958,10 @@ async def process_personal_number(
         return
     await state.update_data(personal_number=personal_number)
     logger.debug(
-        f"Личный номер {personal_number} сохранён в состоянии для @{message.from_user.username} (ID: {message.from_user.id})"
+        "Личный номер %s сохранён в состоянии для @%s (ID: %s)",
+        personal_number,
+        message.from_user.username,
+        message.from_user.id,
     )
     async with db_pool.acquire() as conn:
         records = await get_exam_records_by_personal_number(personal_number)
@@ -1733,7 +1992,10 @@ async def process_personal_number(
                 reply_markup=keyboard,
             )
             logger.debug(
-                f"Найдено {len(records)} записей для личного номера {personal_number} от @{message.from_user.username}"
+                "Найдено %s записей для личного номера %s от @%s",
+                len(records),
+                personal_number,
+                message.from_user.username,
             )
         else:
             await message.answer(
@@ -1750,16 +2012,20 @@ async def process_personal_number(
             )
             await state.set_state(AdminResponse.exam_military_unit)
             logger.debug(
-                f"Записей для личного номера {personal_number} не найдено, продолжаем ввод данных для @{message.from_user.username}"
+                "Записей для личного номера %s не найдено, продолжаем ввод данных для @%s",
+                personal_number,
+                message.from_user.username,
             )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с личным номером удалено для @{message.from_user.username}"
+            "Сообщение с личным номером удалено для @%s", message.from_user.username
         )
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка удаления сообщения с личным номером для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с личным номером для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -1790,7 +2056,10 @@ async def process_exam_military_unit(message: Message, state: FSMContext, **data
     )
     await state.set_state(AdminResponse.exam_subdivision)
     logger.debug(
-        f"В/Ч {military_unit} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "В/Ч %s принято от @%s (ID: %s)",
+        military_unit,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -1821,7 +2090,10 @@ async def process_exam_subdivision(message: Message, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_callsign)
     logger.debug(
-        f"Подразделение {subdivision} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Подразделение %s принято от @%s (ID: %s)",
+        subdivision,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -1852,7 +2124,10 @@ async def process_exam_callsign(message: Message, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_specialty)
     logger.debug(
-        f"Позывной {callsign} принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Позывной %s принят от @%s (ID: %s)",
+        callsign,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -1927,7 +2202,10 @@ async def process_exam_contact(message: Message, state: FSMContext, **data):
         await message.answer("Выберите учебный центр:", reply_markup=keyboard)
     await state.set_state(AdminResponse.exam_training_center)
     logger.debug(
-        f"Контакт {contact} принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Контакт %s принят от @%s (ID: %s)",
+        contact,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -1954,7 +2232,9 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
                 ),
             )
             logger.warning(
-                f"Видео слишком большое ({message.video.file_size} байт) от @{message.from_user.username}"
+                "Видео слишком большое (%s байт) от @%s",
+                message.video.file_size,
+                message.from_user.username,
             )
             await state.clear()
             return
@@ -1963,7 +2243,8 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
         state_data = await state.get_data()
         if "training_center_id" not in state_data:
             logger.error(
-                f"training_center_id отсутствует в состоянии для @{message.from_user.username}"
+                "training_center_id отсутствует в состоянии для @%s",
+                message.from_user.username,
             )
             await message.answer(
                 "Ошибка: не выбран учебный центр.",
@@ -1980,37 +2261,51 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
             await state.clear()
             return
 
-        download_result = await download_from_local_api(
-            file_id=message.video.file_id,
-            token=TOKEN,
-            base_dir=LOCAL_BOT_API_CACHE_DIR,
-        )
-        local_path = download_result.local_path
-        progress_message = await message.answer(
-            "Видео получено. Выполняется сжатие, это может занять несколько минут..."
+        job = None
+        compressed_path = await _reuse_cached_transcode(
+            message.video.file_unique_id, Path(LOCAL_BOT_API_CACHE_DIR)
         )
-        try:
-            compressed_path = await compress_video(local_path)
-        except Exception:
-            if progress_message:
-                try:
-                    await progress_message.edit_text(
-                        "Не удалось сжать видео, используем исходный файл."
-                    )
-                except TelegramBadRequest:
-                    pass
-            raise
+        if compressed_path is not None:
+            await message.answer("Это видео уже было сжато ранее, используем готовый файл.")
         else:
-            if progress_message:
-                try:
-                    if Path(compressed_path) == Path(local_path):
+            download_result = await download_from_local_api(
+                file_id=message.video.file_id,
+                token=TOKEN,
+                base_dir=LOCAL_BOT_API_CACHE_DIR,
+            )
+            local_path = download_result.local_path
+            job, progress_message = await _submit_transcode(
+                message, local_path, priority=PRIORITY_HIGH
+            )
+            try:
+                compressed_path = await _await_transcode(job, progress_message)
+            except TranscodeCancelled:
+                await _cleanup_source_file(Path(local_path))
+                await message.answer(
+                    "Сжатие отменено. Отправьте видео экзамена заново.",
+                    reply_markup=_exam_back_markup(),
+                )
+                return
+            except Exception:
+                if progress_message:
+                    try:
                         await progress_message.edit_text(
-                            "Сжатие не потребовалось, используем исходный файл."
+                            "Не удалось сжать видео, используем исходный файл."
                         )
-                    else:
-                        await progress_message.edit_text("Сжатие завершено ✅")
-                except TelegramBadRequest:
-                    pass
+                    except TelegramBadRequest:
+                        pass
+                raise
+            else:
+                if progress_message:
+                    try:
+                        if not job.encoded:
+                            await progress_message.edit_text(
+                                "Сжатие не потребовалось, используем исходный файл."
+                            )
+                        else:
+                            await progress_message.edit_text("Сжатие завершено ✅")
+                    except TelegramBadRequest:
+                        pass
         fio = state_data.get("fio", "")
         training_center_id = state_data.get("training_center_id")
         training_center_name = await _resolve_training_center_name(
@@ -2026,6 +2321,16 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
         final_path = _ensure_unique_media_path(Path(EXAM_VIDEOS_DIR), base_name, suffix)
         final_path.parent.mkdir(parents=True, exist_ok=True)
         compressed_file.replace(final_path)
+        # job нет, если файл взят из кеша; исходник, возвращённый без сжатия
+        # (не потребовалось или ffmpeg упал), не кешируем
+        if job is None or job.encoded:
+            await _remember_transcode(
+                message.video.file_unique_id,
+                final_path,
+                source_size=message.video.file_size,
+                job=job,
+            )
+        _schedule_video_derivatives(final_path)
 
         public_url = build_public_url(final_path)
 
@@ -2043,7 +2348,11 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
             ),
         )
         logger.debug(
-            f"Видео принято от @{message.from_user.username} (ID: {message.from_user.id}), file_id: {message.video.file_id}, сохранено как {final_path.name}"
+            "Видео принято от @%s (ID: %s), file_id: %s, сохранено как %s",
+            message.from_user.username,
+            message.from_user.id,
+            message.video.file_id,
+            final_path.name,
         )
         await state.set_state(AdminResponse.exam_photo)
     except LocalBotAPIConfigurationError as config_error:
@@ -2063,7 +2372,7 @@ async def process_exam_video(message: Message, state: FSMContext, bot: Bot, **da
         )
         await state.clear()
     except Exception as e:
-        logger.error(f"Ошибка обработки видео от @{message.from_user.username}: {e}")
+        logger.error("Ошибка обработки видео от @%s: %s", message.from_user.username, e)
         await message.answer(
             f"Ошибка сервера: {str(e)}. Попробуйте позже.",
             reply_markup=InlineKeyboardMarkup(
@@ -2121,7 +2430,10 @@ async def process_exam_photo(message: Message, state: FSMContext, **data):
                 ),
             )
             logger.debug(
-                f"Фото добавлено для экзамена от @{message.from_user.username} (ID: {message.from_user.id}), сохранено как {final_path.name}"
+                "Фото добавлено для экзамена от @%s (ID: %s), сохранено как %s",
+                message.from_user.username,
+                message.from_user.id,
+                final_path.name,
             )
         except LocalBotAPIConfigurationError as config_error:
             logger.error(
@@ -2164,7 +2476,7 @@ async def process_exam_photo(message: Message, state: FSMContext, **data):
             ),
         )
         logger.warning(
-            f"Некорректный ввод фото для экзамена от @{message.from_user.username}"
+            "Некорректный ввод фото для экзамена от @%s", message.from_user.username
         )
 
 
@@ -2173,7 +2485,9 @@ async def process_exam_photo(message: Message, state: FSMContext, **data):
 )
 async def process_training_center(callback: CallbackQuery, state: FSMContext, **data):
     logger.debug(
-        f"Обработка select_center_ в admin_panel.py для @{callback.from_user.username} (ID: {callback.from_user.id})"
+        "Обработка select_center_ в admin_panel.py для @%s (ID: %s)",
+        callback.from_user.username,
+        callback.from_user.id,
     )
     db_pool = data.get("db_pool")
     if not db_pool:
@@ -2198,12 +2512,14 @@ async def process_training_center(callback: CallbackQuery, state: FSMContext, **
         )
         if not is_admin:
             logger.debug(
-                f"Пропускаем select_center_ для не-администратора @{username} (ID: {user_id})"
+                "Пропускаем select_center_ для не-администратора @%s (ID: %s)",
+                username,
+                user_id,
             )
             await callback.answer()
             return  # Пропускаем для не-админов
     if not hasattr(callback, "message") or not callback.message:
-        logger.error(f"CallbackQuery без сообщения для @{username} (ID: {user_id})")
+        logger.error("CallbackQuery без сообщения для @%s (ID: %s)", username, user_id)
         await callback.answer("Ошибка: сообщение не найдено.", show_alert=True)
         return
     training_center_id = int(callback.data.split("_")[-1])
@@ -2227,7 +2543,10 @@ async def process_training_center(callback: CallbackQuery, state: FSMContext, **
     )
     await state.set_state(AdminResponse.exam_video)
     logger.debug(
-        f"Учебный центр ID {training_center_id} выбран пользователем @{username} (ID: {user_id})"
+        "Учебный центр ID %s выбран пользователем @%s (ID: %s)",
+        training_center_id,
+        username,
+        user_id,
     )
     await callback.answer()
 
@@ -2254,7 +2573,7 @@ async def finish_exam(callback: CallbackQuery, state: FSMContext, **data):
         missing_fields = [field for field in required_fields if field not in state_data]
         if missing_fields:
             logger.error(
-                f"Недостаточно данных для сохранения экзамена: {missing_fields}"
+                "Недостаточно данных для сохранения экзамена: %s", missing_fields
             )
             await callback.message.edit_text(
                 f"Ошибка: отсутствуют данные ({', '.join(missing_fields)}).",
@@ -2320,11 +2639,14 @@ async def finish_exam(callback: CallbackQuery, state: FSMContext, **data):
             ),
         )
         logger.info(
-            f"Экзамен №{exam_id} {result_text} пользователем @{callback.from_user.username}"
+            "Экзамен №%s %s пользователем @%s",
+            exam_id,
+            result_text,
+            callback.from_user.username,
         )
         await state.clear()
     except Exception as e:
-        logger.error(f"Ошибка сохранения экзамена: {e}")
+        logger.error("Ошибка сохранения экзамена: %s", e)
         await callback.message.edit_text(
             f"Ошибка сервера: {str(e)}. Попробуйте позже.",
             reply_markup=InlineKeyboardMarkup(
@@ -2348,7 +2670,8 @@ async def change_code_word_prompt(callback: CallbackQuery, state: FSMContext):
             ),
         )
         logger.warning(
-            f"Попытка изменения кодового слова от неадминистратора @{callback.from_user.username}"
+            "Попытка изменения кодового слова от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     await callback.message.edit_text(
@@ -2361,7 +2684,9 @@ async def change_code_word_prompt(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(AdminResponse.change_code_word)
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {callback.from_user.id}) запросил изменение кодового слова"
+        "Администратор @%s (ID: %s) запросил изменение кодового слова",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -2378,7 +2703,9 @@ async def process_code_word(message: Message, state: FSMContext):
         ),
     )
     logger.info(
-        f"Кодовое слово обновлено администратором @{message.from_user.username} (ID: {message.from_user.id})"
+        "Кодовое слово обновлено администратором @%s (ID: %s)",
+        message.from_user.username,
+        message.from_user.id,
     )
     await state.clear()
 
@@ -2395,7 +2722,8 @@ async def manage_training_centers_prompt(callback: CallbackQuery, state: FSMCont
             ),
         )
         logger.warning(
-            f"Попытка управления УТЦ от неадминистратора @{callback.from_user.username}"
+            "Попытка управления УТЦ от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     centers = await get_training_centers()
@@ -2403,7 +2731,9 @@ async def manage_training_centers_prompt(callback: CallbackQuery, state: FSMCont
         "Управление УТЦ:", reply_markup=get_training_centers_menu(centers)
     )
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {callback.from_user.id}) запросил управление УТЦ"
+        "Администратор @%s (ID: %s) запросил управление УТЦ",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -2419,7 +2749,8 @@ async def add_training_center_prompt(callback: CallbackQuery, state: FSMContext)
             ),
         )
         logger.warning(
-            f"Попытка добавления УТЦ от неадминистратора @{callback.from_user.username}"
+            "Попытка добавления УТЦ от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     await callback.message.edit_text(
@@ -2436,7 +2767,9 @@ async def add_training_center_prompt(callback: CallbackQuery, state: FSMContext)
     )
     await state.set_state(AdminResponse.add_training_center_name)
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {callback.from_user.id}) запросил добавление УТЦ"
+        "Администратор @%s (ID: %s) запросил добавление УТЦ",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -2458,7 +2791,10 @@ async def process_training_center_name(message: Message, state: FSMContext):
     )
     await state.set_state(AdminResponse.add_training_center_link)
     logger.debug(
-        f"Название УТЦ {center_name} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Название УТЦ %s принято от @%s (ID: %s)",
+        center_name,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -2481,7 +2817,10 @@ async def process_training_center_link(message: Message, state: FSMContext):
         ),
     )
     logger.info(
-        f"УТЦ {center_name} добавлен администратором @{message.from_user.username} (ID: {message.from_user.id})"
+        "УТЦ %s добавлен администратором @%s (ID: %s)",
+        center_name,
+        message.from_user.username,
+        message.from_user.id,
     )
     await state.clear()
 
@@ -2504,7 +2843,10 @@ async def edit_training_center_prompt(callback: CallbackQuery, state: FSMContext
     await state.set_state(AdminResponse.edit_training_center_link)
     await state.update_data(center_id=center_id)
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {callback.from_user.id}) запросил редактирование УТЦ ID {center_id}"
+        "Администратор @%s (ID: %s) запросил редактирование УТЦ ID %s",
+        callback.from_user.username,
+        callback.from_user.id,
+        center_id,
     )
 
 
@@ -2527,7 +2869,10 @@ async def process_edit_training_center_link(message: Message, state: FSMContext)
         ),
     )
     logger.info(
-        f"Ссылка на чат УТЦ ID {center_id} обновлена администратором @{message.from_user.username} (ID: {message.from_user.id})"
+        "Ссылка на чат УТЦ ID %s обновлена администратором @%s (ID: %s)",
+        center_id,
+        message.from_user.username,
+        message.from_user.id,
     )
     await state.clear()
 
@@ -2554,7 +2899,8 @@ async def show_stats(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка доступа к статистике от неадминистратора @{callback.from_user.username}"
+            "Попытка доступа к статистике от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     async with db_pool.acquire() as conn:
@@ -2571,7 +2917,7 @@ async def show_stats(callback: CallbackQuery, **data):
         await callback.message.edit_text(
             "Нет данных по заявкам или сотрудникам.", reply_markup=keyboard
         )
-        logger.info(f"Статистика пуста, запрос от @{callback.from_user.username}")
+        logger.info("Статистика пуста, запрос от @%s", callback.from_user.username)
         return
     response = "Статистика заявок:\n"
     for count in status_counts:
@@ -2588,7 +2934,7 @@ async def show_stats(callback: CallbackQuery, **data):
         ]
     )
     await callback.message.edit_text(response, reply_markup=keyboard)
-    logger.info(f"Статистика запрошена пользователем @{callback.from_user.username}")
+    logger.info("Статистика запрошена пользователем @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data == "add_employee")
@@ -2601,7 +2947,8 @@ async def add_employee_prompt(callback: CallbackQuery, state: FSMContext):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка добавления сотрудника от неадминистратора @{callback.from_user.username}"
+            "Попытка добавления сотрудника от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -2615,7 +2962,7 @@ async def add_employee_prompt(callback: CallbackQuery, state: FSMContext):
         reply_markup=keyboard,
     )
     await state.set_state(AdminResponse.add_employee)
-    logger.debug(f"Запрос добавления сотрудника от @{callback.from_user.username}")
+    logger.debug("Запрос добавления сотрудника от @%s", callback.from_user.username)
 
 
 @router.message(StateFilter(AdminResponse.add_employee))
@@ -2640,7 +2987,8 @@ async def process_add_employee(message: Message, state: FSMContext, **data):
         )
         await message.answer("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка добавления сотрудника от неадминистратора @{message.from_user.username}"
+            "Попытка добавления сотрудника от неадминистратора @%s",
+            message.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -2660,18 +3008,23 @@ async def process_add_employee(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.info(
-            f"Сотрудник {'@' + username if username else 'без username'} (ID: {admin_id}) добавлен пользователям @{message.from_user.username}"
+            "Сотрудник %s (ID: %s) добавлен пользователям @%s",
+            '@' + username if username else 'без username',
+            admin_id,
+            message.from_user.username,
         )
         await state.clear()
     except ValueError as e:
         await message.answer(f"Ошибка: {str(e)}", reply_markup=keyboard)
         logger.error(
-            f"Неверный формат ввода сотрудника {message.text} от @{message.from_user.username}"
+            "Неверный формат ввода сотрудника %s от @%s",
+            message.text,
+            message.from_user.username,
         )
     except Exception as e:
         await message.answer(f"Ошибка: {str(e)}", reply_markup=keyboard)
         logger.error(
-            f"Ошибка добавления сотрудника: {str(e)} от @{message.from_user.username}"
+            "Ошибка добавления сотрудника: %s от @%s", e, message.from_user.username
         )
 
 
@@ -2685,7 +3038,8 @@ async def add_channel_prompt(callback: CallbackQuery, state: FSMContext):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка добавления канала от неадминистратора @{callback.from_user.username}"
+            "Попытка добавления канала от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -2698,7 +3052,7 @@ async def add_channel_prompt(callback: CallbackQuery, state: FSMContext):
         reply_markup=keyboard,
     )
     await state.set_state(AdminResponse.add_channel)
-    logger.debug(f"Запрос добавления канала от @{callback.from_user.username}")
+    logger.debug("Запрос добавления канала от @%s", callback.from_user.username)
 
 
 @router.message(StateFilter(AdminResponse.add_channel))
@@ -2723,7 +3077,8 @@ async def process_add_channel(message: Message, state: FSMContext, **data):
         )
         await message.answer("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка добавления канала от неадминистратора @{message.from_user.username}"
+            "Попытка добавления канала от неадминистратора @%s",
+            message.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -2749,7 +3104,9 @@ async def process_add_channel(message: Message, state: FSMContext, **data):
                 reply_markup=keyboard,
             )
             logger.error(
-                f"Бот не является администратором в канале {channel_name} при добавлении от @{message.from_user.username}"
+                "Бот не является администратором в канале %s при добавлении от @%s",
+                channel_name,
+                message.from_user.username,
             )
             return
         try:
@@ -2763,7 +3120,10 @@ async def process_add_channel(message: Message, state: FSMContext, **data):
                 "Канал/группа недоступна или topic_id неверный.", reply_markup=keyboard
             )
             logger.error(
-                f"Неверный topic_id {topic_id} для канала {channel_name} от @{message.from_user.username}"
+                "Неверный topic_id %s для канала %s от @%s",
+                topic_id,
+                channel_name,
+                message.from_user.username,
             )
             return
         await add_notification_channel(channel_id, channel_name, topic_id)
@@ -2772,18 +3132,24 @@ async def process_add_channel(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.info(
-            f"Канал/группа {channel_name} (ID: {channel_id}, topic_id: {topic_id}) добавлена пользователем @{message.from_user.username}"
+            "Канал/группа %s (ID: %s, topic_id: %s) добавлена пользователем @%s",
+            channel_name,
+            channel_id,
+            topic_id,
+            message.from_user.username,
         )
         await state.clear()
     except ValueError as e:
         await message.answer(f"Ошибка: {str(e)}", reply_markup=keyboard)
         logger.error(
-            f"Неверный формат ввода канала {message.text} от @{message.from_user.username}"
+            "Неверный формат ввода канала %s от @%s",
+            message.text,
+            message.from_user.username,
         )
     except Exception as e:
         await message.answer(f"Ошибка: {str(e)}", reply_markup=keyboard)
         logger.error(
-            f"Ошибка добавления канала: {str(e)} от @{message.from_user.username}"
+            "Ошибка добавления канала: %s от @%s", e, message.from_user.username
         )
 
 
@@ -2809,7 +3175,8 @@ async def remove_channel_prompt(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка удаления канала от неадминистратора @{callback.from_user.username}"
+            "Попытка удаления канала от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     channels = await get_notification_channels()
@@ -2823,14 +3190,14 @@ async def remove_channel_prompt(callback: CallbackQuery, **data):
             "Нет каналов/групп для уведомлений.", reply_markup=keyboard
         )
         logger.info(
-            f"Нет каналов для удаления, запрос от @{callback.from_user.username}"
+            "Нет каналов для удаления, запрос от @%s", callback.from_user.username
         )
         return
     await callback.message.edit_text(
         "Выберите канал/группу для удаления:",
         reply_markup=get_remove_channel_menu(channels),
     )
-    logger.debug(f"Запрос удаления канала от @{callback.from_user.username}")
+    logger.debug("Запрос удаления канала от @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data.startswith("remove_channel_"))
@@ -2855,18 +3222,12 @@ async def process_remove_channel(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка удаления канала от неадминистратора @{callback.from_user.username}"
+            "Попытка удаления канала от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     channel_id = int(callback.data.split("_")[-1])
-    async with db_pool.acquire() as conn:
-        channel_name = await conn.fetchval(
-            "SELECT channel_name FROM notification_channels WHERE channel_id = $1",
-            channel_id,
-        )
-        await conn.execute(
-            "DELETE FROM notification_channels WHERE channel_id = $1", channel_id
-        )
+    channel_name = await delete_notification_channel(channel_id)
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")]
@@ -2876,7 +3237,10 @@ async def process_remove_channel(callback: CallbackQuery, **data):
         "Канал/группа удалена из списка уведомлений.", reply_markup=keyboard
     )
     logger.info(
-        f"Канал/группа {channel_name} (ID: {channel_id}) удалена пользователем @{callback.from_user.username}"
+        "Канал/группа %s (ID: %s) удалена пользователем @%s",
+        channel_name,
+        channel_id,
+        callback.from_user.username,
     )
 
 
@@ -2902,7 +3266,8 @@ async def edit_channel_prompt(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка редактирования канала от неадминистратора @{callback.from_user.username}"
+            "Попытка редактирования канала от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     channels = await get_notification_channels()
@@ -2916,14 +3281,14 @@ async def edit_channel_prompt(callback: CallbackQuery, **data):
             "Нет каналов/групп для редактирования.", reply_markup=keyboard
         )
         logger.info(
-            f"Нет каналов для редактирования, запрос от @{callback.from_user.username}"
+            "Нет каналов для редактирования, запрос от @%s", callback.from_user.username
         )
         return
     await callback.message.edit_text(
         "Выберите канал/группу для редактирования:",
         reply_markup=get_edit_channel_menu(channels),
     )
-    logger.debug(f"Запрос редактирования канала от @{callback.from_user.username}")
+    logger.debug("Запрос редактирования канала от @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data.startswith("edit_channel_"))
@@ -2936,7 +3301,8 @@ async def process_edit_channel_prompt(callback: CallbackQuery, state: FSMContext
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка редактирования канала от неадминистратора @{callback.from_user.username}"
+            "Попытка редактирования канала от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     channel_id = int(callback.data.split("_")[-1])
@@ -2952,7 +3318,9 @@ async def process_edit_channel_prompt(callback: CallbackQuery, state: FSMContext
     )
     await state.set_state(AdminResponse.edit_channel)
     logger.debug(
-        f"Запрос редактирования topic_id для канала ID {channel_id} от @{callback.from_user.username}"
+        "Запрос редактирования topic_id для канала ID %s от @%s",
+        channel_id,
+        callback.from_user.username,
     )
 
 
@@ -2978,7 +3346,8 @@ async def process_edit_channel(message: Message, state: FSMContext, **data):
         )
         await message.answer("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка редактирования канала от неадминистратора @{message.from_user.username}"
+            "Попытка редактирования канала от неадминистратора @%s",
+            message.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -2995,31 +3364,34 @@ async def process_edit_channel(message: Message, state: FSMContext, **data):
                 "SELECT channel_name FROM notification_channels WHERE channel_id = $1",
                 channel_id,
             )
-            try:
-                await message.bot.send_message(
-                    chat_id=channel_id,
-                    message_thread_id=topic_id,
-                    text="Тестовое сообщение",
-                )
-            except TelegramBadRequest:
-                await message.answer(
-                    "Неверный topic_id или канал/группа недоступна.",
-                    reply_markup=keyboard,
-                )
-                logger.error(
-                    f"Неверный topic_id {topic_id} для канала {channel_name} от @{message.from_user.username}"
-                )
-                return
-            await conn.execute(
-                "UPDATE notification_channels SET topic_id = $1 WHERE channel_id = $2",
+        try:
+            await message.bot.send_message(
+                chat_id=channel_id,
+                message_thread_id=topic_id,
+                text="Тестовое сообщение",
+            )
+        except TelegramBadRequest:
+            await message.answer(
+                "Неверный topic_id или канал/группа недоступна.",
+                reply_markup=keyboard,
+            )
+            logger.error(
+                "Неверный topic_id %s для канала %s от @%s",
                 topic_id,
-                channel_id,
+                channel_name,
+                message.from_user.username,
             )
+            return
+        await update_notification_channel_topic(channel_id, topic_id)
         await message.answer(
             f"Канал/группа {channel_name} обновлена.", reply_markup=keyboard
         )
         logger.info(
-            f"Канал/группа {channel_name} (ID: {channel_id}) обновлена с topic_id {topic_id} пользователем @{message.from_user.username}"
+            "Канал/группа %s (ID: %s) обновлена с topic_id %s пользователем @%s",
+            channel_name,
+            channel_id,
+            topic_id,
+            message.from_user.username,
         )
         await state.clear()
     except ValueError:
@@ -3028,12 +3400,18 @@ async def process_edit_channel(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.error(
-            f"Неверный формат topic_id {message.text} для канала ID {channel_id} от @{message.from_user.username}"
+            "Неверный формат topic_id %s для канала ID %s от @%s",
+            message.text,
+            channel_id,
+            message.from_user.username,
         )
     except Exception as e:
         await message.answer(f"Ошибка: {str(e)}", reply_markup=keyboard)
         logger.error(
-            f"Ошибка редактирования канала: {str(e)} для канала ID {channel_id} от @{message.from_user.username}"
+            "Ошибка редактирования канала: %s для канала ID %s от @%s",
+            e,
+            channel_id,
+            message.from_user.username,
         )
 
 
@@ -3059,7 +3437,8 @@ async def check_employee_appeals(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка проверки заявок сотрудников от неадминистратора @{callback.from_user.username}"
+            "Попытка проверки заявок сотрудников от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     admins = await get_admins()
@@ -3073,14 +3452,16 @@ async def check_employee_appeals(callback: CallbackQuery, **data):
             "Список сотрудников пуст.", reply_markup=keyboard
         )
         logger.info(
-            f"Нет сотрудников для проверки, запрос от @{callback.from_user.username}"
+            "Нет сотрудников для проверки, запрос от @%s", callback.from_user.username
         )
         return
     await callback.message.edit_text(
         "Выберите сотрудника для проверки заявок:",
         reply_markup=get_employee_list_menu(admins),
     )
-    logger.info(f"Запрос проверки заявок сотрудников от @{callback.from_user.username}")
+    logger.info(
+        "Запрос проверки заявок сотрудников от @%s", callback.from_user.username
+    )
 
 
 @router.callback_query(F.data.startswith("view_employee_appeals_"))
@@ -3117,7 +3498,9 @@ async def view_employee_appeals(callback: CallbackQuery, state: FSMContext, **da
             ),
         )
         logger.info(
-            f"Нет заявок для сотрудника ID {admin_id} по запросу от @{callback.from_user.username}"
+            "Нет заявок для сотрудника ID %s по запросу от @%s",
+            admin_id,
+            callback.from_user.username,
         )
         return
     keyboard = get_my_appeals_menu(
@@ -3129,7 +3512,9 @@ async def view_employee_appeals(callback: CallbackQuery, state: FSMContext, **da
     )
     await state.update_data(admin_id=admin_id, appeals=appeals, total=total, page=0)
     logger.info(
-        f"Показана страница 0 заявок сотрудника ID {admin_id} пользователю @{callback.from_user.username}"
+        "Показана страница 0 заявок сотрудника ID %s пользователю @%s",
+        admin_id,
+        callback.from_user.username,
     )
     await callback.answer()
 
@@ -3146,7 +3531,7 @@ async def export_defect_reports_prompt(callback: CallbackQuery, state: FSMContex
         reply_markup=keyboard,
     )
     await state.set_state(AdminResponse.report_serial_from)
-    logger.debug(f"Запрос выгрузки отчётов от @{callback.from_user.username}")
+    logger.debug("Запрос выгрузки отчётов от @%s", callback.from_user.username)
 
 
 @router.message(StateFilter(AdminResponse.report_serial_from))
@@ -3177,7 +3562,7 @@ async def process_report_serial_from(message: Message, state: FSMContext, **data
     await state.clear()
     await process_export_defect_reports(message, state, db_pool=db_pool)
     logger.debug(
-        f"Диапазон серийных номеров введён: {text} от @{message.from_user.username}"
+        "Диапазон серийных номеров введён: %s от @%s", text, message.from_user.username
     )
 
 
@@ -3209,7 +3594,11 @@ async def process_export_defect_reports(message: Message, state: FSMContext, **d
             "Нет отчётов для указанного диапазона/номера.", reply_markup=keyboard
         )
         logger.warning(
-            f"Нет отчётов для диапазона {serial_from}-{serial_to} или номера {serial}, запрос от @{message.from_user.username}"
+            "Нет отчётов для диапазона %s-%s или номера %s, запрос от @%s",
+            serial_from,
+            serial_to,
+            serial,
+            message.from_user.username,
         )
         return
     data = []
@@ -3231,6 +3620,7 @@ async def process_export_defect_reports(message: Message, state: FSMContext, **d
         ]
         photo_links = [link for link in photo_links if link]
         video_links = [link for link in video_links if link]
+        poster_links, preview_links = video_derivative_links(video_links)
         data.append(
             {
                 "Старый серийный номер": report["serial"],
@@ -3245,6 +3635,8 @@ async def process_export_defect_reports(message: Message, state: FSMContext, **d
                 "Сотрудник ID": report["employee_id"],
                 "Фото": ", ".join(photo_links),
                 "Видео": ", ".join(video_links),
+                "Постер видео": poster_links,
+                "Превью видео": preview_links,
             }
         )
     df = pd.DataFrame(data)
@@ -3261,7 +3653,8 @@ async def process_export_defect_reports(message: Message, state: FSMContext, **d
         reply_markup=keyboard,
     )
     logger.info(
-        f"Выгрузка отчётов о неисправности выполнена пользователем @{message.from_user.username}"
+        "Выгрузка отчётов о неисправности выполнена пользователем @%s",
+        message.from_user.username,
     )
 
 
@@ -3279,7 +3672,8 @@ async def process_defect_serial(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Пустой серийный номер для отчёта о дефекте от @{message.from_user.username}"
+            "Пустой серийный номер для отчёта о дефекте от @%s",
+            message.from_user.username,
         )
         return
     data_state = await state.get_data()
@@ -3596,7 +3990,8 @@ async def process_defect_media(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Достигнуто максимальное количество медиа для отчёта о дефекте от @{message.from_user.username}"
+            "Достигнуто максимальное количество медиа для отчёта о дефекте от @%s",
+            message.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -3629,6 +4024,8 @@ async def process_defect_media(message: Message, state: FSMContext):
             final_path = _ensure_unique_media_path(target_dir, indexed_base, suffix)
             final_path.parent.mkdir(parents=True, exist_ok=True)
             source_path.replace(final_path)
+            if media_type != "photo":
+                _schedule_video_derivatives(final_path)
             public_url = build_public_url(final_path)
             media_links.append({"type": media_type, "url": public_url})
             await state.update_data(media_links=media_links)
@@ -3671,7 +4068,8 @@ async def process_defect_media(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Неподдерживаемый формат медиа для отчёта о дефекте от @{message.from_user.username}"
+            "Неподдерживаемый формат медиа для отчёта о дефекте от @%s",
+            message.from_user.username,
         )
 
 
@@ -3691,7 +4089,7 @@ async def skip_exam_video(callback: CallbackQuery, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.exam_photo)
     await state.update_data(photo_links=[])
-    logger.debug(f"Видео пропущено для экзамена от @{callback.from_user.username}")
+    logger.debug("Видео пропущено для экзамена от @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data == "done_exam_photo")
@@ -3726,7 +4124,11 @@ async def skip_exam_photo(callback: CallbackQuery, state: FSMContext, **data):
     )
     await callback.message.edit_text(text, reply_markup=keyboard)
     logger.debug(
-        f"Предпросмотр экзамена: ФИО {fio}, видео {video_link}, фото {len(photo_links)} от @{callback.from_user.username}"
+        "Предпросмотр экзамена: ФИО %s, видео %s, фото %s от @%s",
+        fio,
+        video_link,
+        len(photo_links),
+        callback.from_user.username,
     )
 
 
@@ -3741,7 +4143,7 @@ async def cancel_exam(callback: CallbackQuery, state: FSMContext, **data):
         ]
     )
     await callback.message.edit_text("Приём экзамена отменён.", reply_markup=keyboard)
-    logger.info(f"Приём экзамена отменён пользователем @{callback.from_user.username}")
+    logger.info("Приём экзамена отменён пользователем @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data == "submit_exam")
@@ -3823,7 +4225,7 @@ async def submit_exam(callback: CallbackQuery, state: FSMContext, **data):
         f"Экзамен №{exam_id} {result_text}.", reply_markup=keyboard
     )
     logger.info(
-        f"Экзамен №{exam_id} {result_text} от @{callback.from_user.username}"
+        "Экзамен №%s %s от @%s", exam_id, result_text, callback.from_user.username
     )
     await state.clear()
 
@@ -3853,7 +4255,8 @@ async def export_exams_handler(callback: CallbackQuery, **data):
         await callback.message.delete()
         await callback.message.answer("Нет данных для выгрузки.", reply_markup=keyboard)
         logger.warning(
-            f"Нет данных для выгрузки экзаменов, запрос от @{callback.from_user.username}"
+            "Нет данных для выгрузки экзаменов, запрос от @%s",
+            callback.from_user.username,
         )
         return
     data = []
@@ -3933,6 +4336,7 @@ async def export_exams_handler(callback: CallbackQuery, **data):
     for record in records:
         record_dict = dict(record)
         photo_links = json.loads(record_dict.get("photo_links") or "[]")
+        poster_links, preview_links = video_derivative_links([record_dict.get("video_link")])
         data.append(
             {
                 "ФИО": record_dict.get("fio"),
@@ -3944,6 +4348,10 @@ async def export_exams_handler(callback: CallbackQuery, **data):
                 "Контакт": format_contact_value(record_dict.get("contact")),
                 "УТЦ": record_dict.get("center_name") or "Отсутствует",
                 "Видео": record_dict.get("video_link") or "Отсутствует",
+                "Постер видео": poster_links or "Отсутствует",
+                "Превью видео": preview_links or "Отсутствует",
+                "HLS": video_derivative_urls(record_dict.get("video_link")).get("hls")
+                or "Отсутствует",
                 "Фото": ", ".join(photo_links) or "Отсутствует",
                 "Дата заявки": format_datetime(record_dict.get("application_date")),
                 "Дата приёма": format_datetime(record_dict.get("accepted_date")),
@@ -3975,7 +4383,7 @@ async def export_exams_handler(callback: CallbackQuery, **data):
         reply_markup=keyboard,
     )
     logger.info(
-        f"Выгрузка экзаменов выполнена пользователем @{callback.from_user.username}"
+        "Выгрузка экзаменов выполнена пользователем @%s", callback.from_user.username
     )
 
 
@@ -4005,7 +4413,9 @@ async def defect_menu_prompt(callback: CallbackQuery, **data):
             )
             await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
             logger.warning(
-                f"Попытка доступа к меню брака от неадминистратора @{callback.from_user.username} (ID {callback.from_user.id})"
+                "Попытка доступа к меню брака от неадминистратора @%s (ID %s)",
+                callback.from_user.username,
+                callback.from_user.id,
             )
             return
         if not admin_exists and callback.from_user.id in MAIN_ADMIN_IDS:
@@ -4013,7 +4423,9 @@ async def defect_menu_prompt(callback: CallbackQuery, **data):
                 callback.from_user.id, callback.from_user.username or "unknown"
             )
             logger.info(
-                f"Автоматически добавлен администратор ID {callback.from_user.id} (@{callback.from_user.username})"
+                "Автоматически добавлен администратор ID %s (@%s)",
+                callback.from_user.id,
+                callback.from_user.username,
             )
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
@@ -4031,7 +4443,7 @@ async def defect_menu_prompt(callback: CallbackQuery, **data):
         ]
     )
     await callback.message.edit_text("Меню ремонт/замена:", reply_markup=keyboard)
-    logger.debug(f"Открыто меню брака от @{callback.from_user.username}")
+    logger.debug("Открыто меню брака от @%s", callback.from_user.username)
 
 
 @router.callback_query(
@@ -4073,7 +4485,9 @@ async def manual_defect_prompt(callback: CallbackQuery, state: FSMContext, **dat
                 callback.from_user.id, callback.from_user.username or "unknown"
             )
             logger.info(
-                f"Автоматически добавлен администратор ID {callback.from_user.id} (@{callback.from_user.username})"
+                "Автоматически добавлен администратор ID %s (@%s)",
+                callback.from_user.id,
+                callback.from_user.username,
             )
     action = (
         "repair"
@@ -4154,7 +4568,9 @@ async def done_defect_media(callback: CallbackQuery, state: FSMContext, **data):
             if not admin_exists and employee_id in MAIN_ADMIN_IDS:
                 await add_admin(employee_id, callback.from_user.username or "unknown")
                 logger.info(
-                    f"Автоматически добавлен администратор ID {employee_id} (@{callback.from_user.username})"
+                    "Автоматически добавлен администратор ID %s (@%s)",
+                    employee_id,
+                    callback.from_user.username,
                 )
             elif not admin_exists:
                 await callback.message.edit_text(
@@ -4170,7 +4586,8 @@ async def done_defect_media(callback: CallbackQuery, state: FSMContext, **data):
                     ),
                 )
                 logger.warning(
-                    f"Попытка добавления отчёта о дефекте от незарегистрированного администратора ID {employee_id}"
+                    "Попытка добавления отчёта о дефекте от незарегистрированного администратора ID %s",
+                    employee_id,
                 )
                 return
             await add_defect_report(
@@ -4189,7 +4606,9 @@ async def done_defect_media(callback: CallbackQuery, state: FSMContext, **data):
             "Отчёт о дефекте сохранён.", reply_markup=keyboard
         )
         logger.info(
-            f"Отчёт о дефекте для серийника {serial} сохранён пользователем @{callback.from_user.username}"
+            "Отчёт о дефекте для серийника %s сохранён пользователем @%s",
+            serial,
+            callback.from_user.username,
         )
         await state.clear()
     except Exception as e:
@@ -4198,7 +4617,7 @@ async def done_defect_media(callback: CallbackQuery, state: FSMContext, **data):
             f"Ошибка сохранения отчёта: {str(e)}", reply_markup=keyboard
         )
         logger.error(
-            f"Ошибка сохранения отчёта о дефекте для серийника {serial}: {str(e)}"
+            "Ошибка сохранения отчёта о дефекте для серийника %s: %s", serial, e
         )
         await state.clear()
 
@@ -4248,7 +4667,10 @@ async def navigate_employee_appeals_page(
             "Нет заявок сотрудника.", reply_markup=keyboard
         )
         logger.info(
-            f"Нет заявок для сотрудника ID {admin_id} на странице {page} для @{callback.from_user.username}"
+            "Нет заявок для сотрудника ID %s на странице %s для @%s",
+            admin_id,
+            page,
+            callback.from_user.username,
         )
         return
     keyboard = get_my_appeals_menu(page_appeals, page, total)  # Используем напрямую
@@ -4258,6 +4680,9 @@ async def navigate_employee_appeals_page(
     )
     await state.update_data(page=page)
     logger.info(
-        f"Показана страница {page} заявок сотрудника ID {admin_id} пользователю @{callback.from_user.username}"
+        "Показана страница %s заявок сотрудника ID %s пользователю @%s",
+        page,
+        admin_id,
+        callback.from_user.username,
     )
     await callback.answer()
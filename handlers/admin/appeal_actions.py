@@ -62,7 +62,8 @@ async def show_my_appeals_page(
         )
         await message.answer("Нет назначенных заявок.", reply_markup=keyboard)
         logger.info(
-            f"Нет назначенных заявок для отображения пользователем @{message.from_user.username}"
+            "Нет назначенных заявок для отображения пользователем @%s",
+            message.from_user.username,
         )
         return
 
@@ -71,7 +72,10 @@ async def show_my_appeals_page(
     response = f"Мои заявки (страница {page + 1} из {total_pages})"
     await message.answer(response, reply_markup=keyboard)
     logger.info(
-        f"Показана страница {page} назначенных заявок пользователю @{message.from_user.username} (ID: {message.from_user.id})"
+        "Показана страница %s назначенных заявок пользователю @%s (ID: %s)",
+        page,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -102,7 +106,9 @@ async def process_response_prompt(callback: CallbackQuery, state: FSMContext, **
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     await state.update_data(appeal_id=appeal_id, media_files=[])
@@ -120,7 +126,9 @@ async def process_response_prompt(callback: CallbackQuery, state: FSMContext, **
         ),
     )
     logger.info(
-        f"Запрос ответа для заявки №{appeal_id} от пользователя @{callback.from_user.username}"
+        "Запрос ответа для заявки №%s от пользователя @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -158,7 +166,9 @@ async def process_response(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Достигнуто максимальное количество файлов для @{username} (ID: {user_id})"
+            "Достигнуто максимальное количество файлов для @%s (ID: %s)",
+            username,
+            user_id,
         )
         return
     if message.photo:
@@ -168,7 +178,7 @@ async def process_response(message: Message, state: FSMContext, **data):
                 "Файл превышает 200 МБ. Приложите файл меньшего размера.",
                 reply_markup=keyboard,
             )
-            logger.warning(f"Файл превышает 200 МБ от @{username} (ID: {user_id})")
+            logger.warning("Файл превышает 200 МБ от @%s (ID: %s)", username, user_id)
             return
         media_files.append({"type": "photo", "file_id": message.photo[-1].file_id})
         await state.update_data(media_files=media_files)
@@ -176,14 +186,14 @@ async def process_response(message: Message, state: FSMContext, **data):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления медиафайла от @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка удаления медиафайла от @%s (ID: %s): %s", username, user_id, e
             )
         await message.answer(
             f"Медиа добавлено ({len(media_files)}/10). Прикрепите ещё или нажмите 'Готово':",
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа (photo) добавлен пользователем @{username} (ID: {user_id})"
+            "Медиа (photo) добавлен пользователем @%s (ID: %s)", username, user_id
         )
         return
     elif message.video:
@@ -193,7 +203,7 @@ async def process_response(message: Message, state: FSMContext, **data):
                 "Файл превышает 200 МБ. Прикрепите файл меньшего размера.",
                 reply_markup=keyboard,
             )
-            logger.warning(f"Файл превышает 200 МБ от @{username} (ID: {user_id})")
+            logger.warning("Файл превышает 200 МБ от @%s (ID: %s)", username, user_id)
             return
         media_files.append({"type": "video", "file_id": message.video.file_id})
         await state.update_data(media_files=media_files)
@@ -201,14 +211,14 @@ async def process_response(message: Message, state: FSMContext, **data):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления медиафайла от @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка удаления медиафайла от @%s (ID: %s): %s", username, user_id, e
             )
         await message.answer(
             f"Медиа добавлено ({len(media_files)}/10). Прикрепите ещё или нажмите 'Готово':",
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа (video) добавлен пользователем @{username} (ID: {user_id})"
+            "Медиа (video) добавлен пользователем @%s (ID: %s)", username, user_id
         )
         return
     elif message.video_note:
@@ -218,7 +228,7 @@ async def process_response(message: Message, state: FSMContext, **data):
                 "Файл превышает 200 МБ. Прикрепите файл меньшего размера.",
                 reply_markup=keyboard,
             )
-            logger.warning(f"Файл превышает 200 МБ от @{username} (ID: {user_id})")
+            logger.warning("Файл превышает 200 МБ от @%s (ID: %s)", username, user_id)
             return
         media_files.append(
             {"type": "video_note", "file_id": message.video_note.file_id}
@@ -228,14 +238,14 @@ async def process_response(message: Message, state: FSMContext, **data):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления медиафайла от @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка удаления медиафайла от @%s (ID: %s): %s", username, user_id, e
             )
         await message.answer(
             f"Медиа добавлено ({len(media_files)}/10). Прикрепите ещё или нажмите 'Готово':",
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа (video_note) добавлен пользователем @{username} (ID: {user_id})"
+            "Медиа (video_note) добавлен пользователем @%s (ID: %s)", username, user_id
         )
         return
     elif message.text:
@@ -254,7 +264,9 @@ async def process_response(message: Message, state: FSMContext, **data):
                     ]
                 ),
             )
-            logger.warning(f"Заявка №{appeal_id} не найдена пользователем @{username}")
+            logger.warning(
+                "Заявка №%s не найдена пользователем @%s", appeal_id, username
+            )
             await state.clear()
             return
         existing_response = appeal["response"] or ""
@@ -292,9 +304,14 @@ async def process_response(message: Message, state: FSMContext, **data):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления текстового ответа от @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка удаления текстового ответа от @%s (ID: %s): %s",
+                username,
+                user_id,
+                e,
             )
-        logger.info(f"Ответ по заявке №{appeal_id} отправлен пользователем @{username}")
+        logger.info(
+            "Ответ по заявке №%s отправлен пользователем @%s", appeal_id, username
+        )
         # Отправка уведомления пользователю
         try:
             for media in media_files:
@@ -319,17 +336,22 @@ async def process_response(message: Message, state: FSMContext, **data):
                 reply_markup=user_keyboard,
             )
             logger.info(
-                f"Уведомление об ответе по заявке №{appeal_id} отправлено пользователю ID {appeal['user_id']}"
+                "Уведомление об ответе по заявке №%s отправлено пользователю ID %s",
+                appeal_id,
+                appeal['user_id'],
             )
         except (TelegramBadRequest, TelegramForbiddenError) as e:
             logger.error(
-                f"Ошибка отправки уведомления пользователю ID {appeal['user_id']} для заявки №{appeal_id}: {str(e)}"
+                "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+                appeal['user_id'],
+                appeal_id,
+                e,
             )
         await state.clear()
     else:
         await message.answer("Отправьте текст или медиафайл.", reply_markup=keyboard)
         logger.warning(
-            f"Некорректный ввод для ответа на заявку №{appeal_id} от @{username}"
+            "Некорректный ввод для ответа на заявку №%s от @%s", appeal_id, username
         )
 
 
@@ -360,7 +382,9 @@ async def add_response_media(callback: CallbackQuery, state: FSMContext):
         reply_markup=keyboard,
     )
     await state.set_state(AdminResponse.response)
-    logger.debug(f"Добавление медиа для ответа по заявке №{appeal_id} от @{username}")
+    logger.debug(
+        "Добавление медиа для ответа по заявке №%s от @%s", appeal_id, username
+    )
     await callback.answer()
 
 
@@ -393,7 +417,9 @@ async def preview_response(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     await callback.message.answer(text, reply_markup=keyboard)
     logger.debug(
-        f"Предпросмотр ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Предпросмотр ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -429,7 +455,9 @@ async def edit_response(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     await callback.message.answer("Редактирование ответа:", reply_markup=keyboard)
     logger.debug(
-        f"Редактирование ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Редактирование ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -449,7 +477,9 @@ async def change_response_text(callback: CallbackQuery, state: FSMContext):
     await callback.message.answer("Введите новый текст ответа:", reply_markup=keyboard)
     await state.set_state(AdminResponse.response)
     logger.debug(
-        f"Изменение текста ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Изменение текста ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -471,7 +501,9 @@ async def cancel_response(callback: CallbackQuery, state: FSMContext):
         ),
     )
     logger.info(
-        f"Ответ для заявки №{appeal_id} отменён пользователем @{callback.from_user.username}"
+        "Ответ для заявки №%s отменён пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -494,7 +526,7 @@ async def submit_response(callback: CallbackQuery, state: FSMContext, **data):
                 ]
             ),
         )
-        logger.warning(f"Заявка №{appeal_id} не найдена пользователем @{username}")
+        logger.warning("Заявка №%s не найдена пользователем @%s", appeal_id, username)
         return
     existing_response = appeal["response"] or ""
     response_lines = existing_response.split("\n") if existing_response else []
@@ -528,7 +560,7 @@ async def submit_response(callback: CallbackQuery, state: FSMContext, **data):
             ]
         ),
     )
-    logger.info(f"Ответ по заявке №{appeal_id} отправлен пользователем @{username}")
+    logger.info("Ответ по заявке №%s отправлен пользователем @%s", appeal_id, username)
     try:
         for media in media_files:
             if media.get("file_id"):
@@ -552,11 +584,16 @@ async def submit_response(callback: CallbackQuery, state: FSMContext, **data):
             reply_markup=user_keyboard,
         )
         logger.info(
-            f"Уведомление об ответе по заявке №{appeal_id} отправлено пользователю ID {appeal['user_id']}"
+            "Уведомление об ответе по заявке №%s отправлено пользователю ID %s",
+            appeal_id,
+            appeal['user_id'],
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления пользователю ID {appeal['user_id']} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+            appeal['user_id'],
+            appeal_id,
+            e,
         )
     await state.clear()
     await callback.answer()
@@ -634,14 +671,21 @@ async def process_continue_dialogue(message: Message, state: FSMContext, **data)
             reply_markup=user_keyboard,
         )
         logger.info(
-            f"Уведомление об ответе на заявку №{appeal_id} отправлено пользователю ID {user_id}"
+            "Уведомление об ответе на заявку №%s отправлено пользователю ID %s",
+            appeal_id,
+            user_id,
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления пользователю ID {user_id} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+            user_id,
+            appeal_id,
+            e,
         )
     logger.info(
-        f"Дополнительный ответ на заявку №{appeal_id} сохранён пользователем @{message.from_user.username}"
+        "Дополнительный ответ на заявку №%s сохранён пользователем @%s",
+        appeal_id,
+        message.from_user.username,
     )
     await state.clear()
 
@@ -673,7 +717,9 @@ async def continue_dialogue_prompt(callback: CallbackQuery, state: FSMContext, *
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     await state.update_data(appeal_id=appeal_id, media_files=[])
@@ -691,7 +737,9 @@ async def continue_dialogue_prompt(callback: CallbackQuery, state: FSMContext, *
         ),
     )
     logger.info(
-        f"Запрос продолжения диалога для заявки №{appeal_id} от пользователя @{callback.from_user.username}"
+        "Запрос продолжения диалога для заявки №%s от пользователя @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -735,7 +783,9 @@ async def process_continue_dialogue(message: Message, state: FSMContext, **data)
             ),
         )
         logger.info(
-            f"Продолжение диалога для заявки №{appeal_id} отправлено пользователем @{message.from_user.username}"
+            "Продолжение диалога для заявки №%s отправлено пользователем @%s",
+            appeal_id,
+            message.from_user.username,
         )
         await state.clear()
     else:
@@ -752,7 +802,9 @@ async def process_continue_dialogue(message: Message, state: FSMContext, **data)
             ),
         )
         logger.warning(
-            f"Некорректный ввод для продолжения диалога на заявку №{appeal_id} от пользователя @{message.from_user.username}"
+            "Некорректный ввод для продолжения диалога на заявку №%s от пользователя @%s",
+            appeal_id,
+            message.from_user.username,
         )
 
 
@@ -783,7 +835,9 @@ async def my_appeals_prompt(callback: CallbackQuery, state: FSMContext, **data):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка доступа к назначенным заявкам от неадминистратора @{callback.from_user.username} (ID: {user_id})"
+            "Попытка доступа к назначенным заявкам от неадминистратора @%s (ID: %s)",
+            callback.from_user.username,
+            user_id,
         )
         return
     appeals, total = await get_assigned_appeals(user_id, page=0)
@@ -819,7 +873,10 @@ async def navigate_my_appeals_page(callback: CallbackQuery, state: FSMContext, *
     await state.update_data(page=page)
     await callback.answer()
     logger.info(
-        f"Показана страница {page} назначенных заявок пользователю @{callback.from_user.username} (ID: {callback.from_user.id})"
+        "Показана страница %s назначенных заявок пользователю @%s (ID: %s)",
+        page,
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -840,7 +897,8 @@ async def show_open_appeals_page(
             "Нет открытых заявок со статусом 'Новая'.", reply_markup=keyboard
         )
         logger.info(
-            f"Нет открытых заявок для отображения пользователем @{message.from_user.username}"
+            "Нет открытых заявок для отображения пользователем @%s",
+            message.from_user.username,
         )
         return
 
@@ -851,7 +909,10 @@ async def show_open_appeals_page(
     response = f"Открытые заявки (страница {page + 1} из {total_pages})"
     await message.answer(response, reply_markup=keyboard)
     logger.info(
-        f"Показана страница {page} открытых заявок пользователю @{message.from_user.username} (ID: {message.from_user.id})"
+        "Показана страница %s открытых заявок пользователю @%s (ID: %s)",
+        page,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -882,7 +943,9 @@ async def open_appeals_prompt(callback: CallbackQuery, state: FSMContext, **data
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка доступа к открытым заявкам от неадминистратора @{callback.from_user.username} (ID: {user_id})"
+            "Попытка доступа к открытым заявкам от неадминистратора @%s (ID: %s)",
+            callback.from_user.username,
+            user_id,
         )
         return
     appeals, total = await get_open_appeals(page=0)
@@ -924,7 +987,10 @@ async def navigate_open_appeals_page(
     await state.update_data(page=page)
     await callback.answer()
     logger.info(
-        f"Показана страница {page} открытых заявок пользователю @{callback.from_user.username} (ID: {callback.from_user.id})"
+        "Показана страница %s открытых заявок пользователю @%s (ID: %s)",
+        page,
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -943,7 +1009,9 @@ async def view_appeal(callback: CallbackQuery, state: FSMContext, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     media_files = json.loads(appeal["media_files"] or "[]")
@@ -953,14 +1021,14 @@ async def view_appeal(callback: CallbackQuery, state: FSMContext, **data):
             created_time_dt = datetime.strptime(created_time, "%Y-%m-%dT%H:%M")
             created_time = created_time_dt.strftime("%d.%m.%Y %H:%M")
         except Exception as e:
-            logger.error(f"Ошибка форматирования created_time: {e}")
+            logger.error("Ошибка форматирования created_time: %s", e)
     taken_time = appeal["taken_time"]
     if taken_time:
         try:
             taken_time_dt = datetime.strptime(taken_time, "%Y-%m-%dT%H:%M")
             taken_time = taken_time_dt.strftime("%d.%m.%Y %H:%M")
         except Exception as e:
-            logger.error(f"Ошибка форматирования taken_time: {e}")
+            logger.error("Ошибка форматирования taken_time: %s", e)
     new_serial_text = (
         f"\nНовый серийник: {appeal.get('new_serial', '')}"
         if appeal.get("new_serial")
@@ -1008,7 +1076,9 @@ async def view_appeal(callback: CallbackQuery, state: FSMContext, **data):
     await callback.message.delete()
     await callback.message.answer(response, reply_markup=keyboard)
     logger.info(
-        f"Заявка №{appeal_id} просмотрена пользователем @{callback.from_user.username}"
+        "Заявка №%s просмотрена пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -1041,7 +1111,7 @@ async def take_appeal_prompt(
                 ]
             ),
         )
-        logger.warning(f"Заявка №{appeal_id} не найдена администратором @{username}")
+        logger.warning("Заявка №%s не найдена администратором @%s", appeal_id, username)
         return
     # Проверяем, выполнено ли действие из канала
     is_channel_action = False
@@ -1071,14 +1141,19 @@ async def take_appeal_prompt(
                             reply_markup=None,
                         )
                         logger.info(
-                            f"Уведомление в канале ID {msg['chat_id']} для заявки №{appeal_id} отредактировано"
+                            "Уведомление в канале ID %s для заявки №%s отредактировано",
+                            msg['chat_id'],
+                            appeal_id,
                         )
                     except (TelegramBadRequest, TelegramForbiddenError) as e:
                         logger.error(
-                            f"Ошибка редактирования уведомления в канале ID {msg['chat_id']} для заявки №{appeal_id}: {str(e)}"
+                            "Ошибка редактирования уведомления в канале ID %s для заявки №%s: %s",
+                            msg['chat_id'],
+                            appeal_id,
+                            e,
                         )
         logger.warning(
-            f"Заявка №{appeal_id} уже в статусе {appeal['status']} для @{username}"
+            "Заявка №%s уже в статусе %s для @%s", appeal_id, appeal['status'], username
         )
         return
     await take_appeal(appeal_id, user_id, username)
@@ -1091,7 +1166,10 @@ async def take_appeal_prompt(
         ),
     )
     logger.info(
-        f"Заявка №{appeal_id} взята в работу администратором @{username} (ID: {user_id})"
+        "Заявка №%s взята в работу администратором @%s (ID: %s)",
+        appeal_id,
+        username,
+        user_id,
     )
     # Отправка уведомления пользователю
     try:
@@ -1105,11 +1183,16 @@ async def take_appeal_prompt(
             ),
         )
         logger.info(
-            f"Уведомление о взятии заявки №{appeal_id} отправлено пользователю ID {appeal['user_id']}"
+            "Уведомление о взятии заявки №%s отправлено пользователю ID %s",
+            appeal_id,
+            appeal['user_id'],
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления пользователю ID {appeal['user_id']} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+            appeal['user_id'],
+            appeal_id,
+            e,
         )
     # Редактируем уведомления в канале только для действия из канала
     if is_channel_action:
@@ -1127,11 +1210,16 @@ async def take_appeal_prompt(
                         reply_markup=None,
                     )
                     logger.info(
-                        f"Уведомление в канале ID {msg['chat_id']} для заявки №{appeal_id} отредактировано"
+                        "Уведомление в канале ID %s для заявки №%s отредактировано",
+                        msg['chat_id'],
+                        appeal_id,
                     )
                 except (TelegramBadRequest, TelegramForbiddenError) as e:
                     logger.error(
-                        f"Ошибка редактирования уведомления в канале ID {msg['chat_id']} для заявки №{appeal_id}: {str(e)}"
+                        "Ошибка редактирования уведомления в канале ID %s для заявки №%s: %s",
+                        msg['chat_id'],
+                        appeal_id,
+                        e,
                     )
     await callback.answer()
 
@@ -1165,7 +1253,7 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
                 ]
             ),
         )
-        logger.warning(f"Заявка №{appeal_id} не найдена администратором @{username}")
+        logger.warning("Заявка №%s не найдена администратором @%s", appeal_id, username)
         return
     # Проверяем, выполнено ли действие из канала
     is_channel_action = False
@@ -1195,14 +1283,22 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
                             reply_markup=None,
                         )
                         logger.info(
-                            f"Уведомление в канале ID {msg['chat_id']} для заявки №{appeal_id} отредактировано"
+                            "Уведомление в канале ID %s для заявки №%s отредактировано",
+                            msg['chat_id'],
+                            appeal_id,
                         )
                     except (TelegramBadRequest, TelegramForbiddenError) as e:
                         logger.error(
-                            f"Ошибка редактирования уведомления в канале ID {msg['chat_id']} для заявки №{appeal_id}: {str(e)}"
+                            "Ошибка редактирования уведомления в канале ID %s для заявки №%s: %s",
+                            msg['chat_id'],
+                            appeal_id,
+                            e,
                         )
         logger.warning(
-            f"Заявка №{appeal_id} в статусе {appeal['status']} не может быть делегирована для @{username}"
+            "Заявка №%s в статусе %s не может быть делегирована для @%s",
+            appeal_id,
+            appeal['status'],
+            username,
         )
         return
     async with db_pool.acquire() as conn:
@@ -1223,7 +1319,9 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
                 ),
             )
             logger.warning(
-                f"Администратор ID {admin_id} не найден для делегирования заявки №{appeal_id}"
+                "Администратор ID %s не найден для делегирования заявки №%s",
+                admin_id,
+                appeal_id,
             )
             return
         admin_username = admin["username"]
@@ -1237,7 +1335,11 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
         ),
     )
     logger.info(
-        f"Заявка №{appeal_id} делегирована администратору @{admin_username} (ID: {admin_id}) пользователем @{username}"
+        "Заявка №%s делегирована администратору @%s (ID: %s) пользователем @%s",
+        appeal_id,
+        admin_username,
+        admin_id,
+        username,
     )
     # Отправка уведомления пользователю
     try:
@@ -1251,11 +1353,16 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
             ),
         )
         logger.info(
-            f"Уведомление о делегировании заявки №{appeal_id} отправлено пользователю ID {appeal['user_id']}"
+            "Уведомление о делегировании заявки №%s отправлено пользователю ID %s",
+            appeal_id,
+            appeal['user_id'],
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления пользователю ID {appeal['user_id']} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+            appeal['user_id'],
+            appeal_id,
+            e,
         )
     # Отправка уведомления новому администратору
     try:
@@ -1274,11 +1381,16 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
             ),
         )
         logger.info(
-            f"Уведомление о делегировании заявки №{appeal_id} отправлено администратору ID {admin_id}"
+            "Уведомление о делегировании заявки №%s отправлено администратору ID %s",
+            appeal_id,
+            admin_id,
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления администратору ID {admin_id} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления администратору ID %s для заявки №%s: %s",
+            admin_id,
+            appeal_id,
+            e,
         )
     # Редактируем уведомления в канале только для действия из канала
     if is_channel_action:
@@ -1296,11 +1408,16 @@ async def assign_appeal(callback: CallbackQuery, state: FSMContext, bot: Bot, **
                         reply_markup=None,
                     )
                     logger.info(
-                        f"Уведомление в канале ID {msg['chat_id']} для заявки №{appeal_id} отредактировано"
+                        "Уведомление в канале ID %s для заявки №%s отредактировано",
+                        msg['chat_id'],
+                        appeal_id,
                     )
                 except (TelegramBadRequest, TelegramForbiddenError) as e:
                     logger.error(
-                        f"Ошибка редактирования уведомления в канале ID {msg['chat_id']} для заявки №{appeal_id}: {str(e)}"
+                        "Ошибка редактирования уведомления в канале ID %s для заявки №%s: %s",
+                        msg['chat_id'],
+                        appeal_id,
+                        e,
                     )
     await callback.answer()
 
@@ -1332,7 +1449,9 @@ async def reply_appeal_prompt(callback: CallbackQuery, state: FSMContext, **data
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     async with db_pool.acquire() as conn:
@@ -1347,7 +1466,9 @@ async def reply_appeal_prompt(callback: CallbackQuery, state: FSMContext, **data
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка ответа на заявку №{appeal_id} от неадминистратора @{callback.from_user.username}"
+            "Попытка ответа на заявку №%s от неадминистратора @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -1365,7 +1486,7 @@ async def reply_appeal_prompt(callback: CallbackQuery, state: FSMContext, **data
     await state.set_state(AdminResponse.response)
     await state.update_data(appeal_id=appeal_id)
     logger.debug(
-        f"Запрос ответа на заявку №{appeal_id} от @{callback.from_user.username}"
+        "Запрос ответа на заявку №%s от @%s", appeal_id, callback.from_user.username
     )
 
 
@@ -1392,7 +1513,9 @@ async def add_response_media_prompt(callback: CallbackQuery, state: FSMContext):
     await state.set_state(AdminResponse.response_media)
     await state.update_data(appeal_id=appeal_id, media_files=[])
     logger.debug(
-        f"Запрос добавления медиа для ответа на заявку №{appeal_id} от @{callback.from_user.username}"
+        "Запрос добавления медиа для ответа на заявку №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -1434,7 +1557,9 @@ async def process_response_media(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Достигнуто максимальное количество медиа для ответа на заявку №{appeal_id} от @{message.from_user.username}"
+            "Достигнуто максимальное количество медиа для ответа на заявку №%s от @%s",
+            appeal_id,
+            message.from_user.username,
         )
         return
 
@@ -1466,7 +1591,11 @@ async def process_response_media(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа ({media[0]['type']}) добавлено для ответа на заявку №{appeal_id} от @{message.from_user.username}: {full_link}"
+            "Медиа (%s) добавлено для ответа на заявку №%s от @%s: %s",
+            media[0]['type'],
+            appeal_id,
+            message.from_user.username,
+            full_link,
         )
     else:
         keyboard = InlineKeyboardMarkup(
@@ -1488,7 +1617,9 @@ async def process_response_media(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Неподдерживаемый формат медиа для ответа на заявку №{appeal_id} от @{message.from_user.username}"
+            "Неподдерживаемый формат медиа для ответа на заявку №%s от @%s",
+            appeal_id,
+            message.from_user.username,
         )
 
 
@@ -1573,14 +1704,21 @@ async def done_response_media(callback: CallbackQuery, state: FSMContext, **data
                     chat_id=user_id, video=media["file_id"]
                 )
         logger.info(
-            f"Уведомление о медиа для заявки №{appeal_id} отправлено пользователю ID {user_id}"
+            "Уведомление о медиа для заявки №%s отправлено пользователю ID %s",
+            appeal_id,
+            user_id,
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления пользователю ID {user_id} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+            user_id,
+            appeal_id,
+            e,
         )
     logger.info(
-        f"Медиа для ответа на заявку №{appeal_id} сохранены пользователем @{callback.from_user.username}"
+        "Медиа для ответа на заявку №%s сохранены пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
     await state.clear()
 
@@ -1612,7 +1750,9 @@ async def delegate_appeal_prompt(callback: CallbackQuery, state: FSMContext, **d
             ),
         )
         logger.warning(
-            f"Сотрудники не найдены для делегирования заявки №{appeal_id} пользователем @{callback.from_user.username}"
+            "Сотрудники не найдены для делегирования заявки №%s пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
@@ -1632,7 +1772,7 @@ async def delegate_appeal_prompt(callback: CallbackQuery, state: FSMContext, **d
         "Выберите сотрудника для делегирования:", reply_markup=keyboard
     )
     logger.debug(
-        f"Запрос делегирования заявки №{appeal_id} от @{callback.from_user.username}"
+        "Запрос делегирования заявки №%s от @%s", appeal_id, callback.from_user.username
     )
 
 
@@ -1663,7 +1803,9 @@ async def await_specialist(callback: CallbackQuery, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     async with db_pool.acquire() as conn:
@@ -1698,7 +1840,10 @@ async def await_specialist(callback: CallbackQuery, **data):
         )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления о выезде пользователю ID {appeal['user_id']} для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления о выезде пользователю ID %s для заявки №%s: %s",
+            appeal['user_id'],
+            appeal_id,
+            e,
         )
     channels = await get_notification_channels()
     for channel in channels:
@@ -1711,10 +1856,12 @@ async def await_specialist(callback: CallbackQuery, **data):
             )
         except (TelegramBadRequest, TelegramForbiddenError) as e:
             logger.error(
-                f"Ошибка отправки уведомления в канал {channel['channel_name']}: {str(e)}"
+                "Ошибка отправки уведомления в канал %s: %s", channel['channel_name'], e
             )
     logger.info(
-        f"Заявка №{appeal_id} помечена как 'Требуется выезд' пользователем @{callback.from_user.username}"
+        "Заявка №%s помечена как 'Требуется выезд' пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -1733,7 +1880,9 @@ async def view_media(callback: CallbackQuery):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     media_files = json.loads(appeal["media_files"] or "[]")
@@ -1751,7 +1900,7 @@ async def view_media(callback: CallbackQuery):
                 ]
             ),
         )
-        logger.info(f"Медиафайлы отсутствуют для заявки №{appeal_id}")
+        logger.info("Медиафайлы отсутствуют для заявки №%s", appeal_id)
         return
     await callback.message.delete()
     for media in media_files:
@@ -1767,7 +1916,11 @@ async def view_media(callback: CallbackQuery):
                     )
         except (TelegramBadRequest, TelegramForbiddenError) as e:
             logger.error(
-                f"Ошибка отправки медиа (тип: {media['type']}, file_id: {media.get('file_id')}) для заявки №{appeal_id}: {str(e)}"
+                "Ошибка отправки медиа (тип: %s, file_id: %s) для заявки №%s: %s",
+                media['type'],
+                media.get('file_id'),
+                appeal_id,
+                e,
             )
     await callback.message.answer(
         "Медиафайлы отображены.",
@@ -1782,5 +1935,7 @@ async def view_media(callback: CallbackQuery):
         ),
     )
     logger.info(
-        f"Медиафайлы для заявки №{appeal_id} отображены для @{callback.from_user.username}"
+        "Медиафайлы для заявки №%s отображены для @%s",
+        appeal_id,
+        callback.from_user.username,
     )
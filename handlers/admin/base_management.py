@@ -17,6 +17,7 @@ import pandas as pd
 import json
 from typing import Optional
 from utils.logger import get_logger
+from utils.storage import video_derivative_links
 
 logger = get_logger(__name__)
 
@@ -46,7 +47,7 @@ async def manage_base(callback: CallbackQuery):
         await callback.message.answer(
             "Управление базой:", reply_markup=get_base_management_menu()
         )
-    logger.info(f"Пользователь @{callback.from_user.username} открыл управление базой")
+    logger.info("Пользователь @%s открыл управление базой", callback.from_user.username)
 
 
 @router.message(StateFilter(BaseManagement.import_serials), F.document)
@@ -73,7 +74,7 @@ async def process_import(message: Message, state: FSMContext, **data):
             ]
         )
         await message.answer("Отправьте Excel-файл.", reply_markup=keyboard)
-        logger.error(f"Неверный формат файла от @{message.from_user.username}")
+        logger.error("Неверный формат файла от @%s", message.from_user.username)
         return
     status_message = await message.answer("Импорт начат, пожалуйста, подождите...")
     file = await message.bot.get_file(message.document.file_id)
@@ -89,7 +90,7 @@ async def process_import(message: Message, state: FSMContext, **data):
             ]
         )
         await message.answer(error, reply_markup=keyboard)
-        logger.error(f"Ошибка импорта от @{message.from_user.username}: {error}")
+        logger.error("Ошибка импорта от @%s: %s", message.from_user.username, error)
     else:
         keyboard = InlineKeyboardMarkup(
             inline_keyboard=[
@@ -111,7 +112,9 @@ async def process_import(message: Message, state: FSMContext, **data):
                 reply_markup=keyboard,
             )
         logger.info(
-            f"Импорт завершён пользователем @{message.from_user.username}: {response}"
+            "Импорт завершён пользователем @%s: %s",
+            message.from_user.username,
+            response,
         )
         await state.clear()
 
@@ -129,7 +132,7 @@ async def import_serials_prompt(callback: CallbackQuery, state: FSMContext):
         reply_markup=keyboard,
     )
     await state.set_state(BaseManagement.import_serials)
-    logger.debug(f"Запрос импорта серийников от @{callback.from_user.username}")
+    logger.debug("Запрос импорта серийников от @%s", callback.from_user.username)
 
 
 @router.callback_query(F.data == "export_serials")
@@ -157,7 +160,7 @@ async def export_serials_handler(callback: CallbackQuery, **data):
         await callback.message.delete()
         await callback.message.answer("Нет данных для экспорта.", reply_markup=keyboard)
         logger.warning(
-            f"Нет данных для экспорта, запрос от @{callback.from_user.username}"
+            "Нет данных для экспорта, запрос от @%s", callback.from_user.username
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -171,7 +174,7 @@ async def export_serials_handler(callback: CallbackQuery, **data):
     )
     await callback.message.delete()
     logger.info(
-        f"Экспорт серийников выполнен пользователем @{callback.from_user.username}"
+        "Экспорт серийников выполнен пользователем @%s", callback.from_user.username
     )
 
 
@@ -188,7 +191,7 @@ async def export_defect_reports_prompt(callback: CallbackQuery, state: FSMContex
         reply_markup=keyboard,
     )
     await state.set_state(BaseManagement.report_serial_from)
-    logger.debug(f"Запрос выгрузки отчётов от @{callback.from_user.username}")
+    logger.debug("Запрос выгрузки отчётов от @%s", callback.from_user.username)
 
 
 @router.message(StateFilter(BaseManagement.report_serial_from))
@@ -229,7 +232,11 @@ async def process_report_serial(message: Message, state: FSMContext, **data):
             "Нет отчётов для указанного диапазона/номера.", reply_markup=keyboard
         )
         logger.warning(
-            f"Нет отчётов для диапазона {serial_from}-{serial_to} или номера {serial}, запрос от @{message.from_user.username}"
+            "Нет отчётов для диапазона %s-%s или номера %s, запрос от @%s",
+            serial_from,
+            serial_to,
+            serial,
+            message.from_user.username,
         )
         await state.clear()
         return
@@ -252,6 +259,7 @@ async def process_report_serial(message: Message, state: FSMContext, **data):
         ]
         photo_links = [link for link in photo_links if link]
         video_links = [link for link in video_links if link]
+        poster_links, preview_links = video_derivative_links(video_links)
         data.append(
             {
                 "Старый серийный номер": report["serial"],
@@ -264,6 +272,8 @@ async def process_report_serial(message: Message, state: FSMContext, **data):
                 "Сотрудник ID": report["employee_id"],
                 "Фото": ", ".join(photo_links),
                 "Видео": ", ".join(video_links),
+                "Постер видео": poster_links,
+                "Превью видео": preview_links,
             }
         )
     df = pd.DataFrame(data)
@@ -280,6 +290,7 @@ async def process_report_serial(message: Message, state: FSMContext, **data):
         reply_markup=keyboard,
     )
     logger.info(
-        f"Выгрузка отчётов о неисправности выполнена пользователем @{message.from_user.username}"
+        "Выгрузка отчётов о неисправности выполнена пользователем @%s",
+        message.from_user.username,
     )
     await state.clear()
@@ -60,7 +60,7 @@ async def show_closed_appeals(callback: CallbackQuery, **data):
             reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
         )
         logger.info(
-            f"Нет закрытых заявок для пользователя @{callback.from_user.username}"
+            "Нет закрытых заявок для пользователя @%s", callback.from_user.username
         )
         return
     nav_buttons = []
@@ -75,7 +75,8 @@ async def show_closed_appeals(callback: CallbackQuery, **data):
         reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
     )
     logger.info(
-        f"Показана страница 0 закрытых заявок пользователю @{callback.from_user.username}"
+        "Показана страница 0 закрытых заявок пользователю @%s",
+        callback.from_user.username,
     )
 
 
@@ -109,7 +110,9 @@ async def view_closed_appeal(callback: CallbackQuery, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена или не закрыта пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена или не закрыта пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     closed_time = appeal["closed_time"]
@@ -140,7 +143,9 @@ async def view_closed_appeal(callback: CallbackQuery, **data):
     )
     await callback.message.edit_text(text, reply_markup=keyboard)
     logger.info(
-        f"Пользователь @{callback.from_user.username} просмотрел закрытую заявку №{appeal_id}"
+        "Пользователь @%s просмотрел закрытую заявку №%s",
+        callback.from_user.username,
+        appeal_id,
     )
     await callback.answer()
 
@@ -187,15 +192,20 @@ async def navigate_closed_appeals(callback: CallbackQuery, **data):
     except TelegramBadRequest as e:
         if "message is not modified" in str(e):
             logger.debug(
-                f"Сообщение не изменено для закрытых заявок, страница {page}, пользователь @{callback.from_user.username}"
+                "Сообщение не изменено для закрытых заявок, страница %s, пользователь @%s",
+                page,
+                callback.from_user.username,
             )
         else:
-            logger.error(f"Ошибка редактирования сообщения для закрытых заявок: {e}")
+            logger.error("Ошибка редактирования сообщения для закрытых заявок: %s", e)
             await callback.message.answer(
                 f"Закрытые заявки (страница {page + 1} из {max(1, (total + 9) // 10)}):",
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
             )
     logger.info(
-        f"Пользователь @{callback.from_user.username} просмотрел закрытые заявки (страница {page}, найдено: {len(appeals)})"
+        "Пользователь @%s просмотрел закрытые заявки (страница %s, найдено: %s)",
+        callback.from_user.username,
+        page,
+        len(appeals),
     )
     await callback.answer()
@@ -66,7 +66,9 @@ async def mark_defect_prompt(callback: CallbackQuery, state: FSMContext):
         "Выберите статус устройства или добавьте отчёт:", reply_markup=keyboard
     )
     await state.set_state(AdminResponse.defect_status)
-    logger.debug(f"Запрос отметки статуса или отчёта от @{callback.from_user.username}")
+    logger.debug(
+        "Запрос отметки статуса или отчёта от @%s", callback.from_user.username
+    )
 
 
 @router.callback_query(F.data == "add_defect_report")
@@ -81,7 +83,7 @@ async def add_defect_report_prompt(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(AdminResponse.defect_serial)
     logger.debug(
-        f"Запрос добавления отчёта о неисправности от @{callback.from_user.username}"
+        "Запрос добавления отчёта о неисправности от @%s", callback.from_user.username
     )
 
 
@@ -98,7 +100,10 @@ async def process_defect_serial(message: Message, state: FSMContext, **data):
             "Неверный формат серийного номера. Попробуйте снова:", reply_markup=keyboard
         )
         logger.warning(
-            f"Неверный серийный номер {serial} от @{message.from_user.username} (ID: {message.from_user.id})"
+            "Неверный серийный номер %s от @%s (ID: %s)",
+            serial,
+            message.from_user.username,
+            message.from_user.id,
         )
         return
     db_pool = data["db_pool"]
@@ -111,7 +116,10 @@ async def process_defect_serial(message: Message, state: FSMContext, **data):
             "Серийный номер не найден в базе. Попробуйте снова:", reply_markup=keyboard
         )
         logger.warning(
-            f"Серийный номер {serial} не найден, попытка от @{message.from_user.username} (ID: {message.from_user.id})"
+            "Серийный номер %s не найден, попытка от @%s (ID: %s)",
+            serial,
+            message.from_user.username,
+            message.from_user.id,
         )
         return
     await state.update_data(
@@ -135,7 +143,10 @@ async def process_defect_serial(message: Message, state: FSMContext, **data):
     )
     await state.set_state(AdminResponse.defect_action)
     logger.debug(
-        f"Серийный номер {serial} для отчёта принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Серийный номер %s для отчёта принят от @%s (ID: %s)",
+        serial,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -305,7 +316,9 @@ async def process_defect_media(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа ({media[0]['type']}) добавлено для отчёта от @{message.from_user.username}"
+            "Медиа (%s) добавлено для отчёта от @%s",
+            media[0]['type'],
+            message.from_user.username,
         )
     else:
         await message.answer(
@@ -313,7 +326,8 @@ async def process_defect_media(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Неподдерживаемый формат медиа для отчёта от @{message.from_user.username}"
+            "Неподдерживаемый формат медиа для отчёта от @%s",
+            message.from_user.username,
         )
 
 
@@ -397,7 +411,9 @@ async def mark_defect_from_appeal(callback: CallbackQuery, state: FSMContext, **
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     serial = appeal["serial"]
@@ -410,7 +426,10 @@ async def mark_defect_from_appeal(callback: CallbackQuery, state: FSMContext, **
     )
     await state.set_state(AdminResponse.defect_status)
     logger.debug(
-        f"Пользователь @{callback.from_user.username} начал отметку статуса для заявки №{appeal_id} с серийником {serial}"
+        "Пользователь @%s начал отметку статуса для заявки №%s с серийником %s",
+        callback.from_user.username,
+        appeal_id,
+        serial,
     )
 
 
@@ -481,7 +500,9 @@ async def complete_replacement_prompt(
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена или не в статусе 'replacement_process' для пользователя @{callback.from_user.username}"
+            "Заявка №%s не найдена или не в статусе 'replacement_process' для пользователя @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     await state.update_data(appeal_id=appeal_id, old_serial=appeal["serial"])
@@ -499,5 +520,7 @@ async def complete_replacement_prompt(
     )
     await state.set_state(AdminResponse.new_serial)
     logger.debug(
-        f"Пользователь @{callback.from_user.username} начал ввод нового серийного номера для заявки №{appeal_id}"
+        "Пользователь @%s начал ввод нового серийного номера для заявки №%s",
+        callback.from_user.username,
+        appeal_id,
     )
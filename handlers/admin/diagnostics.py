@@ -0,0 +1,210 @@
+import asyncio
+
+from aiogram import Bot, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile, Message
+
+from config import MAIN_ADMIN_IDS
+from database.db import get_db_pool
+from utils.logger import get_logger
+from utils.profiling import (
+    PROFILE_MAX_SECONDS,
+    ProfilerBusy,
+    memory_profiler,
+    report_filename,
+    sampling_profiler,
+)
+from utils.query_stats import query_stats
+
+logger = get_logger(__name__)
+
+router = Router()
+
+# Ограничение Telegram на длину текста сообщения
+_MESSAGE_LIMIT = 4096
+_SQL_PREVIEW_LENGTH = 300
+_DEFAULT_PROFILE_SECONDS = 30
+# Ссылки на фоновые задачи профилирования, чтобы их не собрал сборщик мусора
+_profile_tasks: set[asyncio.Task] = set()
+_ORDERS = {
+    "total": "суммарному времени",
+    "p95": "p95",
+    "count": "числу выполнений",
+    "max": "максимальному времени",
+}
+
+
+def _truncate(text: str, limit: int = _MESSAGE_LIMIT) -> str:
+    if len(text) <= limit:
+        return text
+    return text[: limit - 1] + "…"
+
+
+async def _deny_non_admin(message: Message, command: str) -> bool:
+    if message.from_user.id in MAIN_ADMIN_IDS:
+        return False
+    await message.answer("Доступ запрещён.")
+    logger.warning(
+        "Попытка вызвать /%s от неадминистратора @%s (ID: %s)",
+        command,
+        message.from_user.username,
+        message.from_user.id,
+    )
+    return True
+
+
+@router.message(Command("slow_queries"))
+async def slow_queries_command(message: Message, command: CommandObject):
+    if await _deny_non_admin(message, "slow_queries"):
+        return
+    argument = (command.args or "total").strip().lower()
+    if argument == "reset":
+        query_stats.reset()
+        await message.answer("Статистика запросов сброшена.")
+        logger.info(
+            "Администратор @%s сбросил статистику запросов", message.from_user.username
+        )
+        return
+    if argument not in _ORDERS:
+        await message.answer(
+            "Использование: /slow_queries [total|p95|count|max|reset]"
+        )
+        return
+
+    top = query_stats.top(10, order=argument)
+    if not top:
+        await message.answer("Запросов к базе пока не было.")
+        return
+    threshold = (
+        f"{query_stats.slow_threshold * 1000:.0f} мс"
+        if query_stats.slow_threshold is not None
+        else "не задан"
+    )
+    lines = [
+        f"Топ запросов по {_ORDERS[argument]} (порог медленного запроса: {threshold}):",
+        "",
+    ]
+    for stat in top:
+        sql = stat.sql
+        if len(sql) > _SQL_PREVIEW_LENGTH:
+            sql = sql[:_SQL_PREVIEW_LENGTH] + "…"
+        lines.append(
+            f"#{stat.id}: {stat.count} раз, всего {stat.total:.2f} с, "
+            f"среднее {stat.mean * 1000:.1f} мс, p95 {stat.p95 * 1000:.1f} мс, "
+            f"макс. {stat.max * 1000:.1f} мс, медленных {stat.slow}, ошибок {stat.errors}"
+        )
+        lines.append(sql)
+        lines.append("")
+    lines.append("План запроса: /explain <номер>")
+    await message.answer(_truncate("\n".join(lines)))
+    logger.debug(
+        "Администратор @%s запросил статистику запросов (%s)",
+        message.from_user.username,
+        argument,
+    )
+
+
+@router.message(Command("explain"))
+async def explain_command(message: Message, command: CommandObject):
+    if await _deny_non_admin(message, "explain"):
+        return
+    argument = (command.args or "").strip().lstrip("#")
+    if not argument.isdigit():
+        await message.answer("Использование: /explain <номер из /slow_queries>")
+        return
+    stat = query_stats.get(int(argument))
+    if stat is None:
+        await message.answer(f"Запрос #{argument} не найден в статистике.")
+        return
+    try:
+        plan = await query_stats.explain(await get_db_pool(), stat)
+    except ValueError as exc:
+        await message.answer(str(exc))
+        return
+    except Exception as exc:
+        logger.error("Ошибка EXPLAIN для запроса #%s: %s", stat.id, exc)
+        await message.answer(f"Не удалось получить план запроса: {exc}")
+        return
+    await message.answer(_truncate(f"План запроса #{stat.id}:\n{stat.sql}\n\n{plan}"))
+    logger.info(
+        "Администратор @%s получил план запроса #%s",
+        message.from_user.username,
+        stat.id,
+    )
+
+
+async def _run_profile(bot: Bot, chat_id: int, seconds: int) -> None:
+    try:
+        collapsed, summary = await sampling_profiler.profile(seconds)
+    except ProfilerBusy as exc:
+        await bot.send_message(chat_id, str(exc))
+        return
+    except Exception as exc:
+        logger.error("Ошибка профилирования: %s", exc)
+        await bot.send_message(chat_id, f"Профилирование завершилось с ошибкой: {exc}")
+        return
+    await bot.send_document(
+        chat_id,
+        BufferedInputFile(collapsed.encode("utf-8"), report_filename("profile", "folded")),
+        caption=_truncate(summary, 1024),
+    )
+
+
+@router.message(Command("profile"))
+async def profile_command(message: Message, command: CommandObject, bot: Bot):
+    if await _deny_non_admin(message, "profile"):
+        return
+    argument = (command.args or "").strip()
+    if argument and not argument.isdigit():
+        await message.answer(
+            f"Использование: /profile [секунды, до {PROFILE_MAX_SECONDS}]"
+        )
+        return
+    if sampling_profiler.running:
+        await message.answer("Профилирование уже запущено, дождитесь отчёта.")
+        return
+    seconds = min(int(argument or _DEFAULT_PROFILE_SECONDS), PROFILE_MAX_SECONDS)
+    # Отчёт придёт отдельным сообщением: обработка апдейта не ждёт профилировщик
+    task = asyncio.create_task(_run_profile(bot, message.chat.id, seconds))
+    _profile_tasks.add(task)
+    task.add_done_callback(_profile_tasks.discard)
+    await message.answer(
+        f"Профилирование запущено на {seconds} с. Пришлю файл collapsed stacks "
+        "(открывается в speedscope или flamegraph.pl)."
+    )
+    logger.info(
+        "Администратор @%s запустил профилирование на %s с",
+        message.from_user.username,
+        seconds,
+    )
+
+
+@router.message(Command("memory"))
+async def memory_command(message: Message, command: CommandObject):
+    if await _deny_non_admin(message, "memory"):
+        return
+    action = (command.args or "snapshot").strip().lower()
+    if action == "start":
+        memory_profiler.start()
+        await message.answer(
+            "Отслеживание памяти включено. Снимок: /memory snapshot, "
+            "каждый следующий снимок сравнивается с предыдущим."
+        )
+    elif action == "stop":
+        memory_profiler.stop()
+        await message.answer("Отслеживание памяти выключено.")
+    elif action == "snapshot":
+        if not memory_profiler.tracing:
+            await message.answer("Сначала включите отслеживание: /memory start")
+            return
+        report = await memory_profiler.snapshot()
+        await message.answer_document(
+            BufferedInputFile(report.encode("utf-8"), report_filename("memory", "txt")),
+            caption="Снимок памяти (tracemalloc)",
+        )
+    else:
+        await message.answer("Использование: /memory [start|snapshot|stop]")
+        return
+    logger.info(
+        "Администратор @%s: /memory %s", message.from_user.username, action
+    )
@@ -9,7 +9,6 @@ from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
 from pathlib import Path
 
-from aiogram.types import FSInputFile
 from aiogram.exceptions import TelegramBadRequest
 
 from keyboards.inline import (
@@ -35,10 +34,17 @@ from config import (
     TOKEN,
     LOCAL_BOT_API_CACHE_DIR,
     MANUALS_STORAGE_DIR,
-    PUBLIC_MEDIA_ROOT,
 )
-from handlers.admin.admin_panel import download_from_local_api, _cleanup_source_file
-from utils.video import compress_video
+from handlers.admin.admin_panel import (
+    download_from_local_api,
+    _await_transcode,
+    _cleanup_source_file,
+    _remember_transcode,
+    _reuse_cached_transcode,
+    _submit_transcode,
+)
+from utils.manual_files import manual_file_path, send_manual_record
+from utils.transcoding import PRIORITY_LOW, TranscodeCancelled
 from utils.logger import get_logger
 
 router = Router()
@@ -73,13 +79,6 @@ def _category_dir(category: str) -> Path:
     return Path(MANUALS_STORAGE_DIR) / category
 
 
-def _absolute_path(file_path: str) -> Path:
-    candidate = Path(file_path)
-    if candidate.is_absolute():
-        return candidate
-    return Path(PUBLIC_MEDIA_ROOT) / candidate
-
-
 def _category_title(category: str) -> str:
     return MANUAL_CATEGORIES.get(category, category)
 
@@ -225,42 +224,70 @@ async def receive_manual_file(message: Message, state: FSMContext):
             )
             return
 
-        download_result = await download_from_local_api(
-            file_id=file_id,
-            token=TOKEN,
-            base_dir=str(Path(LOCAL_BOT_API_CACHE_DIR) / "manuals"),
-        )
-
-        source_path = Path(download_result.local_path)
-        processed_path = source_path
+        cache_dir = Path(LOCAL_BOT_API_CACHE_DIR) / "manuals"
+        job = None
+        source_path = None
+        processed_path = None
+        if media_kind == "video":
+            processed_path = await _reuse_cached_transcode(
+                message.video.file_unique_id, cache_dir
+            )
 
-        if media_kind == "video" and source_path.stat().st_size > 75 * 1024 * 1024:
-            progress_message = await message.answer(
-                "Видео получено. Выполняется сжатие, это может занять несколько минут..."
+        if processed_path is None:
+            download_result = await download_from_local_api(
+                file_id=file_id,
+                token=TOKEN,
+                base_dir=str(cache_dir),
             )
-            try:
-                compressed_path = await compress_video(source_path)
-                processed_path = Path(compressed_path)
-                if progress_message:
-                    try:
-                        if processed_path == source_path:
+
+            source_path = Path(download_result.local_path)
+            processed_path = source_path
+
+            if media_kind == "video" and source_path.stat().st_size > 75 * 1024 * 1024:
+                job, progress_message = await _submit_transcode(
+                    message, source_path, priority=PRIORITY_LOW
+                )
+                try:
+                    compressed_path = await _await_transcode(job, progress_message)
+                    processed_path = Path(compressed_path)
+                    if progress_message:
+                        try:
+                            if not job.encoded:
+                                await progress_message.edit_text(
+                                    "Сжатие не потребовалось, используем исходный файл."
+                                )
+                            else:
+                                await progress_message.edit_text("Сжатие завершено ✅")
+                        except TelegramBadRequest:
+                            pass
+                except TranscodeCancelled:
+                    await _cleanup_source_file(source_path)
+                    await message.answer(
+                        "Сжатие отменено. Отправьте файл заново.",
+                        reply_markup=InlineKeyboardMarkup(
+                            inline_keyboard=[
+                                [
+                                    InlineKeyboardButton(
+                                        text="⬅️ Назад",
+                                        callback_data=manual_category_cb(
+                                            role="admin", action="open", category=category
+                                        ).pack(),
+                                    )
+                                ]
+                            ]
+                        ),
+                    )
+                    return
+                except Exception as exc:
+                    logger.error("Не удалось сжать видео руководства %s: %s", category, exc)
+                    if progress_message:
+                        try:
                             await progress_message.edit_text(
-                                "Сжатие не потребовалось, используем исходный файл."
+                                "Не удалось сжать видео, используем исходный файл."
                             )
-                        else:
-                            await progress_message.edit_text("Сжатие завершено ✅")
-                    except TelegramBadRequest:
-                        pass
-            except Exception as exc:
-                logger.error("Не удалось сжать видео руководства %s: %s", category, exc)
-                if progress_message:
-                    try:
-                        await progress_message.edit_text(
-                            "Не удалось сжать видео, используем исходный файл."
-                        )
-                    except TelegramBadRequest:
-                        pass
-                processed_path = source_path
+                        except TelegramBadRequest:
+                            pass
+                    processed_path = source_path
 
         target_dir = _category_dir(category)
         target_dir.mkdir(parents=True, exist_ok=True)
@@ -288,8 +315,17 @@ async def receive_manual_file(message: Message, state: FSMContext):
 
         processed_path.replace(target_path)
 
-        if media_kind == "video" and source_path.exists():
-            await _cleanup_source_file(source_path)
+        if media_kind == "video":
+            if source_path is not None and source_path.exists():
+                await _cleanup_source_file(source_path)
+            # source_path нет, если файл взят из кеша сжатий
+            if source_path is None or (job is not None and job.encoded):
+                await _remember_transcode(
+                    message.video.file_unique_id,
+                    target_path,
+                    source_size=message.video.file_size,
+                    job=job,
+                )
 
         relative_path = Path("manuals") / category / safe_name
         await add_manual_file(category, safe_name, str(relative_path), file_type)
@@ -347,28 +383,15 @@ async def show_manual_file(callback: CallbackQuery, callback_data: dict):
         await callback.answer("Файл не найден", show_alert=True)
         return
 
-    file_path = _absolute_path(record["file_path"])
     keyboard = get_manual_file_actions(category, file_id, is_admin=True)
 
     try:
-        if record.get("file_type") == "image":
-            await callback.message.answer_photo(
-                FSInputFile(file_path),
-                caption=f"{_category_title(category)} — {record['file_name']}",
-                reply_markup=keyboard,
-            )
-        elif record.get("file_type") == "video":
-            await callback.message.answer_video(
-                FSInputFile(file_path),
-                caption=f"{_category_title(category)} — {record['file_name']}",
-                reply_markup=keyboard,
-            )
-        else:
-            await callback.message.answer_document(
-                FSInputFile(file_path),
-                caption=f"{_category_title(category)} — {record['file_name']}",
-                reply_markup=keyboard,
-            )
+        await send_manual_record(
+            callback.message,
+            record,
+            caption=f"{_category_title(category)} — {record['file_name']}",
+            reply_markup=keyboard,
+        )
     except Exception as exc:
         logger.error(
             "Не удалось отправить файл руководства %s: %s", record["file_name"], exc
@@ -387,27 +410,14 @@ async def show_manual_file_user(callback: CallbackQuery, callback_data: dict):
         await callback.answer("Файл не найден", show_alert=True)
         return
 
-    file_path = _absolute_path(record["file_path"])
     keyboard = get_manual_file_actions(category, file_id, is_admin=False)
     try:
-        if record.get("file_type") == "image":
-            await callback.message.answer_photo(
-                FSInputFile(file_path),
-                caption=record["file_name"],
-                reply_markup=keyboard,
-            )
-        elif record.get("file_type") == "video":
-            await callback.message.answer_video(
-                FSInputFile(file_path),
-                caption=record["file_name"],
-                reply_markup=keyboard,
-            )
-        else:
-            await callback.message.answer_document(
-                FSInputFile(file_path),
-                caption=record["file_name"],
-                reply_markup=keyboard,
-            )
+        await send_manual_record(
+            callback.message,
+            record,
+            caption=record["file_name"],
+            reply_markup=keyboard,
+        )
     except Exception as exc:
         logger.error(
             "Не удалось отправить файл руководства %s: %s", record["file_name"], exc
@@ -435,7 +445,7 @@ async def delete_file(callback: CallbackQuery, callback_data: dict):
     file_id = int(callback_data.file_id)
     record = await get_manual_file_by_id(file_id)
     if record:
-        file_path = _absolute_path(record["file_path"])
+        file_path = manual_file_path(record["file_path"])
         file_path.unlink(missing_ok=True)
     await delete_manual_file(file_id)
     await callback.message.answer("Файл удалён.")
@@ -466,7 +476,7 @@ async def delete_all_files(callback: CallbackQuery, callback_data: dict):
     category = callback_data.category
     files = await get_manual_files(category)
     for record in files:
-        file_path = _absolute_path(record["file_path"])
+        file_path = manual_file_path(record["file_path"])
         file_path.unlink(missing_ok=True)
     await delete_all_manual_files(category)
     await callback.message.answer("Все файлы удалены.")
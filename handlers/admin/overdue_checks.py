@@ -46,7 +46,7 @@ async def check_overdue(appeal_id, bot, hours=12):
             await bot.send_message(
                 main_admin_id, text, reply_markup=get_overdue_menu(appeal_id)
             )
-        logger.info(f"Заявка №{appeal_id} просрочена")
+        logger.info("Заявка №%s просрочена", appeal_id)
 
 
 async def check_delegated_overdue(appeal_id, bot, employee_id):
@@ -64,7 +64,9 @@ async def check_delegated_overdue(appeal_id, bot, employee_id):
                 reply_markup=get_overdue_menu(appeal_id),
             )
         logger.info(
-            f"Делегированная заявка №{appeal_id} не обработана сотрудником ID {employee_id}"
+            "Делегированная заявка №%s не обработана сотрудником ID %s",
+            appeal_id,
+            employee_id,
         )
 
 
@@ -78,7 +80,8 @@ async def set_new_time_prompt(callback: CallbackQuery, state: FSMContext):
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка установки времени просрочки от неадминистратора @{callback.from_user.username}"
+            "Попытка установки времени просрочки от неадминистратора @%s",
+            callback.from_user.username,
         )
         return
     appeal_id = int(callback.data.split("_")[-1])
@@ -93,7 +96,9 @@ async def set_new_time_prompt(callback: CallbackQuery, state: FSMContext):
     await state.set_state(AdminResponse.new_time)
     await state.update_data(appeal_id=appeal_id)
     logger.debug(
-        f"Запрос установки времени просрочки для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Запрос установки времени просрочки для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -130,7 +135,10 @@ async def process_new_time(message: Message, state: FSMContext, **data):
             f"Новое время просрочки установлено: {hours} часов.", reply_markup=keyboard
         )
         logger.info(
-            f"Время просрочки для заявки №{appeal_id} установлено на {hours} часов пользователем @{message.from_user.username}"
+            "Время просрочки для заявки №%s установлено на %s часов пользователем @%s",
+            appeal_id,
+            hours,
+            message.from_user.username,
         )
         await check_overdue(appeal_id, message.bot, hours)
         await state.clear()
@@ -142,5 +150,5 @@ async def process_new_time(message: Message, state: FSMContext, **data):
         )
         await message.answer("Введите число часов.", reply_markup=keyboard)
         logger.error(
-            f"Неверный формат времени просрочки от @{message.from_user.username}"
+            "Неверный формат времени просрочки от @%s", message.from_user.username
         )
@@ -8,7 +8,8 @@ from aiogram.types import (
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.filters import StateFilter
-from database.db import get_serial_history
+from aiogram.exceptions import TelegramBadRequest
+from database.db import get_serial, get_serial_history_appeal
 from utils.validators import validate_serial
 from config import MAIN_ADMIN_IDS
 
@@ -23,24 +24,41 @@ class AdminResponse(StatesGroup):
     serial = State()
 
 
+def _back_keyboard() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")]
+        ]
+    )
+
+
 async def show_appeal_page(
-    message: Message, state: FSMContext, history: list, page: int, serial_data: dict
+    message: Message,
+    state: FSMContext,
+    serial: str,
+    page: int = 0,
+    cursor=None,
+    direction: str = "older",
 ):
-    if not history:  # Проверяем, пустой ли список обращений
-        keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")]
-            ]
-        )
+    """Показывает одну заявку из истории и запоминает в состоянии только курсор."""
+
+    appeal, has_newer, has_older = await get_serial_history_appeal(
+        serial, cursor, direction
+    )
+    if appeal is None:
+        if cursor is not None:
+            # Заявку по курсору удалили или она была последней — начинаем сначала
+            return await show_appeal_page(message, state, serial)
         await message.answer(
-            f"Обращений по серийному номеру {serial_data.get('serial')} не найдено.",
-            reply_markup=keyboard,
+            f"Обращений по серийному номеру {serial} не найдено.",
+            reply_markup=_back_keyboard(),
         )
         logger.info(
-            f"Нет обращений для серийного номера {serial_data.get('serial')} от @{message.from_user.username}"
+            "Нет обращений для серийного номера %s от @%s",
+            serial,
+            message.from_user.username,
         )
         return
-    appeal = history[page]
     response = (
         f"Заявка №{appeal['appeal_id']}:\n"
         f"Серийный номер: {appeal['serial']}\n"
@@ -50,19 +68,19 @@ async def show_appeal_page(
         f"Ответ: {appeal['response'] or 'Нет ответа'}"
     )
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
-    if page > 0:
+    if has_newer:
         keyboard.inline_keyboard.append(
             [
                 InlineKeyboardButton(
-                    text="⬅️ Предыдущая", callback_data=f"serial_history_page_{page - 1}"
+                    text="⬅️ Предыдущая", callback_data="serial_history_newer"
                 )
             ]
         )
-    if page + 1 < len(history):
+    if has_older:
         keyboard.inline_keyboard.append(
             [
                 InlineKeyboardButton(
-                    text="Следующая ➡️", callback_data=f"serial_history_page_{page + 1}"
+                    text="Следующая ➡️", callback_data="serial_history_older"
                 )
             ]
         )
@@ -70,8 +88,16 @@ async def show_appeal_page(
         [InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")]
     )
     await message.answer(response, reply_markup=keyboard)
+    await state.update_data(
+        serial=serial,
+        page=page,
+        history_cursor=[appeal["created_time"], appeal["appeal_id"]],
+    )
     logger.debug(
-        f"Показана страница {page} истории серийного номера {serial_data.get('serial')} для @{message.from_user.username}"
+        "Показана страница %s истории серийного номера %s для @%s",
+        page,
+        serial,
+        message.from_user.username,
     )
 
 
@@ -102,7 +128,9 @@ async def serial_history_prompt(callback: CallbackQuery, state: FSMContext, **da
         )
         await callback.message.edit_text("Доступ запрещён.", reply_markup=keyboard)
         logger.warning(
-            f"Попытка доступа к истории серийника от неадминистратора @{callback.from_user.username} (ID: {user_id})"
+            "Попытка доступа к истории серийника от неадминистратора @%s (ID: %s)",
+            callback.from_user.username,
+            user_id,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -115,7 +143,9 @@ async def serial_history_prompt(callback: CallbackQuery, state: FSMContext, **da
     )
     await state.set_state(AdminResponse.serial)
     logger.debug(
-        f"Администратор @{callback.from_user.username} (ID: {user_id}) запросил историю по серийнику"
+        "Администратор @%s (ID: %s) запросил историю по серийнику",
+        callback.from_user.username,
+        user_id,
     )
 
 
@@ -144,10 +174,13 @@ async def process_serial_history(message: Message, state: FSMContext, **data):
             "Некорректный серийный номер. Введите заново:", reply_markup=keyboard
         )
         logger.warning(
-            f"Некорректный серийный номер {serial} от @{message.from_user.username} (ID: {message.from_user.id})"
+            "Некорректный серийный номер %s от @%s (ID: %s)",
+            serial,
+            message.from_user.username,
+            message.from_user.id,
         )
         return
-    serial_data, appeals = await get_serial_history(serial)
+    serial_data = await get_serial(serial)
     if not serial_data:
         keyboard = InlineKeyboardMarkup(
             inline_keyboard=[
@@ -158,74 +191,64 @@ async def process_serial_history(message: Message, state: FSMContext, **data):
             f"Серийный номер {serial} не найден.", reply_markup=keyboard
         )
         logger.warning(
-            f"Серийный номер {serial} не найден для @{message.from_user.username}"
+            "Серийный номер %s не найден для @%s", serial, message.from_user.username
         )
         return
-    await state.update_data(serial=serial, history=appeals, serial_data=serial_data)
     try:
         await message.delete()
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка удаления сообщения от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+            "Ошибка удаления сообщения от @%s (ID: %s): %s",
+            message.from_user.username,
+            message.from_user.id,
+            e,
         )
-    await show_appeal_page(message, state, appeals, 0, serial_data)
-    await state.update_data(page=0)
+    await show_appeal_page(message, state, serial)
     logger.info(
-        f"Показана история серийного номера {serial} пользователю @{message.from_user.username} (ID: {message.from_user.id})"
+        "Показана история серийного номера %s пользователю @%s (ID: %s)",
+        serial,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
-@router.callback_query(
-    F.data.startswith("prev_page_") | F.data.startswith("next_page_")
-)
+@router.callback_query(F.data.in_({"serial_history_newer", "serial_history_older"}))
 async def navigate_appeal_page(callback: CallbackQuery, state: FSMContext, **data):
-    page = int(callback.data.split("_")[-1])
+    direction = callback.data.removeprefix("serial_history_")
     data_state = await state.get_data()
     serial = data_state.get("serial")
-    history = data_state.get("history")
-    serial_data = data_state.get("serial_data")
-
-    if not all([serial, history, serial_data]):
-        db_pool = data.get("db_pool")
-        if not db_pool:
-            logger.error("db_pool отсутствует в data")
-            await callback.message.answer(
-                "Ошибка сервера. Попробуйте снова.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="⬅️ Назад", callback_data="main_menu"
-                            )
-                        ]
-                    ]
-                ),
-            )
-            return
-        serial_data, history = await get_serial_history(serial)
-        if not serial_data:
-            await callback.message.answer(
-                f"Серийный номер {serial} не найден.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="⬅️ Назад", callback_data="main_menu"
-                            )
-                        ]
-                    ]
-                ),
-            )
-            logger.warning(
-                f"Серийный номер {serial} не найден при навигации страниц пользователем @{callback.from_user.username}"
-            )
-            return
-        await state.update_data(serial=serial, history=history, serial_data=serial_data)
-
-    await callback.message.delete()
-    await show_appeal_page(callback.message, state, history, page, serial_data)
-    await state.update_data(page=page)
+    cursor = data_state.get("history_cursor")
+    page = data_state.get("page", 0)
+
+    if not serial or not cursor:
+        await callback.message.answer(
+            "Сессия просмотра истории истекла. Введите серийный номер заново.",
+            reply_markup=_back_keyboard(),
+        )
+        await callback.answer()
+        logger.warning(
+            "Нет курсора истории серийника при навигации пользователем @%s",
+            callback.from_user.username,
+        )
+        return
+
+    page = max(page + (1 if direction == "older" else -1), 0)
+    try:
+        await callback.message.delete()
+    except TelegramBadRequest as e:
+        logger.error(
+            "Ошибка удаления сообщения истории для @%s: %s",
+            callback.from_user.username,
+            e,
+        )
+    await show_appeal_page(
+        callback.message, state, serial, page, tuple(cursor), direction
+    )
     await callback.answer()
     logger.info(
-        f"Показана страница {page} истории серийного номера {serial} пользователю @{callback.from_user.username} (ID: {callback.from_user.id})"
+        "Показана страница %s истории серийного номера %s пользователю @%s (ID: %s)",
+        page,
+        serial,
+        callback.from_user.username,
+        callback.from_user.id,
     )
@@ -12,6 +12,9 @@ from aiogram.filters import CommandStart, Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from pathlib import Path
+from typing import Optional
+import hashlib
+import logging
 
 from keyboards.inline import (
     ManualCategoryCallback,
@@ -27,7 +30,15 @@ import traceback
 from utils.logger import get_logger
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from utils.validators import validate_serial
-from database.db import get_serial_history, get_manual_files, get_user_training_invite
+from database.db import (
+    get_serial,
+    get_manual_files,
+    get_user_training_invite,
+    get_media_file_cache_entries,
+    save_media_file_cache_entry,
+)
+from utils.fsm_storage import expire_state
+from utils.manual_files import send_manual_record
 import asyncio
 
 logger = get_logger(__name__)
@@ -45,27 +56,137 @@ class UserState(StatesGroup):
 START_IMAGE_NAMES = ("start1.jpg", "start2.jpg", "start3.jpg")
 
 
-def get_start_media() -> list[InputMediaPhoto]:
-    media: list[InputMediaPhoto] = []
-    for image_name in START_IMAGE_NAMES:
-        image_path = public_root() / image_name
-        if not image_path.exists():
-            logger.warning(
-                "Стартовое изображение %s не найдено по пути %s",
-                image_name,
-                image_path,
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class StartMediaCache:
+    """Telegram file_id стартовых изображений, сохраняемые в таблице media_file_cache.
+
+    Изображения загружаются в Telegram один раз; дальше альбом отправляется
+    по file_id. Запись пересоздаётся, только если у файла изменился mtime/размер
+    и при этом изменилось содержимое (SHA-256).
+    """
+
+    def __init__(self, image_names: tuple[str, ...]):
+        self.image_names = image_names
+        self._entries: Optional[dict] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _media_key(image_name: str) -> str:
+        return f"start_media:{image_name}"
+
+    async def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                self._entries = await get_media_file_cache_entries(
+                    [self._media_key(name) for name in self.image_names]
+                )
+            except Exception as exc:
+                logger.warning("Не удалось загрузить кеш стартовых изображений: %s", exc)
+                return {}
+        return self._entries
+
+    async def _cached_file_id(self, image_name: str, image_path: Path) -> Optional[str]:
+        entries = await self._load()
+        entry = entries.get(self._media_key(image_name))
+        if entry is None:
+            return None
+        stat = image_path.stat()
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["telegram_file_id"]
+        # mtime изменился (например, после копирования) — сверяем содержимое
+        if await asyncio.to_thread(_file_sha256, image_path) != entry["sha256"]:
+            logger.info("Стартовое изображение %s изменилось, загрузим заново", image_name)
+            return None
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        try:
+            await save_media_file_cache_entry(
+                self._media_key(image_name),
+                entry["telegram_file_id"],
+                stat.st_mtime_ns,
+                stat.st_size,
+                entry["sha256"],
+            )
+        except Exception as exc:
+            # file_id по-прежнему верен — не сохранился только новый mtime
+            logger.warning("Не удалось обновить кеш file_id для %s: %s", image_name, exc)
+        return entry["telegram_file_id"]
+
+    async def _remember(self, image_name: str, image_path: Path, file_id: str) -> None:
+        stat = image_path.stat()
+        sha256 = await asyncio.to_thread(_file_sha256, image_path)
+        entry = {
+            "telegram_file_id": file_id,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+        }
+        if self._entries is not None:
+            self._entries[self._media_key(image_name)] = entry
+        try:
+            await save_media_file_cache_entry(
+                self._media_key(image_name), file_id, stat.st_mtime_ns, stat.st_size, sha256
             )
-            continue
-        media.append(InputMediaPhoto(media=FSInputFile(image_path)))
-    return media
+        except Exception as exc:
+            logger.warning("Не удалось сохранить file_id для %s: %s", image_name, exc)
+
+    def _existing_images(self) -> list[tuple[str, Path]]:
+        images = []
+        for image_name in self.image_names:
+            image_path = public_root() / image_name
+            if not image_path.exists():
+                logger.warning(
+                    "Стартовое изображение %s не найдено по пути %s",
+                    image_name,
+                    image_path,
+                )
+                continue
+            images.append((image_name, image_path))
+        return images
 
+    async def send(self, bot: Bot, chat_id: int) -> None:
+        """Отправляет альбом стартовых изображений в чат ``chat_id``."""
+
+        images = self._existing_images()
+        if not images:
+            return
+        async with self._lock:
+            file_ids = [
+                await self._cached_file_id(name, path) for name, path in images
+            ]
+        if all(file_ids):
+            try:
+                await bot.send_media_group(
+                    chat_id=chat_id,
+                    media=[InputMediaPhoto(media=file_id) for file_id in file_ids],
+                )
+                return
+            except TelegramBadRequest as exc:
+                logger.warning(
+                    "Telegram отклонил сохранённые стартовые изображения, загружаем заново: %s",
+                    exc,
+                )
+                file_ids = [None] * len(images)
+
+        messages = await bot.send_media_group(
+            chat_id=chat_id,
+            media=[
+                InputMediaPhoto(media=file_id or FSInputFile(path))
+                for file_id, (_, path) in zip(file_ids, images)
+            ],
+        )
+        for sent, file_id, (name, path) in zip(messages, file_ids, images):
+            if file_id is None and sent.photo:
+                await self._remember(name, path, sent.photo[-1].file_id)
 
-async def clear_serial_state(user_id, state: FSMContext, delay=12 * 3600):
-    await asyncio.sleep(delay)
-    current_state = await state.get_state()
-    if current_state:
-        await state.clear()
-        logger.info(f"Состояние серийного номера очищено для пользователя ID {user_id}")
+
+start_media_cache = StartMediaCache(START_IMAGE_NAMES)
+
+
+# Сессия с введённым серийным номером живёт 12 часов с последнего действия
+SERIAL_SESSION_TTL_SECONDS = 12 * 3600
 
 
 def _scenario_selection_keyboard() -> InlineKeyboardMarkup:
@@ -99,8 +220,13 @@ def _scenario_selection_keyboard() -> InlineKeyboardMarkup:
 async def start_command(message: Message, state: FSMContext, bot: Bot, **data):
     user_id = message.from_user.id
     username = message.from_user.username or "неизвестно"
-    logger.info(f"Получена команда /start от пользователя @{username} (ID: {user_id})")
-    logger.debug(f"Состояние FSM перед обработкой /start: {await state.get_data()}")
+    logger.info(
+        "Получена команда /start от пользователя @%s (ID: %s)", username, user_id
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Состояние FSM перед обработкой /start: %s", await state.get_data()
+        )
     db_pool = data.get("db_pool")
     if db_pool is None:
         logger.error("Database connection pool is missing in handler data")
@@ -112,13 +238,13 @@ async def start_command(message: Message, state: FSMContext, bot: Bot, **data):
         admin = await conn.fetchrow(
             "SELECT admin_id FROM admins WHERE admin_id = $1", user_id
         )
-        logger.debug(f"Результат запроса admins для ID {user_id}: {admin}")
+        logger.debug("Результат запроса admins для ID %s: %s", user_id, admin)
         if admin or user_id in MAIN_ADMIN_IDS:
             is_admin = True
         employee = await conn.fetchrow(
             "SELECT user_id, serial FROM users WHERE user_id = $1", user_id
         )
-        logger.debug(f"Результат запроса users для ID {user_id}: {employee}")
+        logger.debug("Результат запроса users для ID %s: %s", user_id, employee)
         if employee:
             is_employee = True
     await state.clear()
@@ -127,26 +253,26 @@ async def start_command(message: Message, state: FSMContext, bot: Bot, **data):
             "Добро пожаловать, администратор!", reply_markup=get_admin_menu(user_id)
         )
         logger.debug(
-            f"Пользователь @{username} (ID: {user_id}) определён как администратор"
+            "Пользователь @%s (ID: %s) определён как администратор", username, user_id
+        )
+        logger.debug(
+            "Пользователь @%s (ID: %s) получил админское меню", username, user_id
         )
-        logger.debug(f"Пользователь @{username} (ID: {user_id}) получил админское меню")
     elif is_employee:
         serial = employee["serial"]
         await state.update_data(serial=serial)
         await state.set_state(UserState.menu)
         await message.answer("Добро пожаловать!", reply_markup=get_user_menu())
         logger.debug(
-            f"Пользователь @{username} (ID: {user_id}) определён как сотрудник"
+            "Пользователь @%s (ID: %s) определён как сотрудник", username, user_id
         )
         logger.debug(
-            f"Пользователь @{username} (ID: {user_id}) получил пользовательское меню"
+            "Пользователь @%s (ID: %s) получил пользовательское меню", username, user_id
         )
     else:
         await state.set_state(UserState.waiting_for_auto_delete)
         try:
-            media = get_start_media()
-            if media:
-                await bot.send_media_group(chat_id=message.chat.id, media=media)
+            await start_media_cache.send(bot, message.chat.id)
             await message.answer(
                 "⚠️В целях безопасности включите автоматическое удаление сообщений через сутки в настройках Telegram.\n"
                 "Инструкция в прикреплённых изображениях.⚠️",
@@ -162,11 +288,16 @@ async def start_command(message: Message, state: FSMContext, bot: Bot, **data):
                 ),
             )
             logger.debug(
-                f"Пользователь @{username} (ID: {user_id}) перенаправлен на запрос автоудаления"
+                "Пользователь @%s (ID: %s) перенаправлен на запрос автоудаления",
+                username,
+                user_id,
             )
         except (TelegramBadRequest, TelegramForbiddenError, FileNotFoundError) as e:
             logger.error(
-                f"Ошибка при запросе автоудаления для пользователя @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка при запросе автоудаления для пользователя @%s (ID: %s): %s",
+                username,
+                user_id,
+                e,
             )
             await message.answer("Ошибка. Попробуйте снова.")
 
@@ -176,7 +307,7 @@ async def confirm_auto_delete(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     username = callback.from_user.username or "неизвестно"
     logger.debug(
-        f"Обработка confirm_auto_delete для пользователя @{username} (ID: {user_id})"
+        "Обработка confirm_auto_delete для пользователя @%s (ID: %s)", username, user_id
     )
     await callback.message.delete()
     await callback.message.answer(
@@ -185,7 +316,9 @@ async def confirm_auto_delete(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(None)
     logger.debug(
-        f"Пользователь @{username} (ID: {user_id}) подтвердил автоудаление и запрошен выбор сценария"
+        "Пользователь @%s (ID: %s) подтвердил автоудаление и запрошен выбор сценария",
+        username,
+        user_id,
     )
     await callback.answer()
 
@@ -220,7 +353,9 @@ async def request_support(callback: CallbackQuery, state: FSMContext):
     await state.update_data(scenario="support")
     await state.set_state(UserState.waiting_for_code_word)
     logger.debug(
-        f"Пользователь @{username} (ID: {user_id}) выбрал запрос техподдержки и ожидает кодовое слово"
+        "Пользователь @%s (ID: %s) выбрал запрос техподдержки и ожидает кодовое слово",
+        username,
+        user_id,
     )
     await callback.answer()
 
@@ -240,7 +375,9 @@ async def setup_manual(callback: CallbackQuery, state: FSMContext):
     await state.update_data(scenario="manual")
     await state.set_state(UserState.waiting_for_code_word)
     logger.debug(
-        f"Пользователь @{username} (ID: {user_id}) выбрал руководство по настройке и ожидает кодовое слово"
+        "Пользователь @%s (ID: %s) выбрал руководство по настройке и ожидает кодовое слово",
+        username,
+        user_id,
     )
     await callback.answer()
 
@@ -324,7 +461,10 @@ async def process_code_word_user(message: Message, state: FSMContext, **data):
                 ),
             )
             logger.warning(
-                f"Неверное кодовое слово '{code_word}' от @{username} (ID: {user_id}) для пользовательского сценария"
+                "Неверное кодовое слово '%s' от @%s (ID: %s) для пользовательского сценария",
+                code_word,
+                username,
+                user_id,
             )
             return
     await state.update_data(code_word=code_word)
@@ -399,13 +539,17 @@ async def process_code_word_user(message: Message, state: FSMContext, **data):
         )
         await state.set_state(UserState.waiting_for_serial)
         logger.info(
-            f"Кодовое слово принято от @{username} (ID: {user_id}); переход к запросу серийного номера"
+            "Кодовое слово принято от @%s (ID: %s); переход к запросу серийного номера",
+            username,
+            user_id,
         )
     try:
         await message.delete()
     except TelegramBadRequest:
         logger.debug(
-            f"Не удалось удалить сообщение с кодовым словом от @{username} (ID: {user_id})"
+            "Не удалось удалить сообщение с кодовым словом от @%s (ID: %s)",
+            username,
+            user_id,
         )
 
 
@@ -416,7 +560,9 @@ async def select_scenario(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(None)
     logger.debug(
-        f"Пользователь @{callback.from_user.username} (ID: {callback.from_user.id}) вернулся к выбору сценария"
+        "Пользователь @%s (ID: %s) вернулся к выбору сценария",
+        callback.from_user.username,
+        callback.from_user.id,
     )
     await callback.answer()
 
@@ -426,7 +572,10 @@ async def process_serial(message: Message, state: FSMContext, **data):
     user_id = message.from_user.id
     username = message.from_user.username or "неизвестно"
     logger.debug(
-        f"Обработка серийного номера {message.text} от пользователя @{username} (ID: {user_id})"
+        "Обработка серийного номера %s от пользователя @%s (ID: %s)",
+        message.text,
+        username,
+        user_id,
     )
     db_pool = data["db_pool"]
     serial = message.text.strip()
@@ -440,10 +589,10 @@ async def process_serial(message: Message, state: FSMContext, **data):
             "Некорректный серийный номер. Введите заново:", reply_markup=keyboard
         )
         logger.warning(
-            f"Некорректный серийный номер {serial} от @{username} (ID: {user_id})"
+            "Некорректный серийный номер %s от @%s (ID: %s)", serial, username, user_id
         )
         return
-    serial_data, appeals = await get_serial_history(serial)
+    serial_data = await get_serial(serial)
     if not serial_data:
         keyboard = InlineKeyboardMarkup(
             inline_keyboard=[
@@ -453,7 +602,7 @@ async def process_serial(message: Message, state: FSMContext, **data):
         await message.answer(
             f"Серийный номер {serial} не найден.", reply_markup=keyboard
         )
-        logger.warning(f"Серийный номер {serial} не найден для @{username}")
+        logger.warning("Серийный номер %s не найден для @%s", serial, username)
         return
     await state.update_data(serial=serial)
     data_state = await state.get_data()
@@ -463,16 +612,18 @@ async def process_serial(message: Message, state: FSMContext, **data):
         await message.delete()
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка удаления сообщения от @{username} (ID: {user_id}): {str(e)}"
+            "Ошибка удаления сообщения от @%s (ID: %s): %s", username, user_id, e
         )
     if scenario == "manual":
         await message.answer("Выберите руководство:", reply_markup=get_manuals_menu())
     else:
         await message.answer("Добро пожаловать!", reply_markup=get_user_menu())
     logger.info(
-        f"Серийный номер {serial} сохранён в состоянии для пользователя ID {user_id}"
+        "Серийный номер %s сохранён в состоянии для пользователя ID %s", serial, user_id
     )
-    asyncio.create_task(clear_serial_state(user_id, state))
+    # Срок хранится в самой записи FSM: просроченное состояние отбрасывается
+    # при следующем обращении или периодической очисткой, без фоновых задач
+    await expire_state(state, SERIAL_SESSION_TTL_SECONDS)
 
 
 @router.callback_query(F.data == "main_menu")
@@ -482,7 +633,9 @@ async def return_to_main_menu(
     user_id = callback.from_user.id
     username = callback.from_user.username or "неизвестно"
     logger.debug(
-        f"Обработка возврата в главное меню для пользователя @{username} (ID: {user_id})"
+        "Обработка возврата в главное меню для пользователя @%s (ID: %s)",
+        username,
+        user_id,
     )
     db_pool = data["db_pool"]
     is_admin = False
@@ -491,20 +644,23 @@ async def return_to_main_menu(
         admin = await conn.fetchrow(
             "SELECT admin_id FROM admins WHERE admin_id = $1", user_id
         )
-        logger.debug(f"Результат запроса admins для ID {user_id}: {admin}")
+        logger.debug("Результат запроса admins для ID %s: %s", user_id, admin)
         if admin or user_id in MAIN_ADMIN_IDS:
             is_admin = True
         employee = await conn.fetchrow(
             "SELECT user_id, serial FROM users WHERE user_id = $1", user_id
         )
-        logger.debug(f"Результат запроса users для ID {user_id}: {employee}")
+        logger.debug("Результат запроса users для ID %s: %s", user_id, employee)
         if employee:
             is_employee = True
     try:
         await callback.message.delete()
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка удаления сообщения для пользователя @{username} (ID: {user_id}): {str(e)}"
+            "Ошибка удаления сообщения для пользователя @%s (ID: %s): %s",
+            username,
+            user_id,
+            e,
         )
     if is_admin:
         await state.clear()
@@ -514,7 +670,7 @@ async def return_to_main_menu(
             reply_markup=get_admin_menu(user_id),
         )
         logger.debug(
-            f"Пользователь @{username} (ID: {user_id}) вернулся в админское меню"
+            "Пользователь @%s (ID: %s) вернулся в админское меню", username, user_id
         )
     elif is_employee:
         serial = employee["serial"]
@@ -526,7 +682,9 @@ async def return_to_main_menu(
             reply_markup=get_user_menu(),
         )
         logger.debug(
-            f"Пользователь @{username} (ID: {user_id}) вернулся в пользовательское меню"
+            "Пользователь @%s (ID: %s) вернулся в пользовательское меню",
+            username,
+            user_id,
         )
     else:
         data_state = await state.get_data()
@@ -540,7 +698,9 @@ async def return_to_main_menu(
                 reply_markup=_scenario_selection_keyboard(),
             )
             logger.debug(
-                f"Пользователь @{username} (ID: {user_id}) возвращён в главное меню выбора"
+                "Пользователь @%s (ID: %s) возвращён в главное меню выбора",
+                username,
+                user_id,
             )
             await callback.answer()
             return
@@ -552,16 +712,12 @@ async def return_to_main_menu(
                 reply_markup=get_user_menu(),
             )
             logger.debug(
-                f"Пользователь @{username} (ID: {user_id}) вернулся в главное меню"
+                "Пользователь @%s (ID: %s) вернулся в главное меню", username, user_id
             )
         else:
             await state.set_state(UserState.waiting_for_auto_delete)
             try:
-                media = get_start_media()
-                if media:
-                    await bot.send_media_group(
-                        chat_id=callback.message.chat.id, media=media
-                    )
+                await start_media_cache.send(bot, callback.message.chat.id)
                 await bot.send_message(
                     chat_id=callback.message.chat.id,
                     text="⚠️В целях безопасности включите автоматическое удаление сообщений через сутки в настройках Telegram.\n"
@@ -578,11 +734,16 @@ async def return_to_main_menu(
                     ),
                 )
                 logger.debug(
-                    f"Пользователь @{username} (ID: {user_id}) перенаправлен на запрос автоудаления"
+                    "Пользователь @%s (ID: %s) перенаправлен на запрос автоудаления",
+                    username,
+                    user_id,
                 )
             except (TelegramBadRequest, TelegramForbiddenError, FileNotFoundError) as e:
                 logger.error(
-                    f"Ошибка возврата в главное меню для пользователя @{username} (ID: {user_id}): {str(e)}"
+                    "Ошибка возврата в главное меню для пользователя @%s (ID: %s): %s",
+                    username,
+                    user_id,
+                    e,
                 )
                 await bot.send_message(
                     chat_id=callback.message.chat.id, text="Ошибка. Попробуйте снова."
@@ -622,22 +783,12 @@ async def send_manual(callback: CallbackQuery, callback_data: dict):
     )
     total = len(files)
     for idx, record in enumerate(files):
-        file_path = public_root() / record["file_path"]
         reply_markup = back_markup if idx == total - 1 else None
         file_type = record["file_type"] if "file_type" in record else None
         try:
-            if file_type == "image":
-                await callback.message.answer_photo(
-                    FSInputFile(file_path), reply_markup=reply_markup
-                )
-            elif file_type == "video":
-                await callback.message.answer_video(
-                    FSInputFile(file_path), reply_markup=reply_markup
-                )
-            else:
-                await callback.message.answer_document(
-                    FSInputFile(file_path), reply_markup=reply_markup
-                )
+            await send_manual_record(
+                callback.message, record, reply_markup=reply_markup
+            )
         except Exception as exc:  # pragma: no cover - сетевые ошибки Telegram
             logger.error(
                 "Не удалось отправить файл руководства %s (%s): %s",
@@ -664,7 +815,10 @@ async def error_handler(event: ErrorEvent):
     )
     exc_info = traceback.format_exc()
     logger.error(
-        f"Ошибка: {event.exception} от пользователя @{user}\nПодробности: {exc_info}"
+        "Ошибка: %s от пользователя @%s\nПодробности: %s",
+        event.exception,
+        user,
+        exc_info,
     )
     if event.update.message:
         await event.update.message.answer(
@@ -51,7 +51,9 @@ async def enroll_training_prompt(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(UserExam.code_word)
     logger.debug(
-        f"Пользователь @{callback.from_user.username} (ID: {callback.from_user.id}) запросил запись на обучение"
+        "Пользователь @%s (ID: %s) запросил запись на обучение",
+        callback.from_user.username,
+        callback.from_user.id,
     )
 
 
@@ -75,7 +77,7 @@ async def process_code_word(message: Message, state: FSMContext, **data):
             "SELECT code_word FROM training_centers WHERE LOWER(code_word) = LOWER($1)",
             code_word,
         )
-        logger.debug(f"Запрошено кодовое слово: {db_code_word}")
+        logger.debug("Запрошено кодовое слово: %s", db_code_word)
         if not db_code_word:
             await message.answer(
                 "Неверное кодовое слово. Попробуйте снова:",
@@ -90,7 +92,10 @@ async def process_code_word(message: Message, state: FSMContext, **data):
                 ),
             )
             logger.warning(
-                f"Неверное кодовое слово '{code_word}' от пользователя @{message.from_user.username} (ID: {message.from_user.id})"
+                "Неверное кодовое слово '%s' от пользователя @%s (ID: %s)",
+                code_word,
+                message.from_user.username,
+                message.from_user.id,
             )
             return
     await state.update_data(code_word=code_word)
@@ -106,7 +111,10 @@ async def process_code_word(message: Message, state: FSMContext, **data):
     )
     await state.set_state(UserExam.fio)
     logger.debug(
-        f"Кодовое слово {code_word} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Кодовое слово %s принято от @%s (ID: %s)",
+        code_word,
+        message.from_user.username,
+        message.from_user.id,
     )
 
 
@@ -126,16 +134,21 @@ async def process_fio(message: Message, state: FSMContext, bot: Bot):
     )
     await state.set_state(UserExam.personal_number)
     logger.debug(
-        f"ФИО {fio} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "ФИО %s принято от @%s (ID: %s)",
+        fio,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с ФИО удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с ФИО удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с ФИО для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с ФИО для @%s: %s", message.from_user.username, e
         )
 
 
@@ -155,16 +168,23 @@ async def process_personal_number(message: Message, state: FSMContext, bot: Bot)
     )
     await state.set_state(UserExam.military_unit)
     logger.debug(
-        f"Личный номер {personal_number} принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Личный номер %s принят от @%s (ID: %s)",
+        personal_number,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с личным номером удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с личным номером удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с личным номером для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с личным номером для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -184,16 +204,21 @@ async def process_military_unit(message: Message, state: FSMContext, bot: Bot):
     )
     await state.set_state(UserExam.subdivision)
     logger.debug(
-        f"В/Ч {military_unit} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "В/Ч %s принято от @%s (ID: %s)",
+        military_unit,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с В/Ч удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с В/Ч удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с В/Ч для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с В/Ч для @%s: %s", message.from_user.username, e
         )
 
 
@@ -213,16 +238,23 @@ async def process_subdivision(message: Message, state: FSMContext, bot: Bot):
     )
     await state.set_state(UserExam.callsign)
     logger.debug(
-        f"Подразделение {subdivision} принято от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Подразделение %s принято от @%s (ID: %s)",
+        subdivision,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с подразделением удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с подразделением удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с подразделением для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с подразделением для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -242,16 +274,23 @@ async def process_callsign(message: Message, state: FSMContext, bot: Bot):
     )
     await state.set_state(UserExam.specialty)
     logger.debug(
-        f"Позывной {callsign} принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Позывной %s принят от @%s (ID: %s)",
+        callsign,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с позывным удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с позывным удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с позывным для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с позывным для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -274,13 +313,18 @@ async def process_specialty(message: Message, state: FSMContext, bot: Bot):
     )
     await state.set_state(UserExam.contact)
     logger.debug(
-        f"Направление {specialty} принята от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Направление %s принята от @%s (ID: %s)",
+        specialty,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с направлением для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с направлением для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -302,22 +346,31 @@ async def process_contact(message: Message, state: FSMContext, bot: Bot):
     await _send_exam_review(message, state)
     await state.set_state(UserExam.review)
     logger.debug(
-        f"Контакт {contact_value} принят от @{message.from_user.username} (ID: {message.from_user.id})"
+        "Контакт %s принят от @%s (ID: %s)",
+        contact_value,
+        message.from_user.username,
+        message.from_user.id,
     )
     try:
         await bot.delete_message(chat_id=message.chat.id, message_id=message.message_id)
         logger.debug(
-            f"Сообщение с контактом удалено для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Сообщение с контактом удалено для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
     except Exception as e:
         logger.error(
-            f"Ошибка удаления сообщения с контактом для @{message.from_user.username}: {str(e)}"
+            "Ошибка удаления сообщения с контактом для @%s: %s",
+            message.from_user.username,
+            e,
         )
     try:
         await message.answer("Контакт сохранен", reply_markup=ReplyKeyboardRemove())
     except Exception as e:
         logger.error(
-            f"Не удалось убрать клавиатуру после отправки контакта для @{message.from_user.username}: {str(e)}"
+            "Не удалось убрать клавиатуру после отправки контакта для @%s: %s",
+            message.from_user.username,
+            e,
         )
 
 
@@ -349,7 +402,9 @@ async def process_training_center(callback: CallbackQuery, state: FSMContext, **
         )
         if is_admin:
             logger.debug(
-                f"Пропускаем select_center_ для администратора @{username} (ID: {user_id})"
+                "Пропускаем select_center_ для администратора @%s (ID: %s)",
+                username,
+                user_id,
             )
             await callback.answer()
             return  # Админы обрабатываются в admin_panel.py
@@ -381,7 +436,7 @@ async def process_training_center(callback: CallbackQuery, state: FSMContext, **
                     ]
                 ),
             )
-            logger.warning(f"УТЦ ID {center_id} не найден для @{username}")
+            logger.warning("УТЦ ID %s не найден для @%s", center_id, username)
             await callback.answer()
             return
         exam_id = await validate_exam_record(
@@ -420,7 +475,11 @@ async def process_training_center(callback: CallbackQuery, state: FSMContext, **
             ),
         )
         logger.info(
-            f"Пользователь @{username} (ID: {user_id}) записан на обучение в {center['center_name']} (ID: {center_id})"
+            "Пользователь @%s (ID: %s) записан на обучение в %s (ID: %s)",
+            username,
+            user_id,
+            center['center_name'],
+            center_id,
         )
     await state.clear()
     await callback.answer()
@@ -449,7 +508,9 @@ async def confirm_exam_data(callback: CallbackQuery, state: FSMContext, **data):
             ),
         )
         logger.warning(
-            f"УТЦ не найдены для @{callback.from_user.username} (ID: {callback.from_user.id})"
+            "УТЦ не найдены для @%s (ID: %s)",
+            callback.from_user.username,
+            callback.from_user.id,
         )
         await state.clear()
         await callback.answer()
@@ -504,7 +565,7 @@ async def edit_exam_field(callback: CallbackQuery, state: FSMContext):
     }.get(action)
 
     if not target_state:
-        logger.warning(f"Неизвестное поле редактирования: {action}")
+        logger.warning("Неизвестное поле редактирования: %s", action)
         await callback.answer("Неизвестное поле")
         return
 
@@ -30,7 +30,7 @@ from datetime import datetime
 import json
 from config import MAIN_ADMIN_IDS
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
-from handlers.common_handlers import UserState, get_start_media
+from handlers.common_handlers import UserState, start_media_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -52,7 +52,7 @@ async def create_appeal_prompt(callback: CallbackQuery, state: FSMContext, bot:
     user_id = callback.from_user.id
     username = callback.from_user.username or "неизвестно"
     logger.debug(
-        f"Обработка создания заявки для пользователя @{username} (ID: {user_id})"
+        "Обработка создания заявки для пользователя @%s (ID: %s)", username, user_id
     )
     data_state = await state.get_data()
     serial = data_state.get("serial")
@@ -73,15 +73,18 @@ async def create_appeal_prompt(callback: CallbackQuery, state: FSMContext, bot:
                     ]
                 ),
             )
-            media = get_start_media()
-            if media:
-                await bot.send_media_group(chat_id=callback.message.chat.id, media=media)
+            await start_media_cache.send(bot, callback.message.chat.id)
             logger.debug(
-                f"Пользователь @{username} (ID: {user_id}) перенаправлен на запрос автоудаления"
+                "Пользователь @%s (ID: %s) перенаправлен на запрос автоудаления",
+                username,
+                user_id,
             )
         except (TelegramBadRequest, TelegramForbiddenError, FileNotFoundError) as e:
             logger.error(
-                f"Ошибка перенаправления на автоудаление для пользователя @{username} (ID: {user_id}): {str(e)}"
+                "Ошибка перенаправления на автоудаление для пользователя @%s (ID: %s): %s",
+                username,
+                user_id,
+                e,
             )
             await callback.message.edit_text("Ошибка. Попробуйте снова.")
         await callback.answer()
@@ -95,7 +98,7 @@ async def create_appeal_prompt(callback: CallbackQuery, state: FSMContext, bot:
             ]
         ),
     )
-    logger.info(f"Пользователь @{username} (ID: {user_id}) начал создание заявки")
+    logger.info("Пользователь @%s (ID: %s) начал создание заявки", username, user_id)
     await callback.answer()
 
 
@@ -124,7 +127,9 @@ async def process_description(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Пустое описание (нет текста) от @{message.from_user.username} (ID: {message.from_user.id})"
+            "Пустое описание (нет текста) от @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
         return
     description = message.text.strip()
@@ -139,7 +144,9 @@ async def process_description(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Пустое описание от @{message.from_user.username} (ID: {message.from_user.id})"
+            "Пустое описание от @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
         return
     data = await state.get_data()
@@ -156,13 +163,19 @@ async def process_description(message: Message, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Дубликат обращения для серийника {serial} от @{message.from_user.username} (ID: {user_id})"
+            "Дубликат обращения для серийника %s от @%s (ID: %s)",
+            serial,
+            message.from_user.username,
+            user_id,
         )
         try:
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления сообщения с описанием от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+                "Ошибка удаления сообщения с описанием от @%s (ID: %s): %s",
+                message.from_user.username,
+                message.from_user.id,
+                e,
             )
         return
     await state.update_data(description=description, media_files=[])
@@ -180,10 +193,15 @@ async def process_description(message: Message, state: FSMContext, **data):
         await message.delete()
     except TelegramBadRequest as e:
         logger.error(
-            f"Ошибка удаления сообщения с описанием от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+            "Ошибка удаления сообщения с описанием от @%s (ID: %s): %s",
+            message.from_user.username,
+            message.from_user.id,
+            e,
         )
     await state.set_state(AppealForm.media)
-    logger.debug(f"Описание принято от @{message.from_user.username} (ID: {user_id})")
+    logger.debug(
+        "Описание принято от @%s (ID: %s)", message.from_user.username, user_id
+    )
 
 
 @router.message(StateFilter(AppealForm.media))
@@ -205,7 +223,9 @@ async def process_media(message: Message, state: FSMContext):
             ),
         )
         logger.warning(
-            f"Достигнуто максимальное количество файлов для @{message.from_user.username} (ID: {message.from_user.id})"
+            "Достигнуто максимальное количество файлов для @%s (ID: %s)",
+            message.from_user.username,
+            message.from_user.id,
         )
         return
     keyboard = InlineKeyboardMarkup(
@@ -229,7 +249,9 @@ async def process_media(message: Message, state: FSMContext):
                 reply_markup=keyboard,
             )
             logger.warning(
-                f"Файл превышает 200 МБ от @{message.from_user.username} (ID: {message.from_user.id})"
+                "Файл превышает 200 МБ от @%s (ID: %s)",
+                message.from_user.username,
+                message.from_user.id,
             )
             return
         media_files.extend(media)
@@ -238,14 +260,20 @@ async def process_media(message: Message, state: FSMContext):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления медиафайла от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+                "Ошибка удаления медиафайла от @%s (ID: %s): %s",
+                message.from_user.username,
+                message.from_user.id,
+                e,
             )
         await message.answer(
             f"Файл добавлен ({len(media_files)}/10). Прикрепите ещё или нажмите 'Готово':",
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Медиа ({media[0]['type']}) добавлен пользователем @{message.from_user.username} (ID: {message.from_user.id})"
+            "Медиа (%s) добавлен пользователем @%s (ID: %s)",
+            media[0]['type'],
+            message.from_user.username,
+            message.from_user.id,
         )
     else:
         await message.answer(
@@ -253,7 +281,7 @@ async def process_media(message: Message, state: FSMContext):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Неподдерживаемый формат медиа от @{message.from_user.username}"
+            "Неподдерживаемый формат медиа от @%s", message.from_user.username
         )
 
 
@@ -306,14 +334,20 @@ async def process_reply_message(message: Message, state: FSMContext, **data):
             await message.delete()
         except TelegramBadRequest as e:
             logger.error(
-                f"Ошибка удаления текстового ответа для заявки №{appeal_id} от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+                "Ошибка удаления текстового ответа для заявки №%s от @%s (ID: %s): %s",
+                appeal_id,
+                message.from_user.username,
+                message.from_user.id,
+                e,
             )
         await message.answer(
             "Текст добавлен. Прикрепите медиа или нажмите 'Готово':",
             reply_markup=keyboard,
         )
         logger.debug(
-            f"Текст ответа добавлен для заявки №{appeal_id} от @{message.from_user.username}"
+            "Текст ответа добавлен для заявки №%s от @%s",
+            appeal_id,
+            message.from_user.username,
         )
     else:
         is_valid, media = validate_media(message)
@@ -331,7 +365,9 @@ async def process_reply_message(message: Message, state: FSMContext, **data):
                     reply_markup=keyboard,
                 )
                 logger.warning(
-                    f"Файл превышает 200 МБ от @{message.from_user.username} (ID: {message.from_user.id})"
+                    "Файл превышает 200 МБ от @%s (ID: %s)",
+                    message.from_user.username,
+                    message.from_user.id,
                 )
                 return
             reply_media.extend(media)
@@ -340,14 +376,21 @@ async def process_reply_message(message: Message, state: FSMContext, **data):
                 await message.delete()
             except TelegramBadRequest as e:
                 logger.error(
-                    f"Ошибка удаления медиафайла ответа для заявки №{appeal_id} от @{message.from_user.username} (ID: {message.from_user.id}): {str(e)}"
+                    "Ошибка удаления медиафайла ответа для заявки №%s от @%s (ID: %s): %s",
+                    appeal_id,
+                    message.from_user.username,
+                    message.from_user.id,
+                    e,
                 )
             await message.answer(
                 f"Медиа добавлено ({len(reply_media)}/10). Прикрепите ещё или нажмите 'Готово':",
                 reply_markup=keyboard,
             )
             logger.debug(
-                f"Медиа ({media[0]['type']}) добавлено для ответа по заявке №{appeal_id} от @{message.from_user.username}"
+                "Медиа (%s) добавлено для ответа по заявке №%s от @%s",
+                media[0]['type'],
+                appeal_id,
+                message.from_user.username,
             )
         else:
             await message.answer(
@@ -355,7 +398,9 @@ async def process_reply_message(message: Message, state: FSMContext, **data):
                 reply_markup=keyboard,
             )
             logger.warning(
-                f"Неподдерживаемый формат медиа для ответа по заявке №{appeal_id} от @{message.from_user.username}"
+                "Неподдерживаемый формат медиа для ответа по заявке №%s от @%s",
+                appeal_id,
+                message.from_user.username,
             )
 
 
@@ -391,7 +436,10 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
             reply_markup=keyboard,
         )
         logger.warning(
-            f"Дублирующая заявка для серийника {serial} от @{callback.from_user.username} (ID: {user_id})"
+            "Дублирующая заявка для серийника %s от @%s (ID: %s)",
+            serial,
+            callback.from_user.username,
+            user_id,
         )
         await state.clear()
         await state.update_data(serial=serial)
@@ -410,10 +458,13 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
             f"Обращение №{appeal_id} создано!", reply_markup=keyboard
         )
         logger.info(
-            f"Обращение №{appeal_id} создано пользователем @{callback.from_user.username} (ID: {user_id})"
+            "Обращение №%s создано пользователем @%s (ID: %s)",
+            appeal_id,
+            callback.from_user.username,
+            user_id,
         )
         channels = await get_notification_channels()
-        logger.debug(f"Найдено каналов для уведомлений: {len(channels)}")
+        logger.debug("Найдено каналов для уведомлений: %s", len(channels))
         created_at = datetime.now().strftime("%Y-%m-%d %H:%M")
         appeal_type = "Первая" if appeal_count == 1 else "Повторная"
         text = (
@@ -455,11 +506,18 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
                         f"appeal_id:{appeal_id}",
                     )
                     logger.info(
-                        f"Уведомление о заявке №{appeal_id} отправлено в канал {channel['channel_name']} (ID: {channel['channel_id']})"
+                        "Уведомление о заявке №%s отправлено в канал %s (ID: %s)",
+                        appeal_id,
+                        channel['channel_name'],
+                        channel['channel_id'],
                     )
                 except (TelegramBadRequest, TelegramForbiddenError) as e:
                     logger.error(
-                        f"Ошибка отправки в канал {channel['channel_name']} (ID: {channel['channel_id']}) для заявки №{appeal_id}: {str(e)}"
+                        "Ошибка отправки в канал %s (ID: %s) для заявки №%s: %s",
+                        channel['channel_name'],
+                        channel['channel_id'],
+                        appeal_id,
+                        e,
                     )
         recipients = set()
         async with db_pool.acquire() as conn:
@@ -471,7 +529,9 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
             logger.warning("Нет получателей для уведомлений")
         else:
             logger.debug(
-                f"Найдено получателей для уведомлений: {len(recipients)}: {list(recipients)}"
+                "Найдено получателей для уведомлений: %s: %s",
+                len(recipients),
+                list(recipients),
             )
             for admin_id in recipients:
                 try:
@@ -491,11 +551,16 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
                         reply_markup=get_notification_menu(appeal_id),
                     )
                     logger.info(
-                        f"Уведомление о заявке №{appeal_id} отправлено админу ID {admin_id}"
+                        "Уведомление о заявке №%s отправлено админу ID %s",
+                        appeal_id,
+                        admin_id,
                     )
                 except (TelegramBadRequest, TelegramForbiddenError) as e:
                     logger.error(
-                        f"Ошибка отправки админу ID {admin_id} для заявки №{appeal_id}: {str(e)}"
+                        "Ошибка отправки админу ID %s для заявки №%s: %s",
+                        admin_id,
+                        appeal_id,
+                        e,
                     )
         await state.clear()
         await state.update_data(serial=serial)
@@ -509,7 +574,7 @@ async def submit_appeal(callback: CallbackQuery, state: FSMContext, **data):
         await callback.message.edit_text(
             f"Ошибка при создании обращения: {str(e)}", reply_markup=keyboard
         )
-        logger.error(f"Ошибка при создании обращения для серийника {serial}: {str(e)}")
+        logger.error("Ошибка при создании обращения для серийника %s: %s", serial, e)
         await state.clear()
         await state.update_data(serial=serial)
         await callback.answer()
@@ -545,7 +610,9 @@ async def submit_reply_user(callback: CallbackQuery, state: FSMContext, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     existing_response = appeal["response"] or ""
@@ -599,7 +666,9 @@ async def submit_reply_user(callback: CallbackQuery, state: FSMContext, **data):
                 ),
             )
             logger.info(
-                f"Уведомление отправлено администратору ID {appeal['admin_id']} для заявки №{appeal_id}"
+                "Уведомление отправлено администратору ID %s для заявки №%s",
+                appeal['admin_id'],
+                appeal_id,
             )
         for admin_id in MAIN_ADMIN_IDS:
             if admin_id != appeal["admin_id"]:
@@ -628,16 +697,20 @@ async def submit_reply_user(callback: CallbackQuery, state: FSMContext, **data):
                     ),
                 )
                 logger.info(
-                    f"Уведомление отправлено главному админу ID {admin_id} для заявки №{appeal_id}"
+                    "Уведомление отправлено главному админу ID %s для заявки №%s",
+                    admin_id,
+                    appeal_id,
                 )
     except (TelegramBadRequest, TelegramForbiddenError) as e:
         logger.error(
-            f"Ошибка отправки уведомления администратору для заявки №{appeal_id}: {str(e)}"
+            "Ошибка отправки уведомления администратору для заявки №%s: %s",
+            appeal_id,
+            e,
         )
     try:
         await callback.message.delete()
     except TelegramBadRequest as e:
-        logger.error(f"Ошибка удаления сообщения: {str(e)}")
+        logger.error("Ошибка удаления сообщения: %s", e)
     await callback.message.answer(
         "Ответ отправлен.",
         reply_markup=InlineKeyboardMarkup(
@@ -653,7 +726,9 @@ async def submit_reply_user(callback: CallbackQuery, state: FSMContext, **data):
     await state.clear()
     await state.update_data(serial=serial)  # Сохраняем serial
     logger.info(
-        f"Ответ по заявке №{appeal_id} отправлен пользователем @{callback.from_user.username}"
+        "Ответ по заявке №%s отправлен пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
     await callback.answer()
 
@@ -682,7 +757,9 @@ async def show_my_appeals_user(callback: CallbackQuery, **data):
         )
         await callback.message.edit_text("У вас нет заявок.", reply_markup=keyboard)
         logger.info(
-            f"У пользователя @{callback.from_user.username} (ID: {user_id}) нет заявок"
+            "У пользователя @%s (ID: %s) нет заявок",
+            callback.from_user.username,
+            user_id,
         )
         return
     await callback.message.delete()
@@ -690,7 +767,10 @@ async def show_my_appeals_user(callback: CallbackQuery, **data):
         "Ваши обращения:", reply_markup=get_my_appeals_user_menu(appeals)
     )
     logger.info(
-        f"Пользователь @{callback.from_user.username} (ID: {user_id}) запросил свои заявки, найдено: {len(appeals)}"
+        "Пользователь @%s (ID: %s) запросил свои заявки, найдено: %s",
+        callback.from_user.username,
+        user_id,
+        len(appeals),
     )
 
 
@@ -709,7 +789,9 @@ async def view_appeal_user(callback: CallbackQuery, state: FSMContext, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     media_files = json.loads(appeal["media_files"] or "[]")  # Проверяем наличие медиа
@@ -729,7 +811,9 @@ async def view_appeal_user(callback: CallbackQuery, state: FSMContext, **data):
     await callback.message.delete()
     await callback.message.answer(response, reply_markup=keyboard)
     logger.info(
-        f"Заявка №{appeal_id} просмотрена пользователем @{callback.from_user.username}"
+        "Заявка №%s просмотрена пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -761,7 +845,9 @@ async def show_user_media(callback: CallbackQuery, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     media_files = json.loads(appeal["media_files"] or "[]")
@@ -780,7 +866,7 @@ async def show_user_media(callback: CallbackQuery, **data):
                 ]
             ),
         )
-        logger.info(f"Медиафайлы отсутствуют для заявки №{appeal_id}")
+        logger.info("Медиафайлы отсутствуют для заявки №%s", appeal_id)
         return
     await callback.message.delete()
     for media in media_files:
@@ -796,7 +882,11 @@ async def show_user_media(callback: CallbackQuery, **data):
                     )
         except (TelegramBadRequest, TelegramForbiddenError) as e:
             logger.error(
-                f"Ошибка отправки медиа (тип: {media['type']}, file_id: {media.get('file_id')}) для заявки №{appeal_id}: {str(e)}"
+                "Ошибка отправки медиа (тип: %s, file_id: %s) для заявки №%s: %s",
+                media['type'],
+                media.get('file_id'),
+                appeal_id,
+                e,
             )
     await callback.message.answer(
         "Медиафайлы отображены.",
@@ -811,7 +901,9 @@ async def show_user_media(callback: CallbackQuery, **data):
         ),
     )
     logger.info(
-        f"Медиафайлы для заявки №{appeal_id} отображены для @{callback.from_user.username}"
+        "Медиафайлы для заявки №%s отображены для @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -827,7 +919,9 @@ async def process_placeholder(callback: CallbackQuery):
         ),
     )
     logger.debug(
-        f"Пользователь @{callback.from_user.username} запросил заглушку: {callback.data}"
+        "Пользователь @%s запросил заглушку: %s",
+        callback.from_user.username,
+        callback.data,
     )
 
 
@@ -837,7 +931,10 @@ async def reply_user_prompt(callback: CallbackQuery, state: FSMContext):
     user_id = callback.from_user.id
     username = callback.from_user.username or "неизвестно"
     logger.debug(
-        f"Запрос ответа для заявки №{appeal_id} от пользователя @{username} (ID: {user_id})"
+        "Запрос ответа для заявки №%s от пользователя @%s (ID: %s)",
+        appeal_id,
+        username,
+        user_id,
     )
     appeal = await get_appeal(appeal_id)
     if not appeal:
@@ -850,7 +947,7 @@ async def reply_user_prompt(callback: CallbackQuery, state: FSMContext):
                 ]
             ),
         )
-        logger.warning(f"Заявка №{appeal_id} не найдена пользователем @{username}")
+        logger.warning("Заявка №%s не найдена пользователем @%s", appeal_id, username)
         return
     await state.update_data(
         appeal_id=appeal_id, reply_text="", reply_media=[]
@@ -870,7 +967,7 @@ async def reply_user_prompt(callback: CallbackQuery, state: FSMContext):
         "Введите ответ по заявке или прикрепите медиа:", reply_markup=keyboard
     )
     logger.debug(
-        f"Состояние FSM установлено для ответа по заявке №{appeal_id} от @{username}"
+        "Состояние FSM установлено для ответа по заявке №%s от @%s", appeal_id, username
     )
     await callback.answer()
 
@@ -904,7 +1001,9 @@ async def preview_reply_user(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     await callback.message.answer(text, reply_markup=keyboard)
     logger.debug(
-        f"Предпросмотр ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Предпросмотр ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -940,7 +1039,9 @@ async def edit_reply_user(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     await callback.message.answer("Редактирование ответа:", reply_markup=keyboard)
     logger.debug(
-        f"Редактирование ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Редактирование ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -960,7 +1061,9 @@ async def change_reply_text_user(callback: CallbackQuery, state: FSMContext):
     await callback.message.answer("Введите новый текст ответа:", reply_markup=keyboard)
     await state.set_state(AppealForm.reply_message)
     logger.debug(
-        f"Изменение текста ответа для заявки №{appeal_id} от @{callback.from_user.username}"
+        "Изменение текста ответа для заявки №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -990,7 +1093,9 @@ async def add_reply_media_user(callback: CallbackQuery, state: FSMContext):
     )
     await state.set_state(AppealForm.reply_message)
     logger.debug(
-        f"Добавление медиа для ответа по заявке №{appeal_id} от @{callback.from_user.username}"
+        "Добавление медиа для ответа по заявке №%s от @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -1012,7 +1117,9 @@ async def cancel_reply_user(callback: CallbackQuery, state: FSMContext):
         ),
     )
     logger.info(
-        f"Ответ для заявки №{appeal_id} отменён пользователем @{callback.from_user.username}"
+        "Ответ для заявки №%s отменён пользователем @%s",
+        appeal_id,
+        callback.from_user.username,
     )
 
 
@@ -1043,7 +1150,9 @@ async def close_appeal_user(callback: CallbackQuery, **data):
             ),
         )
         logger.warning(
-            f"Заявка №{appeal_id} не найдена пользователем @{callback.from_user.username}"
+            "Заявка №%s не найдена пользователем @%s",
+            appeal_id,
+            callback.from_user.username,
         )
         return
     async with db_pool.acquire() as conn:
@@ -1062,6 +1171,6 @@ async def close_appeal_user(callback: CallbackQuery, **data):
         ),
     )
     logger.info(
-        f"Заявка №{appeal_id} закрыта пользователем @{callback.from_user.username}"
+        "Заявка №%s закрыта пользователем @%s", appeal_id, callback.from_user.username
     )
     await callback.answer()
@@ -291,7 +291,7 @@ def get_admin_menu(user_id):
                 ]
             ]
         )
-    logger.debug(f"Создана клавиатура админского меню для пользователя ID {user_id}")
+    logger.debug("Создана клавиатура админского меню для пользователя ID %s", user_id)
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -308,7 +308,8 @@ def get_my_appeals_user_menu(appeals):
         )
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
     logger.debug(
-        f"Создана клавиатура для 'Мои обращения' пользователя с {len(appeals)} заявками"
+        "Создана клавиатура для 'Мои обращения' пользователя с %s заявками",
+        len(appeals),
     )
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -385,7 +386,9 @@ def get_open_appeals_menu(appeals, page, total_appeals):
         keyboard.append(nav_buttons)
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
     logger.debug(
-        f"Создана клавиатура для открытых заявок с {len(appeals)} заявками на странице {page}"
+        "Создана клавиатура для открытых заявок с %s заявками на странице %s",
+        len(appeals),
+        page,
     )
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -476,7 +479,9 @@ def get_my_appeals_menu(appeals, page, total_appeals):
         keyboard.append(nav_buttons)
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
     logger.debug(
-        f"Создана клавиатура для 'Мои заявки' с {len(appeals)} заявками на странице {page}"
+        "Создана клавиатура для 'Мои заявки' с %s заявками на странице %s",
+        len(appeals),
+        page,
     )
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -632,7 +637,7 @@ def get_remove_channel_menu(channels):
             ]
         )
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
-    logger.debug(f"Создана клавиатура для удаления каналов с {len(channels)} каналами")
+    logger.debug("Создана клавиатура для удаления каналов с %s каналами", len(channels))
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -650,7 +655,7 @@ def get_edit_channel_menu(channels):
         )
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
     logger.debug(
-        f"Создана клавиатура для редактирования каналов с {len(channels)} каналами"
+        "Создана клавиатура для редактирования каналов с %s каналами", len(channels)
     )
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -671,7 +676,7 @@ def get_training_centers_menu(centers):
         [InlineKeyboardButton(text="Добавить УТЦ", callback_data="add_training_center")]
     )
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="admin_panel")])
-    logger.debug(f"Создана клавиатура для управления УТЦ с {len(centers)} центрами")
+    logger.debug("Создана клавиатура для управления УТЦ с %s центрами", len(centers))
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
@@ -764,5 +769,5 @@ def get_employee_list_menu(admins):
             ]
         )
     keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="main_menu")])
-    logger.debug(f"Создана клавиатура для списка сотрудников с {len(admins)} админами")
+    logger.debug("Создана клавиатура для списка сотрудников с %s админами", len(admins))
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
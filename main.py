@@ -1,6 +1,5 @@
 import asyncio
 import logging
-from pathlib import Path
 from aiogram import Bot, Dispatcher, BaseMiddleware
 from aiogram.types import BotCommand, BotCommandScopeDefault, MenuButtonCommands
 from aiogram.types import (
@@ -9,14 +8,40 @@ from aiogram.types import (
     Message,
     CallbackQuery,
 )
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiogram.webhook.aiohttp_server import setup_application
 from aiohttp import web
-from config import TOKEN, API_BASE_URL, WEBHOOK_URL, MAIN_ADMIN_IDS, BOT_MODE
-from urllib.parse import quote
+from config import (
+    TOKEN,
+    API_BASE_URL,
+    WEBHOOK_URL,
+    MAIN_ADMIN_IDS,
+    BOT_MODE,
+    METRICS_TOKEN,
+    WEBHOOK_WORKERS,
+    WEBHOOK_QUEUE_LIMIT,
+    BOT_WORKER_PROCESSES,
+    BOT_WORKER_BASE_PORT,
+)
 from aiogram.exceptions import TelegramUnauthorizedError
 
-from utils.storage import ensure_within_public_root, public_root
+from utils.media_server import media_server
+from utils.cache import cache_manager
+from utils.fsm_storage import (
+    FSMWriteCoalescingMiddleware,
+    create_fsm_storage,
+    run_fsm_sweeper,
+)
+from utils.leader import SingletonJob
+from utils.loop_monitor import loop_monitor
+from utils.metrics import (
+    create_metrics_handler,
+    registry as metrics_registry,
+    setup_bot_metrics,
+    setup_dispatcher_metrics,
+)
+from utils.transcoding import transcode_service
+from utils.supervisor import ShardSupervisor
+from utils.update_queue import ChatOrderedUpdateQueue
 from utils.logger import get_logger
 from handlers import user_handlers, common_handlers, user_exam
 from handlers.admin import (
@@ -28,7 +53,9 @@ from handlers.admin import (
     overdue_checks,
     closed_appeals,
     manuals_management,
+    diagnostics,
 )
+from database import db
 from database.db import initialize_db, close_db, get_open_appeals, close_appeal
 from aiogram.client.session.aiohttp import AiohttpSession
 from datetime import datetime
@@ -46,7 +73,7 @@ class DatabaseMiddleware(BaseMiddleware):
 
     async def __call__(self, handler, event, data):
         logger.debug(
-            f"DatabaseMiddleware: Передача db_pool для события {type(event).__name__}"
+            "DatabaseMiddleware: Передача db_pool для события %s", type(event).__name__
         )
         data["db_pool"] = self.pool
         return await handler(event, data)
@@ -102,7 +129,7 @@ class SerialCheckMiddleware(BaseMiddleware):
             )
             return await handler(update, data)
 
-        logger.debug(f"SerialCheckMiddleware: Текущее состояние FSM: {current_state}")
+        logger.debug("SerialCheckMiddleware: Текущее состояние FSM: %s", current_state)
 
         if current_state and current_state.startswith("VisitState:"):
             logger.debug(
@@ -113,7 +140,7 @@ class SerialCheckMiddleware(BaseMiddleware):
             return await handler(update, data)
 
         if not hasattr(event, "chat"):
-            logger.debug(f"Пропускаем событие {type(event).__name__} без чата")
+            logger.debug("Пропускаем событие %s без чата", type(event).__name__)
             return await handler(update, data)
 
         user_id = None
@@ -147,12 +174,19 @@ class SerialCheckMiddleware(BaseMiddleware):
 
         if isinstance(event, CallbackQuery):
             logger.debug(
-                f"Пропускаем CallbackQuery для пользователя @{username} (ID: {user_id}) в чате типа {event.chat.type}"
+                "Пропускаем CallbackQuery для пользователя @%s (ID: %s) в чате типа %s",
+                username,
+                user_id,
+                event.chat.type,
             )
             return await handler(update, data)
 
         logger.debug(
-            f"Игнорируем событие {type(event).__name__} от @{username} (ID: {user_id}) в чате типа {event.chat.type}"
+            "Игнорируем событие %s от @%s (ID: %s) в чате типа %s",
+            type(event).__name__,
+            username,
+            user_id,
+            event.chat.type,
         )
         return await handler(update, data)
 
@@ -192,11 +226,16 @@ async def check_overdue_appeals(bot: Bot):
                                 ),
                             )
                             logger.info(
-                                f"Уведомление о закрытии заявки №{appeal['appeal_id']} отправлено пользователю ID {appeal['user_id']}"
+                                "Уведомление о закрытии заявки №%s отправлено пользователю ID %s",
+                                appeal['appeal_id'],
+                                appeal['user_id'],
                             )
                         except Exception as e:
                             logger.error(
-                                f"Ошибка отправки уведомления пользователю ID {appeal['user_id']} для заявки №{appeal['appeal_id']}: {e}"
+                                "Ошибка отправки уведомления пользователю ID %s для заявки №%s: %s",
+                                appeal['user_id'],
+                                appeal['appeal_id'],
+                                e,
                             )
                         if appeal["admin_id"]:
                             try:
@@ -215,11 +254,16 @@ async def check_overdue_appeals(bot: Bot):
                                     ),
                                 )
                                 logger.info(
-                                    f"Уведомление о закрытии заявки №{appeal['appeal_id']} отправлено админу ID {appeal['admin_id']}"
+                                    "Уведомление о закрытии заявки №%s отправлено админу ID %s",
+                                    appeal['appeal_id'],
+                                    appeal['admin_id'],
                                 )
                             except Exception as e:
                                 logger.error(
-                                    f"Ошибка отправки уведомления админу ID {appeal['admin_id']} для заявки №{appeal['appeal_id']}: {e}"
+                                    "Ошибка отправки уведомления админу ID %s для заявки №%s: %s",
+                                    appeal['admin_id'],
+                                    appeal['appeal_id'],
+                                    e,
                                 )
                         for main_admin_id in MAIN_ADMIN_IDS:
                             if (
@@ -242,18 +286,23 @@ async def check_overdue_appeals(bot: Bot):
                                         ),
                                     )
                                     logger.info(
-                                        f"Уведомление о закрытии заявки №{appeal['appeal_id']} отправлено главному админу ID {main_admin_id}"
+                                        "Уведомление о закрытии заявки №%s отправлено главному админу ID %s",
+                                        appeal['appeal_id'],
+                                        main_admin_id,
                                     )
                                 except Exception as e:
                                     logger.error(
-                                        f"Ошибка отправки уведомления главному админу ID {main_admin_id} для заявки №{appeal['appeal_id']}: {e}"
+                                        "Ошибка отправки уведомления главному админу ID %s для заявки №%s: %s",
+                                        main_admin_id,
+                                        appeal['appeal_id'],
+                                        e,
                                     )
                         logger.info(
-                            f"Заявка №{appeal['appeal_id']} автоматически закрыта"
+                            "Заявка №%s автоматически закрыта", appeal['appeal_id']
                         )
             await asyncio.sleep(3600)
         except Exception as e:
-            logger.error(f"Ошибка в шедулере просроченных заявок: {e}")
+            logger.error("Ошибка в шедулере просроченных заявок: %s", e)
             await asyncio.sleep(3600)
 
 
@@ -261,34 +310,12 @@ async def handle_root(request):
     return web.Response(status=404)
 
 
-async def serve_public_file(request: web.Request) -> web.StreamResponse:
-    path_fragment = request.match_info.get("path", "").strip()
-    if not path_fragment:
-        raise web.HTTPNotFound()
-
-    candidate = public_root() / Path(path_fragment)
-
-    try:
-        ensure_within_public_root(candidate)
-    except ValueError:
-        logger.warning("Попытка доступа к файлу вне публичного каталога: %s", candidate)
-        raise web.HTTPNotFound() from None
-
-    if not candidate.exists() or not candidate.is_file():
-        raise web.HTTPNotFound()
-
-    response = web.FileResponse(path=candidate)
-    safe_name = quote(candidate.name)
-    response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{safe_name}"
-    return response
-
-
 async def on_startup(app):
     bot = app["bot"]
     dp = app["dp"]
     await bot.delete_webhook(drop_pending_updates=True)
     await bot.set_webhook(WEBHOOK_URL)
-    logger.info(f"Webhook установлен: {WEBHOOK_URL}")
+    logger.info("Webhook установлен: %s", WEBHOOK_URL)
     pool = await initialize_db()
     await setup_common_features(bot, dp, pool)
 
@@ -296,18 +323,79 @@ async def on_startup(app):
 async def on_shutdown(app):
     bot = app["bot"]
     await bot.delete_webhook(drop_pending_updates=True)
-    await bot.session.close()
-    await close_db()
+    await stop_common_features(bot)
     logger.info("Webhook удалён, сессия закрыта")
 
 
-async def setup_common_features(bot: Bot, dp: Dispatcher, pool):
-    """Регистрация общих элементов для обоих режимов."""
+async def on_worker_startup(app):
+    pool = await initialize_db()
+    await setup_common_features(app["bot"], app["dp"], pool, primary=app["worker_index"] == 0)
+
+
+async def on_worker_shutdown(app):
+    await stop_common_features(app["bot"])
+
 
+async def on_front_startup(app):
+    bot = app["bot"]
+    await bot.delete_webhook(drop_pending_updates=True)
+    await bot.set_webhook(WEBHOOK_URL)
+    logger.info("Webhook установлен: %s", WEBHOOK_URL)
+
+
+async def on_front_shutdown(app):
+    await app["bot"].delete_webhook(drop_pending_updates=True)
+    logger.info("Webhook удалён")
+
+
+async def on_front_cleanup(app):
+    await app["bot"].session.close()
+
+
+_queue_depth_gauge = metrics_registry.gauge(
+    "bot_transcode_queue_depth", "Задачи сжатия видео в очереди и в работе"
+)
+_cache_bytes_gauge = metrics_registry.gauge(
+    "bot_file_cache_bytes", "Объём локального кеша загруженных файлов"
+)
+_db_pool_gauge = metrics_registry.gauge(
+    "bot_db_pool_connections", "Соединения пула PostgreSQL", ("state",)
+)
+
+
+def _collect_service_metrics() -> None:
+    _queue_depth_gauge.set(transcode_service.queue_depth)
+    _cache_bytes_gauge.set(cache_manager.stats()["size_bytes"])
+    pool = db.pool
+    if pool is not None:
+        _db_pool_gauge.set(pool.get_size(), state="open")
+        _db_pool_gauge.set(pool.get_idle_size(), state="idle")
+
+
+metrics_registry.add_collector(_collect_service_metrics)
+
+
+async def setup_common_features(bot: Bot, dp: Dispatcher, pool, primary: bool = True):
+    """Регистрация общих элементов для обоих режимов.
+
+    Автозакрытие заявок запускается во всех процессах, но работает только у
+    лидера (см. ``utils.leader``). ``primary=False`` у рабочих процессов
+    супервизора, кроме первого: очистка FSM, очистка кеша файлов и команды
+    бота — один раз на машину.
+    """
+
+    setup_bot_metrics(bot)
     dp.update.outer_middleware.register(DatabaseMiddleware(pool))
     dp.update.outer_middleware.register(SerialCheckMiddleware())
-    asyncio.create_task(check_overdue_appeals(bot))
+    asyncio.create_task(
+        SingletonJob("check_overdue_appeals", lambda: check_overdue_appeals(bot)).run()
+    )
+    loop_monitor.start()
+    if not primary:
+        return
 
+    asyncio.create_task(run_fsm_sweeper(dp.storage))
+    asyncio.create_task(cache_manager.run())
     await bot.set_chat_menu_button(menu_button=MenuButtonCommands())
     await bot.set_my_commands(
         [BotCommand(command="start", description="Главное меню")],
@@ -316,10 +404,28 @@ async def setup_common_features(bot: Bot, dp: Dispatcher, pool):
     logger.info("Команды бота обновлены и кнопка меню установлена")
 
 
-def create_dispatcher() -> Dispatcher:
-    """Создание диспетчера с регистрацией всех роутеров."""
+async def stop_common_features(bot: Bot):
+    await transcode_service.stop()
+    await loop_monitor.stop()
+    await bot.session.close()
+    await close_db()
+
+
+def create_dispatcher(coalesce_fsm_writes: bool = False) -> Dispatcher:
+    """Создание диспетчера с регистрацией всех роутеров.
+
+    Записи FSM объединяются до конца обработчика только при
+    ``coalesce_fsm_writes``: это безопасно лишь за очередью вебхука, где
+    апдейты одного чата не обрабатываются параллельно. При polling aiogram
+    запускает их одновременно, и отложенная запись одного обработчика
+    затёрла бы состояние, выставленное другим.
+    """
 
-    dp = Dispatcher(storage=MemoryStorage())
+    storage = create_fsm_storage()
+    dp = Dispatcher(storage=storage)
+    if coalesce_fsm_writes:
+        dp.update.outer_middleware.register(FSMWriteCoalescingMiddleware(storage))
+    setup_dispatcher_metrics(dp)
     dp.include_router(admin_panel.router)
     dp.include_router(user_handlers.router)
     dp.include_router(common_handlers.router)
@@ -331,6 +437,7 @@ def create_dispatcher() -> Dispatcher:
     dp.include_router(overdue_checks.router)
     dp.include_router(closed_appeals.router)
     dp.include_router(manuals_management.router)
+    dp.include_router(diagnostics.router)
     return dp
 
 
@@ -354,17 +461,42 @@ async def run_devops_mode():
             "Авторизация в Telegram API не удалась. Убедитесь, что BOT_TOKEN указан верно без кавычек и пробелов."
         ) from exc
     finally:
-        await bot.session.close()
-        await close_db()
+        await stop_common_features(bot)
+
+
+def _create_prod_bot() -> Bot:
+    return Bot(
+        token=TOKEN, session=AiohttpSession(), base_url=API_BASE_URL.format(token=TOKEN)
+    )
+
+
+def _add_public_routes(app: web.Application, metrics_sources=None):
+    app.router.add_get("/", handle_root)
+    app.router.add_get(
+        "/metrics", create_metrics_handler(METRICS_TOKEN or None, metrics_sources)
+    )
+    app.router.add_route("GET", "/files/{path:.*}", media_server.handle)
+    app.router.add_route("HEAD", "/files/{path:.*}", media_server.handle)
+
+
+def _add_update_queue(app: web.Application, dp: Dispatcher, bot: Bot):
+    # Очередь запускается и останавливается раньше диспетчера: при остановке
+    # принятые апдейты дорабатываются, пока открыты сессия бота и пул БД
+    update_queue = ChatOrderedUpdateQueue(dp, bot, WEBHOOK_WORKERS, WEBHOOK_QUEUE_LIMIT)
+    app.on_startup.append(update_queue.start)
+    app.on_shutdown.append(update_queue.stop)
+    app.router.add_post("/webhook", update_queue.handle)
 
 
 def run_prod_mode():
     """Запуск в режиме PROD с webhook и локальным Bot API."""
 
-    bot = Bot(
-        token=TOKEN, session=AiohttpSession(), base_url=API_BASE_URL.format(token=TOKEN)
-    )
-    dp = create_dispatcher()
+    if BOT_WORKER_PROCESSES > 1:
+        run_supervisor_mode()
+        return
+
+    bot = _create_prod_bot()
+    dp = create_dispatcher(coalesce_fsm_writes=True)
 
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
@@ -372,17 +504,65 @@ def run_prod_mode():
     app = web.Application()
     app["bot"] = bot
     app["dp"] = dp
-    app.router.add_get("/", handle_root)
-    app.router.add_route("GET", "/files/{path:.*}", serve_public_file)
-    app.router.add_route("HEAD", "/files/{path:.*}", serve_public_file)
-    webhook_requests_handler = SimpleRequestHandler(dispatcher=dp, bot=bot)
-    webhook_requests_handler.register(app, path="/webhook")
+    _add_public_routes(app)
+    _add_update_queue(app, dp, bot)
     setup_application(app, dp, bot=bot)
 
     logger.info("Bot started in PROD mode (webhook, Local Telegram API)")
     web.run_app(app, host="0.0.0.0", port=8000)
 
 
+def run_worker_process(index: int, port: int):
+    """Рабочий процесс супервизора: обрабатывает апдейты своего шарда чатов."""
+
+    bot = _create_prod_bot()
+    dp = create_dispatcher(coalesce_fsm_writes=True)
+
+    dp.startup.register(on_worker_startup)
+    dp.shutdown.register(on_worker_shutdown)
+
+    app = web.Application()
+    app["bot"] = bot
+    app["dp"] = dp
+    app["worker_index"] = index
+    app.router.add_get("/metrics", create_metrics_handler(METRICS_TOKEN or None))
+    _add_update_queue(app, dp, bot)
+    setup_application(app, dp, bot=bot)
+
+    logger.info("Рабочий процесс %s обрабатывает апдейты на порту %s", index, port)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def run_supervisor_mode():
+    """PROD с фронтом: вебхук и раздача файлов здесь, апдейты — в рабочих процессах."""
+
+    bot = _create_prod_bot()
+    supervisor = ShardSupervisor(
+        run_worker_process,
+        BOT_WORKER_PROCESSES,
+        BOT_WORKER_BASE_PORT,
+        metrics_token=METRICS_TOKEN or None,
+    )
+
+    app = web.Application()
+    app["bot"] = bot
+    app.on_startup.append(supervisor.start)
+    app.on_startup.append(on_front_startup)
+    # Сначала снимаем вебхук, затем даём процессам доработать принятые апдейты
+    app.on_shutdown.append(on_front_shutdown)
+    app.on_shutdown.append(supervisor.stop)
+    app.on_cleanup.append(on_front_cleanup)
+    # /metrics фронта включает метрики всех рабочих процессов
+    _add_public_routes(app, supervisor.scrape_metrics)
+    app.router.add_post("/webhook", supervisor.handle)
+
+    logger.info(
+        "Bot started in PROD mode with %s worker processes (webhook, Local Telegram API)",
+        BOT_WORKER_PROCESSES,
+    )
+    web.run_app(app, host="0.0.0.0", port=8000)
+
+
 def main():
     if not TOKEN or " " in TOKEN:
         # Осознанная остановка с пояснением, чтобы не запускать бота с некорректным токеном
@@ -0,0 +1,91 @@
+"""Проверка: в вызовах логгера нет f-строк и конкатенации сообщений.
+
+Сообщение журнала должно быть шаблоном с %-аргументами, тогда строка
+форматируется только для записей, которые проходят по уровню.
+
+Запуск из корня репозитория::
+
+    python scripts/check_logging_calls.py [пути...]
+
+Код возврата 1, если найдены нарушения. Строку с вызовом можно исключить
+комментарием ``# noqa: logging``.
+"""
+
+import ast
+import sys
+from pathlib import Path
+from typing import Optional
+
+LOG_METHODS = {"debug", "info", "warning", "error", "exception", "critical", "log"}
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv"}
+
+
+def _is_logger(node: ast.expr) -> bool:
+    if isinstance(node, ast.Name):
+        return node.id in {"logger", "logging", "log"} or node.id.endswith("_logger")
+    if isinstance(node, ast.Attribute):
+        return node.attr == "logger" or node.attr.endswith("_logger")
+    return False
+
+
+def _message_problem(message: ast.expr) -> Optional[str]:
+    if isinstance(message, ast.JoinedStr):
+        return "f-строка"
+    if isinstance(message, ast.BinOp) and isinstance(message.op, (ast.Add, ast.Mod)):
+        return "строка собрана заранее (+ или %)"
+    if (
+        isinstance(message, ast.Call)
+        and isinstance(message.func, ast.Attribute)
+        and message.func.attr == "format"
+    ):
+        return "str.format()"
+    return None
+
+
+def check_file(path: Path) -> list[str]:
+    source = path.read_text(encoding="utf-8")
+    lines = source.splitlines()
+    tree = ast.parse(source, filename=str(path))
+    problems = []
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in LOG_METHODS
+            and _is_logger(node.func.value)
+        ):
+            continue
+        index = 1 if node.func.attr == "log" else 0
+        if len(node.args) <= index:
+            continue
+        problem = _message_problem(node.args[index])
+        if problem and "# noqa: logging" not in lines[node.lineno - 1]:
+            problems.append(f"{path}:{node.lineno}: {problem} в вызове {node.func.attr}()")
+    return problems
+
+
+def _iter_files(paths: list[str]):
+    for raw in paths:
+        path = Path(raw)
+        if path.is_file():
+            yield path
+            continue
+        for candidate in sorted(path.rglob("*.py")):
+            if not SKIP_DIRS.intersection(candidate.parts):
+                yield candidate
+
+
+def main(argv: list[str]) -> int:
+    problems = []
+    for path in _iter_files(argv or ["."]):
+        problems.extend(check_file(path))
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"Найдено нарушений: {len(problems)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
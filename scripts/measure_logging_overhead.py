@@ -0,0 +1,103 @@
+"""Замер накладных расходов журналирования на один апдейт.
+
+Воспроизводит записи, которые делают SerialCheckMiddleware, DatabaseMiddleware
+и обработчик /start на один апдейт, в двух вариантах: прежнем (f-строки,
+чтение состояния FSM ради отладочной строки) и текущем (%-аргументы,
+проверка isEnabledFor). Записи уходят в NullHandler, поэтому измеряется
+только стоимость на стороне вызывающего кода.
+
+Запуск из корня репозитория::
+
+    python scripts/measure_logging_overhead.py [--level INFO] [--updates 20000]
+"""
+
+import argparse
+import asyncio
+import logging
+from time import perf_counter
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+logger = logging.getLogger("logging_overhead")
+
+
+class _Event:
+    def __init__(self):
+        self.text = "/start"
+        self.chat_type = "private"
+
+
+async def _update_eager(state: FSMContext, event: _Event, user_id: int, username: str):
+    # Прежний вариант оставлен намеренно, для сравнения
+    logger.debug(f"DatabaseMiddleware: Передача db_pool для события {type(event).__name__}")  # noqa: logging
+    current_state = await state.get_state()
+    logger.debug(f"SerialCheckMiddleware: Текущее состояние FSM: {current_state}")  # noqa: logging
+    logger.debug(f"Обработка команды '{event.text}' от @{username} (ID: {user_id}) в чате типа {event.chat_type}")  # noqa: logging
+    logger.info(f"Получена команда /start от пользователя @{username} (ID: {user_id})")  # noqa: logging
+    logger.debug(f"Состояние FSM перед обработкой /start: {await state.get_data()}")  # noqa: logging
+    logger.debug(f"Пользователь @{username} (ID: {user_id}) определён как сотрудник")  # noqa: logging
+
+
+async def _update_lazy(state: FSMContext, event: _Event, user_id: int, username: str):
+    logger.debug(
+        "DatabaseMiddleware: Передача db_pool для события %s", type(event).__name__
+    )
+    current_state = await state.get_state()
+    logger.debug("SerialCheckMiddleware: Текущее состояние FSM: %s", current_state)
+    logger.debug(
+        "Обработка команды '%s' от @%s (ID: %s) в чате типа %s",
+        event.text,
+        username,
+        user_id,
+        event.chat_type,
+    )
+    logger.info(
+        "Получена команда /start от пользователя @%s (ID: %s)", username, user_id
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Состояние FSM перед обработкой /start: %s", await state.get_data()
+        )
+    logger.debug(
+        "Пользователь @%s (ID: %s) определён как сотрудник", username, user_id
+    )
+
+
+async def _measure(variant, state: FSMContext, updates: int) -> float:
+    event = _Event()
+    started = perf_counter()
+    for index in range(updates):
+        await variant(state, event, index, "user")
+    return (perf_counter() - started) / updates * 1_000_000
+
+
+async def main(level: str, updates: int) -> None:
+    logger.handlers[:] = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(level)
+
+    storage = MemoryStorage()
+    state = FSMContext(storage, StorageKey(bot_id=1, chat_id=1, user_id=1))
+    await state.set_state("UserState:menu")
+    await state.update_data(serial="A" * 12, scenario="support", media=["x" * 64] * 20)
+
+    # Прогрев, чтобы не учитывать первые вызовы
+    await _measure(_update_eager, state, 1000)
+    await _measure(_update_lazy, state, 1000)
+
+    eager = await _measure(_update_eager, state, updates)
+    lazy = await _measure(_update_lazy, state, updates)
+    print(f"Уровень {level}, апдейтов: {updates}")
+    print(f"  f-строки:          {eager:8.2f} мкс на апдейт")
+    print(f"  %-аргументы:       {lazy:8.2f} мкс на апдейт")
+    print(f"  экономия:          {eager - lazy:8.2f} мкс ({(1 - lazy / eager) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", default="INFO")
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.level.upper(), args.updates))
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Конфигурация читается из окружения при импорте модулей бота
+_TMP_ROOT = Path(tempfile.mkdtemp(prefix="bot-tests-"))
+os.environ.setdefault("PUBLIC_MEDIA_ROOT", str(_TMP_ROOT / "public"))
+os.environ.setdefault("LOG_DIR", str(_TMP_ROOT / "logs"))
+Path(os.environ["PUBLIC_MEDIA_ROOT"]).mkdir(parents=True, exist_ok=True)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
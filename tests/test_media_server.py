@@ -0,0 +1,99 @@
+import asyncio
+import os
+from email.utils import formatdate
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from multidict import CIMultiDict
+
+from utils.media_server import MediaServer
+from utils.storage import public_root
+
+CONTENT = b"0123456789" * 100
+
+
+def _request(name: str, **headers) -> tuple[int, CIMultiDict, bytes]:
+    async def _run():
+        server = MediaServer(public_root())
+        app = web.Application()
+        app.router.add_route("GET", "/files/{path:.*}", server.handle)
+        async with TestClient(TestServer(app)) as client:
+            first = await client.get(f"/files/{name}")
+            etag = first.headers["ETag"]
+            resolved = {
+                key: value.replace("{etag}", etag) for key, value in headers.items()
+            }
+            response = await client.get(f"/files/{name}", headers=resolved)
+            return response.status, CIMultiDict(response.headers), await response.read()
+
+    return asyncio.run(_run())
+
+
+def _write(name: str) -> str:
+    path = public_root() / name
+    path.write_bytes(CONTENT)
+    # mtime в прошлом: иначе Last-Modified совпадает с текущей секундой
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    return name
+
+
+def test_if_match_with_content_etag_returns_file():
+    status, _, body = _request(_write("if-match.bin"), **{"If-Match": "{etag}"})
+    assert status == 200
+    assert body == CONTENT
+
+
+def test_if_match_with_other_etag_fails():
+    status, _, _ = _request(_write("if-match-other.bin"), **{"If-Match": '"deadbeef"'})
+    assert status == 412
+
+
+def test_if_match_rejects_weak_etag():
+    status, _, _ = _request(_write("if-match-weak.bin"), **{"If-Match": "W/{etag}"})
+    assert status == 412
+
+
+def test_if_none_match_with_content_etag_not_modified():
+    status, _, body = _request(_write("if-none-match.bin"), **{"If-None-Match": "{etag}"})
+    assert status == 304
+    assert body == b""
+
+
+def test_if_none_match_with_other_etag_returns_file():
+    status, _, body = _request(
+        _write("if-none-match-other.bin"), **{"If-None-Match": '"deadbeef"'}
+    )
+    assert status == 200
+    assert body == CONTENT
+
+
+def test_if_range_with_content_etag_returns_range():
+    status, headers, body = _request(
+        _write("if-range.bin"), Range="bytes=0-9", **{"If-Range": "{etag}"}
+    )
+    assert status == 206
+    assert body == CONTENT[:10]
+    # Тег по содержимому, а не aiohttp-овский "<mtime>-<size>"
+    assert "-" not in headers["ETag"]
+
+
+def test_if_range_with_other_etag_returns_whole_file():
+    status, _, body = _request(
+        _write("if-range-other.bin"), Range="bytes=0-9", **{"If-Range": '"deadbeef"'}
+    )
+    assert status == 200
+    assert body == CONTENT
+
+
+def test_if_range_with_date_follows_last_modified():
+    name = _write("if-range-date.bin")
+    status, _, body = _request(
+        name, Range="bytes=0-9", **{"If-Range": formatdate(1_700_000_000, usegmt=True)}
+    )
+    assert status == 206
+    assert body == CONTENT[:10]
+    status, _, body = _request(
+        name, Range="bytes=0-9", **{"If-Range": formatdate(1_600_000_000, usegmt=True)}
+    )
+    assert status == 200
+    assert body == CONTENT
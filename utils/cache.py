@@ -0,0 +1,340 @@
+"""Ограничение размера локального кеша загруженных файлов (LOCAL_BOT_API_CACHE_DIR)."""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: закрепления видны только своему процессу
+    fcntl = None
+
+from config import (
+    CACHE_MAX_AGE_HOURS,
+    CACHE_MAX_SIZE_MB,
+    CACHE_SWEEP_INTERVAL_SECONDS,
+    LOCAL_BOT_API_CACHE_DIR,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, Path]
+
+# Файлы, изменённые недавно, не трогаем: их может дописывать загрузка,
+# которая ещё не успела закрепить запись.
+_RECENT_WRITE_GRACE_SECONDS = 300
+# После вытеснения по размеру оставляем запас, чтобы не чистить кеш на каждом проходе.
+_LOW_WATER_RATIO = 0.9
+# Каталог файлов закрепления внутри кеша; сам он не вытесняется
+_PINS_DIR_NAME = ".pins"
+# Спутники закреплённого файла: то же имя, за которым идёт один из символов
+_COMPANION_SEPARATORS = (".", "_")
+
+
+def _matches_pin(key: str, pinned: str) -> bool:
+    """Путь закреплён сам, лежит в закреплённом каталоге или является его спутником.
+
+    Сравнение по компонентам пути: закрепление ``.../file_1`` защищает
+    ``file_1.mp4``, ``file_1_compressed.mp4`` и ``file_1.part``, но не
+    ``file_10.mp4``.
+    """
+
+    if key == pinned or key.startswith(pinned + os.sep):
+        return True
+    directory, name = os.path.split(key)
+    pinned_directory, pinned_name = os.path.split(pinned)
+    return (
+        directory == pinned_directory
+        and name.startswith(pinned_name)
+        and name[len(pinned_name):len(pinned_name) + 1] in _COMPANION_SEPARATORS
+    )
+
+
+class CacheManager:
+    """LRU-вытеснение файлов кеша по суммарному объёму и возрасту.
+
+    Время последнего обращения берётся из ``st_atime``; попадания в кеш
+    обновляют его явно через :meth:`record_hit`, поэтому вытеснение работает
+    и на файловых системах с ``noatime``. Закреплённые через :meth:`pin`
+    файлы (идущая загрузка, сжатие, отправка) не удаляются.
+
+    Закрепление видно всем процессам, работающим с этим каталогом: для
+    каждого пути в ``.pins`` создаётся файл с разделяемой блокировкой
+    ``flock``. Файл без блокировки (процесс завершился) очистка удаляет.
+    """
+
+    def __init__(
+        self,
+        root: Optional[PathLike],
+        max_bytes: int,
+        max_age_seconds: Optional[int],
+        sweep_interval: int,
+    ):
+        self.root = Path(root).resolve() if root else None
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.sweep_interval = sweep_interval
+        self._pins: Counter[str] = Counter()
+        self._pin_files: dict[str, IO] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evicted_files = 0
+        self._evicted_bytes = 0
+        self._current_bytes = 0
+        self._current_files = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None and self.max_bytes > 0
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        return os.path.normcase(os.path.realpath(path))
+
+    @property
+    def _pins_dir(self) -> Optional[Path]:
+        return self.root / _PINS_DIR_NAME if self.root is not None else None
+
+    def _pin_file_path(self, key: str) -> Path:
+        return self._pins_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pin")
+
+    def _open_pin_file(self, path: Path, key: str) -> IO:
+        """Открывает файл закрепления под LOCK_SH.
+
+        Новый файл пишется под временным именем и появляется в каталоге
+        жёсткой ссылкой уже с ключом и блокировкой: очистка не увидит
+        заблокированный файл без ключа.
+        """
+
+        while True:
+            try:
+                pin_file = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                pin_file = open(temp_path, "w", encoding="utf-8")
+                try:
+                    pin_file.write(key + "\n")
+                    pin_file.flush()
+                    fcntl.flock(pin_file.fileno(), fcntl.LOCK_SH)
+                    os.link(temp_path, path)
+                except FileExistsError:
+                    # Другой процесс опубликовал этот ключ первым — берём его файл
+                    pin_file.close()
+                    continue
+                except BaseException:
+                    pin_file.close()
+                    raise
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                return pin_file
+            fcntl.flock(pin_file.fileno(), fcntl.LOCK_SH)
+            # Очистка могла удалить файл, пока мы ждали блокировку
+            try:
+                if os.fstat(pin_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return pin_file
+            except FileNotFoundError:
+                pass
+            pin_file.close()
+
+    def _publish_pin(self, key: str) -> None:
+        if fcntl is None or self._pins_dir is None:
+            return
+        try:
+            self._pins_dir.mkdir(parents=True, exist_ok=True)
+            pin_file = self._open_pin_file(self._pin_file_path(key), key)
+        except OSError as exc:
+            logger.warning("Не удалось опубликовать закрепление %s: %s", key, exc)
+            return
+        self._pin_files[key] = pin_file
+
+    def _unpublish_pin(self, key: str) -> None:
+        pin_file = self._pin_files.pop(key, None)
+        if pin_file is not None:
+            # Файл остаётся: его удалит очистка, когда блокировок не останется
+            pin_file.close()
+
+    @contextmanager
+    def pin(self, *paths: Optional[PathLike]) -> Iterator[None]:
+        """Защищает файлы и их спутники от вытеснения на время блока ``with``."""
+
+        keys = [self._key(path) for path in paths if path]
+        for key in keys:
+            if not self._pins[key]:
+                self._publish_pin(key)
+            self._pins[key] += 1
+        try:
+            yield
+        finally:
+            for key in keys:
+                self._pins[key] -= 1
+                if self._pins[key] <= 0:
+                    self._pins.pop(key, None)
+                    self._unpublish_pin(key)
+
+    def _shared_pins(self) -> set[str]:
+        """Закрепления всех процессов; файлы без блокировки удаляются."""
+
+        pinned = set(self._pins)
+        if fcntl is None or self._pins_dir is None or not self._pins_dir.is_dir():
+            return pinned
+        for path in self._pins_dir.glob("*.pin"):
+            try:
+                with open(path, "r", encoding="utf-8") as pin_file:
+                    try:
+                        fcntl.flock(pin_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        key = pin_file.readline().strip()
+                        if key:
+                            pinned.add(key)
+                        continue
+                    path.unlink(missing_ok=True)
+            except OSError:
+                continue
+        return pinned
+
+    def is_pinned(self, path: PathLike, pinned: Optional[Iterable[str]] = None) -> bool:
+        key = self._key(path)
+        if pinned is None:
+            pinned = self._shared_pins()
+        return any(_matches_pin(key, pinned_key) for pinned_key in pinned)
+
+    def record_hit(self, path: PathLike) -> None:
+        self._hits += 1
+        try:
+            stat = os.stat(path)
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+
+    def record_miss(self) -> None:
+        self._misses += 1
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / lookups if lookups else 0.0,
+            "size_bytes": self._current_bytes,
+            "files": self._current_files,
+            "max_bytes": self.max_bytes,
+            "evicted_files": self._evicted_files,
+            "evicted_bytes": self._evicted_bytes,
+            "pinned": len(self._pins),
+        }
+
+    def _sweep(self) -> tuple[int, int]:
+        now = time.time()
+        entries = []
+        total = 0
+        pinned = self._shared_pins()
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == str(self.root) and _PINS_DIR_NAME in dirnames:
+                dirnames.remove(_PINS_DIR_NAME)
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                last_access = max(stat.st_atime, stat.st_mtime)
+                entries.append((last_access, stat.st_mtime, stat.st_size, path))
+
+        evicted_files = 0
+        evicted_bytes = 0
+
+        def _evict(path: str, size: int) -> bool:
+            nonlocal total, evicted_files, evicted_bytes
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("Не удалось удалить файл кеша %s: %s", path, exc)
+                return False
+            total -= size
+            evicted_files += 1
+            evicted_bytes += size
+            return True
+
+        candidates = []
+        for last_access, mtime, size, path in sorted(entries):
+            if now - mtime < _RECENT_WRITE_GRACE_SECONDS or self.is_pinned(path, pinned):
+                continue
+            if self.max_age_seconds and now - last_access > self.max_age_seconds:
+                _evict(path, size)
+            else:
+                candidates.append((size, path))
+
+        if total > self.max_bytes:
+            low_water = self.max_bytes * _LOW_WATER_RATIO
+            for size, path in candidates:
+                if total <= low_water:
+                    break
+                _evict(path, size)
+
+        pins_dir = str(self._pins_dir)
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            if dirpath in (str(self.root), pins_dir):
+                continue
+            if not dirnames and not filenames:
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass
+
+        self._current_bytes = total
+        self._current_files = len(entries) - evicted_files
+        return evicted_files, evicted_bytes
+
+    async def enforce(self) -> None:
+        """Один проход вытеснения; обход каталога выполняется в отдельном потоке."""
+
+        if not self.enabled or not self.root.exists():
+            return
+        async with self._lock:
+            evicted_files, evicted_bytes = await asyncio.to_thread(self._sweep)
+        self._evicted_files += evicted_files
+        self._evicted_bytes += evicted_bytes
+        stats = self.stats()
+        log = logger.info if evicted_files else logger.debug
+        log(
+            "Кеш %s: %.2f из %.2f МБ, файлов %s, удалено %s (%.2f МБ), попаданий %s/%s",
+            self.root,
+            stats["size_bytes"] / (1024 * 1024),
+            self.max_bytes / (1024 * 1024),
+            stats["files"],
+            evicted_files,
+            evicted_bytes / (1024 * 1024),
+            stats["hits"],
+            stats["hits"] + stats["misses"],
+        )
+
+    async def run(self) -> None:
+        """Фоновая задача: периодически приводит кеш к заданному бюджету."""
+
+        if not self.enabled:
+            logger.info("Каталог кеша не задан, вытеснение файлов кеша отключено")
+            return
+        while True:
+            try:
+                await self.enforce()
+            except Exception as exc:
+                logger.error("Ошибка при очистке кеша %s: %s", self.root, exc)
+            await asyncio.sleep(self.sweep_interval)
+
+
+cache_manager = CacheManager(
+    LOCAL_BOT_API_CACHE_DIR,
+    max_bytes=CACHE_MAX_SIZE_MB * 1024 * 1024,
+    max_age_seconds=CACHE_MAX_AGE_HOURS * 3600 if CACHE_MAX_AGE_HOURS > 0 else None,
+    sweep_interval=CACHE_SWEEP_INTERVAL_SECONDS,
+)
@@ -0,0 +1,144 @@
+"""Кеш редко меняющихся справочников и его сброс между процессами.
+
+Значения (администраторы, каналы уведомлений, УТЦ, кодовое слово) хранятся
+в памяти процесса по строковому ключу. Код, меняющий данные, вызывает
+``cache_bus.notify(conn, key)``: ключ сразу сбрасывается в своём процессе и
+через ``NOTIFY cache_invalidate`` — во всех остальных. Каждый процесс держит
+отдельное соединение с ``LISTEN cache_invalidate``; пока оно не подключено,
+кеш не используется, а после переподключения очищается целиком, потому что
+уведомления за время разрыва потеряны.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+
+from config import DB_CONFIG
+from utils.logger import get_logger
+from utils.metrics import registry
+
+logger = get_logger(__name__)
+
+CHANNEL = "cache_invalidate"
+_RECONNECT_SECONDS = 5.0
+# Проверка соединения подписки: обрыв без закрытия сокета иначе не заметить
+_PING_SECONDS = 30.0
+_PING_TIMEOUT = 5.0
+_SERVER_SETTINGS = {
+    "application_name": "bot-cache-listener",
+    "tcp_keepalives_idle": "10",
+    "tcp_keepalives_interval": "5",
+    "tcp_keepalives_count": "3",
+}
+
+CACHE_LOOKUPS = registry.counter(
+    "bot_cache_lookups_total", "Обращения к кешу справочников", ("key", "result")
+)
+CACHE_INVALIDATIONS = registry.counter(
+    "bot_cache_invalidations_total", "Сброшенные ключи кеша справочников", ("key", "source")
+)
+
+
+class CacheInvalidationBus:
+    """Кеш в памяти процесса со сбросом через LISTEN/NOTIFY PostgreSQL."""
+
+    def __init__(self):
+        self._values: dict[str, Any] = {}
+        # Поколение ключа растёт при каждом сбросе: значение, загрузка которого
+        # началась до сброса, в кеш уже не попадёт
+        self._generations: dict[str, int] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._disconnected: Optional[asyncio.Event] = None
+
+    @property
+    def active(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Значение из кеша или результат ``loader()``; значение нельзя изменять."""
+
+        if not self.active:
+            CACHE_LOOKUPS.inc(key=key, result="bypass")
+            return await loader()
+        if key in self._values:
+            CACHE_LOOKUPS.inc(key=key, result="hit")
+            return self._values[key]
+        CACHE_LOOKUPS.inc(key=key, result="miss")
+        generation = self._generations.get(key, 0)
+        value = await loader()
+        if self.active and self._generations.get(key, 0) == generation:
+            self._values[key] = value
+        return value
+
+    def evict(self, key: str, source: str = "local") -> None:
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._values.pop(key, None)
+        CACHE_INVALIDATIONS.inc(key=key, source=source)
+
+    def clear(self) -> None:
+        for key in list(self._generations) + list(self._values):
+            self._generations[key] = self._generations.get(key, 0) + 1
+        self._values.clear()
+
+    async def notify(self, conn, key: str) -> None:
+        """Сбрасывает ключ здесь и сообщает о сбросе остальным процессам.
+
+        Внутри транзакции уведомление уходит только после её фиксации.
+        """
+
+        self.evict(key)
+        await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, key)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        logger.debug("Получен сброс кеша %s от процесса PostgreSQL %s", payload, pid)
+        self.evict(payload, source="notify")
+
+    def _on_termination(self, connection) -> None:
+        self.clear()
+        if self._disconnected is not None:
+            self._disconnected.set()
+
+    async def _listen(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(**DB_CONFIG, server_settings=_SERVER_SETTINGS)
+                self._disconnected = asyncio.Event()
+                conn.add_termination_listener(self._on_termination)
+                await conn.add_listener(CHANNEL, self._on_notification)
+                # Всё, что было закешировано до подписки, могло устареть
+                self.clear()
+                self._conn = conn
+                logger.info("Подписка на сброс кеша (%s) активна", CHANNEL)
+                while not self._disconnected.is_set():
+                    try:
+                        await asyncio.wait_for(self._disconnected.wait(), _PING_SECONDS)
+                    except asyncio.TimeoutError:
+                        await asyncio.wait_for(conn.fetchval("SELECT 1"), _PING_TIMEOUT)
+                logger.warning("Соединение подписки на сброс кеша потеряно, кеш отключён")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Не удалось подписаться на сброс кеша: %s", exc)
+            finally:
+                self._conn = None
+                self.clear()
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name="cache-listener")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.clear()
+
+
+cache_bus = CacheInvalidationBus()
@@ -0,0 +1,370 @@
+"""Загрузка больших файлов по HTTP параллельными диапазонами с возобновлением."""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+import aiohttp
+from aiohttp import ClientError
+
+from config import (
+    DOWNLOAD_BUFFER_SIZE_KB,
+    DOWNLOAD_MAX_RETRIES,
+    DOWNLOAD_PARALLEL_CONNECTIONS,
+    DOWNLOAD_SEGMENT_SIZE_MB,
+)
+from utils.cache import cache_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+_READ_CHUNK_SIZE = 1 << 18
+_BUFFER_SIZE = max(DOWNLOAD_BUFFER_SIZE_KB, 64) * 1024
+_SEGMENT_SIZE = max(DOWNLOAD_SEGMENT_SIZE_MB, 1) * 1024 * 1024
+# Общий таймаут сессии (5 минут по умолчанию) обрывает загрузку 2 ГБ,
+# поэтому ограничиваем только установку соединения и паузы между чтениями.
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+
+
+class DownloadError(RuntimeError):
+    """Сервер вернул неожиданный ответ при загрузке файла."""
+
+
+@dataclass
+class _Segment:
+    start: int
+    end: int
+    written: int = 0
+
+    @property
+    def offset(self) -> int:
+        return self.start + self.written
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.offset + 1
+
+    @property
+    def done(self) -> bool:
+        return self.remaining <= 0
+
+
+class _ThreadFileWriter:
+    """Записывает блоки по смещению в отдельном потоке, не блокируя event loop."""
+
+    def __init__(self, path: Path, size: Optional[int]):
+        self._path = path
+        self._size = size
+        self._file = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="download-writer"
+        )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _open(self, keep_existing: bool) -> None:
+        mode = "r+b" if keep_existing and self._path.exists() else "w+b"
+        self._file = open(self._path, mode)
+        if self._size is not None:
+            self._file.truncate(self._size)
+
+    def _write(self, offset: int, data: bytes) -> None:
+        self._file.seek(offset)
+        self._file.write(data)
+
+    def _save_state(self, state_path: Path, payload: dict) -> None:
+        # Состояние пишется тем же потоком после данных, поэтому никогда
+        # не опережает фактически записанные байты.
+        state_path.write_text(json.dumps(payload), encoding="utf-8")
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def open(self, keep_existing: bool) -> None:
+        await self._run(self._open, keep_existing)
+
+    async def write(self, offset: int, data: bytes) -> None:
+        await self._run(self._write, offset, data)
+
+    async def save_state(self, state_path: Path, payload: dict) -> None:
+        await self._run(self._save_state, state_path, payload)
+
+    async def close(self) -> None:
+        try:
+            await self._run(self._close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+def _parse_total_size(content_range: Optional[str]) -> Optional[int]:
+    if not content_range:
+        return None
+    total = content_range.rpartition("/")[2].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _plan_segments(total_size: int) -> list[_Segment]:
+    return [
+        _Segment(start, min(start + _SEGMENT_SIZE, total_size) - 1)
+        for start in range(0, total_size, _SEGMENT_SIZE)
+    ]
+
+
+def _state_payload(total_size: int, segments: list[_Segment]) -> dict:
+    return {
+        "size": total_size,
+        "segments": [[s.start, s.end, s.written] for s in segments],
+    }
+
+
+def _load_segments(
+    state_path: Path, part_path: Path, total_size: int
+) -> Optional[list[_Segment]]:
+    """Восстанавливает прогресс прерванной загрузки, если он совпадает с файлом."""
+
+    if not state_path.exists() or not part_path.exists():
+        return None
+    try:
+        payload = json.loads(state_path.read_text(encoding="utf-8"))
+        if payload.get("size") != total_size:
+            return None
+        if part_path.stat().st_size != total_size:
+            return None
+        segments = [_Segment(*map(int, item)) for item in payload["segments"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("Повреждён файл состояния загрузки %s, начинаем заново", state_path)
+        return None
+    return segments or None
+
+
+async def _stream_response(
+    response: aiohttp.ClientResponse, writer: _ThreadFileWriter, offset: int = 0
+) -> int:
+    """Читает тело ответа крупными блоками и передаёт их потоку записи."""
+
+    buffer = bytearray()
+    async for chunk in response.content.iter_chunked(_READ_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) >= _BUFFER_SIZE:
+            await writer.write(offset, bytes(buffer))
+            offset += len(buffer)
+            buffer.clear()
+    if buffer:
+        await writer.write(offset, bytes(buffer))
+        offset += len(buffer)
+    return offset
+
+
+async def _fetch_segment(
+    session: aiohttp.ClientSession,
+    url: str,
+    segment: _Segment,
+    segments: list[_Segment],
+    total_size: int,
+    writer: _ThreadFileWriter,
+    state_path: Path,
+    semaphore: asyncio.Semaphore,
+    ssl,
+) -> None:
+    async with semaphore:
+        attempt = 0
+        while not segment.done:
+            progress_before = segment.written
+            buffer = bytearray()
+
+            async def _flush() -> None:
+                if not buffer:
+                    return
+                data = bytes(buffer[: segment.remaining])
+                buffer.clear()
+                await writer.write(segment.offset, data)
+                segment.written += len(data)
+                await writer.save_state(state_path, _state_payload(total_size, segments))
+
+            try:
+                headers = {"Range": f"bytes={segment.offset}-{segment.end}"}
+                async with session.get(
+                    url, headers=headers, ssl=ssl, timeout=_REQUEST_TIMEOUT
+                ) as resp:
+                    if resp.status != 206:
+                        raise DownloadError(
+                            f"Сервер не вернул диапазон {headers['Range']}: HTTP {resp.status}"
+                        )
+                    async for chunk in resp.content.iter_chunked(_READ_CHUNK_SIZE):
+                        buffer += chunk
+                        if len(buffer) >= _BUFFER_SIZE:
+                            await _flush()
+                    await _flush()
+                if not segment.done:
+                    raise ClientError(
+                        f"Соединение закрыто до конца диапазона {segment.start}-{segment.end}"
+                    )
+            except (ClientError, asyncio.TimeoutError) as exc:
+                # Уже полученные байты сохраняем: повтор продолжит с нового смещения
+                await _flush()
+                if segment.done:
+                    break
+                attempt = 0 if segment.written > progress_before else attempt + 1
+                if attempt > DOWNLOAD_MAX_RETRIES:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(
+                    "Обрыв загрузки диапазона %s-%s (%s), повтор через %s с",
+                    segment.offset,
+                    segment.end,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+
+async def _download_ranges(
+    session: aiohttp.ClientSession,
+    url: str,
+    part_path: Path,
+    state_path: Path,
+    total_size: int,
+    ssl,
+) -> None:
+    segments = _load_segments(state_path, part_path, total_size)
+    resumed = segments is not None
+    if segments is None:
+        segments = _plan_segments(total_size)
+    else:
+        logger.info(
+            "Возобновляем загрузку %s: уже получено %.2f из %.2f МБ",
+            part_path.name,
+            sum(s.written for s in segments) / (1024 * 1024),
+            total_size / (1024 * 1024),
+        )
+
+    writer = _ThreadFileWriter(part_path, total_size)
+    await writer.open(keep_existing=resumed)
+    semaphore = asyncio.Semaphore(max(DOWNLOAD_PARALLEL_CONNECTIONS, 1))
+    tasks: list[asyncio.Task] = []
+    error: Optional[BaseException] = None
+    try:
+        await writer.save_state(state_path, _state_payload(total_size, segments))
+        tasks = [
+            asyncio.create_task(
+                _fetch_segment(
+                    session,
+                    url,
+                    segment,
+                    segments,
+                    total_size,
+                    writer,
+                    state_path,
+                    semaphore,
+                    ssl,
+                )
+            )
+            for segment in segments
+            if not segment.done
+        ]
+        if tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            error = next(
+                (task.exception() for task in done if task.exception() is not None), None
+            )
+    finally:
+        # Первая ошибка останавливает остальные диапазоны, а не ждёт их окончания
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await writer.close()
+
+    if error is not None:
+        # Диапазон не удалось получить и с повторами — неполный файл не оставляем
+        part_path.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        raise error
+
+
+async def download_file(
+    session: aiohttp.ClientSession,
+    url: str,
+    destination: Path,
+    *,
+    ssl=None,
+) -> Path:
+    """Скачивает ``url`` в ``destination``.
+
+    Если сервер поддерживает Range, файл загружается несколькими соединениями
+    по диапазонам; прогресс сохраняется рядом во ``*.part.json``, и повторный
+    вызов после обрыва докачивает только недостающие байты. Иначе файл читается
+    одним потоком. Запись на диск в обоих случаях идёт в отдельном потоке.
+    """
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with cache_manager.pin(destination):
+        return await _download_file(session, url, destination, ssl)
+
+
+async def _download_file(
+    session: aiohttp.ClientSession, url: str, destination: Path, ssl
+) -> Path:
+    part_path = destination.with_name(destination.name + PART_SUFFIX)
+    state_path = destination.with_name(destination.name + STATE_SUFFIX)
+    start_time = perf_counter()
+
+    total_size: Optional[int] = None
+    async with session.get(
+        url, headers={"Range": "bytes=0-0"}, ssl=ssl, timeout=_REQUEST_TIMEOUT
+    ) as probe:
+        if probe.status == 206:
+            total_size = _parse_total_size(probe.headers.get("Content-Range"))
+        elif probe.status == 200:
+            # Range не поддерживается — дочитываем уже открытый ответ целиком
+            writer = _ThreadFileWriter(part_path, None)
+            await writer.open(keep_existing=False)
+            try:
+                total_size = await _stream_response(probe, writer)
+            finally:
+                await writer.close()
+        else:
+            raise DownloadError(
+                f"Ошибка загрузки файла: HTTP {probe.status}, ответ: {await probe.text()}"
+            )
+
+    if probe.status == 206:
+        if total_size is None:
+            async with session.get(url, ssl=ssl, timeout=_REQUEST_TIMEOUT) as resp:
+                if resp.status != 200:
+                    raise DownloadError(
+                        f"Ошибка загрузки файла: HTTP {resp.status}, ответ: {await resp.text()}"
+                    )
+                writer = _ThreadFileWriter(part_path, None)
+                await writer.open(keep_existing=False)
+                try:
+                    total_size = await _stream_response(resp, writer)
+                finally:
+                    await writer.close()
+        else:
+            await _download_ranges(session, url, part_path, state_path, total_size, ssl)
+
+    os.replace(part_path, destination)
+    state_path.unlink(missing_ok=True)
+
+    elapsed = perf_counter() - start_time
+    size_mb = (total_size or 0) / (1024 * 1024)
+    logger.debug(
+        "Файл %s загружен: %.2f МБ за %.2f с (%.2f МБ/с)",
+        destination.name,
+        size_mb,
+        elapsed,
+        size_mb / elapsed if elapsed > 0 else 0.0,
+    )
+    return destination
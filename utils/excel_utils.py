@@ -6,6 +6,7 @@ from pathlib import Path
 from zipfile import BadZipFile
 
 from utils.logger import get_logger
+from utils.storage import video_derivative_urls
 
 logger = get_logger(__name__)
 
@@ -37,17 +38,17 @@ async def import_serials(file_io, db_pool):
             valid_serials = []
             for i, serial in enumerate(serials):
                 if serial in existing_serials:
-                    logger.info(f"Серийный номер {serial} уже существует, пропущен")
+                    logger.info("Серийный номер %s уже существует, пропущен", serial)
                     result["skipped"] += 1
                     continue
                 if validate_serial(serial):
                     valid_serials.append(serial)
                 else:
-                    logger.warning(f"Невалидный серийный номер {serial}")
+                    logger.warning("Невалидный серийный номер %s", serial)
                     result["invalid"].append(serial)
 
                 if (i + 1) % 100 == 0 or i == len(serials) - 1:
-                    logger.info(f"Обработано {i + 1} серийных номеров")
+                    logger.info("Обработано %s серийных номеров", i + 1)
 
             if valid_serials:
                 await conn.executemany(
@@ -56,7 +57,7 @@ async def import_serials(file_io, db_pool):
                 )
                 result["added"] = len(valid_serials)
                 for serial in valid_serials:
-                    logger.info(f"Добавлен серийный номер {serial}")
+                    logger.info("Добавлен серийный номер %s", serial)
                     existing_serials.add(serial)
 
         # Создаём Excel-файл с невалидными номерами, если они есть
@@ -68,18 +69,21 @@ async def import_serials(file_io, db_pool):
             output.seek(0)
             invalid_file = output
             logger.info(
-                f"Создан Excel-файл с {len(result['invalid'])} невалидными номерами"
+                "Создан Excel-файл с %s невалидными номерами", len(result['invalid'])
             )
 
         logger.info(
-            f"Импорт завершён: добавлено {result['added']}, пропущено {result['skipped']}, невалидных {len(result['invalid'])}"
+            "Импорт завершён: добавлено %s, пропущено %s, невалидных %s",
+            result['added'],
+            result['skipped'],
+            len(result['invalid']),
         )
         return result, None, invalid_file
     except BadZipFile:
         logger.error("Повреждённый или неподдерживаемый файл Excel")
         return None, "Файл повреждён или имеет неверный формат XLSX.", None
     except Exception as e:
-        logger.error(f"Ошибка при импорте серийных номеров: {str(e)}")
+        logger.error("Ошибка при импорте серийных номеров: %s", e)
         return None, f"Ошибка при обработке файла: {str(e)}", None
 
 
@@ -138,7 +142,7 @@ async def export_serials(db_pool):
                     "New Serial": new_serial,
                 }
             )
-            logger.info(f"Экспортирован серийный номер {row['serial']}")
+            logger.info("Экспортирован серийный номер %s", row['serial'])
 
         if not data:
             logger.warning("Нет данных для экспорта")
@@ -151,7 +155,7 @@ async def export_serials(db_pool):
         logger.info("Файл экспорта успешно создан")
         return output
     except Exception as e:
-        logger.error(f"Ошибка при экспорте серийных номеров: {str(e)}")
+        logger.error("Ошибка при экспорте серийных номеров: %s", e)
         return None
 
 
@@ -180,6 +184,11 @@ async def export_visits_to_excel(visits: list, file_path: Path) -> Path:
             admin_display = " | ".join(filter(None, admin_parts))
 
             media_link = visit.get("media_path") or ""
+            derivatives = (
+                video_derivative_urls(media_link)
+                if visit.get("media_type") == "video"
+                else {}
+            )
             data.append(
                 {
                     "Дата/время визита": visit_time_fmt,
@@ -189,6 +198,9 @@ async def export_visits_to_excel(visits: list, file_path: Path) -> Path:
                     "Задачи": visit.get("tasks", ""),
                     "Тип медиа": visit.get("media_type", ""),
                     "Ссылка на медиа": media_link,
+                    "Постер": derivatives.get("poster", ""),
+                    "Превью": derivatives.get("preview", ""),
+                    "HLS": derivatives.get("hls", ""),
                 }
             )
 
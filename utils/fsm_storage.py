@@ -0,0 +1,404 @@
+"""Хранилище FSM в Postgres (или Redis) с TTL и объединением записей."""
+
+import asyncio
+import json
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey,
+)
+
+from config import (
+    FSM_REDIS_URL,
+    FSM_STATE_TTL_HOURS,
+    FSM_STORAGE,
+    FSM_SWEEP_INTERVAL_SECONDS,
+)
+from database import db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _encode_value(value: Any) -> Any:
+    # В состоянии лежат и записи asyncpg с датами — сохраняем их без потерь
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if hasattr(value, "items"):
+        return dict(value.items())
+    raise TypeError(f"Значение типа {type(value).__name__} нельзя сохранить в FSM")
+
+
+def _decode_object(obj: dict) -> Any:
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+        if "$decimal" in obj:
+            return Decimal(obj["$decimal"])
+    return obj
+
+
+def dumps_data(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=_encode_value, ensure_ascii=False)
+
+
+def loads_data(raw: Optional[str]) -> Dict[str, Any]:
+    return json.loads(raw, object_hook=_decode_object) if raw else {}
+
+
+def _state_name(state: StateType) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+class PostgresStorage(BaseStorage):
+    """FSM в таблице ``fsm_storage``: состояние и данные одной строкой.
+
+    У каждой записи есть ``expires_at``: при чтении просроченная запись
+    считается пустой и удаляется сразу, остальные удаляет периодическая
+    очистка :meth:`run_sweeper`. Срок по умолчанию — ``default_ttl``,
+    для отдельного ключа его можно изменить через :meth:`set_ttl`; он
+    сохраняется до очистки состояния.
+    """
+
+    def __init__(self, default_ttl: Optional[int], key_builder: Optional[KeyBuilder] = None):
+        self.default_ttl = default_ttl
+        self.key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+
+    async def get_record(self, key: StorageKey) -> tuple[Optional[str], Dict[str, Any]]:
+        storage_key = self.key_builder.build(key)
+        pool = await db.get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT state, data::text AS data,
+                       expires_at IS NOT NULL AND expires_at <= NOW() AS expired
+                FROM fsm_storage
+                WHERE storage_key = $1
+                """,
+                storage_key,
+            )
+            if row is None:
+                return None, {}
+            if row["expired"]:
+                await conn.execute(
+                    "DELETE FROM fsm_storage WHERE storage_key = $1 AND expires_at <= NOW()",
+                    storage_key,
+                )
+                logger.debug("Состояние FSM %s истекло и удалено", storage_key)
+                return None, {}
+        return row["state"], loads_data(row["data"])
+
+    async def set_record(
+        self, key: StorageKey, state: Optional[str], data: Dict[str, Any]
+    ) -> None:
+        storage_key = self.key_builder.build(key)
+        pool = await db.get_db_pool()
+        async with pool.acquire() as conn:
+            if state is None and not data:
+                # Пустые записи не храним, чтобы таблица не росла с каждым пользователем
+                await conn.execute(
+                    "DELETE FROM fsm_storage WHERE storage_key = $1", storage_key
+                )
+                return
+            await conn.execute(
+                """
+                INSERT INTO fsm_storage (storage_key, state, data, expires_at, updated_at)
+                VALUES ($1, $2, $3::jsonb, NOW() + make_interval(secs => $4::integer), NOW())
+                ON CONFLICT (storage_key)
+                DO UPDATE SET state = EXCLUDED.state,
+                              data = EXCLUDED.data,
+                              expires_at = NOW() + make_interval(
+                                  secs => COALESCE(fsm_storage.ttl_seconds, $4::integer)
+                              ),
+                              updated_at = NOW()
+                """,
+                storage_key,
+                state,
+                dumps_data(data),
+                self.default_ttl,
+            )
+
+    async def set_ttl(self, key: StorageKey, seconds: Optional[int]) -> None:
+        """Задаёт собственный срок жизни записи (``None`` — срок по умолчанию)."""
+
+        pool = await db.get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE fsm_storage
+                SET ttl_seconds = $2::integer,
+                    expires_at = NOW() + make_interval(
+                        secs => COALESCE($2::integer, $3::integer)
+                    )
+                WHERE storage_key = $1
+                """,
+                self.key_builder.build(key),
+                seconds,
+                self.default_ttl,
+            )
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _, data = await self.get_record(key)
+        await self.set_record(key, _state_name(state), data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self.get_record(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        state, _ = await self.get_record(key)
+        await self.set_record(key, state, data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self.get_record(key)
+        return data
+
+    async def purge_expired(self) -> int:
+        pool = await db.get_db_pool()
+        async with pool.acquire() as conn:
+            result = await conn.execute(
+                "DELETE FROM fsm_storage WHERE expires_at <= NOW()"
+            )
+        return int(result.split()[-1])
+
+    async def run_sweeper(self, interval: int) -> None:
+        """Фоновая задача: удаляет просроченные состояния."""
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.purge_expired()
+            except Exception as exc:
+                logger.error("Ошибка очистки просроченных состояний FSM: %s", exc)
+                continue
+            if removed:
+                logger.info("Удалено просроченных состояний FSM: %s", removed)
+
+    async def close(self) -> None:
+        # Пулом соединений владеет database.db
+        pass
+
+
+def _redis_storage_class():
+    try:
+        from aiogram.fsm.storage.redis import RedisStorage
+    except ImportError as exc:  # pragma: no cover - зависит от окружения
+        raise RuntimeError(
+            "FSM_STORAGE=redis требует пакет redis (pip install redis)"
+        ) from exc
+
+    class TTLRedisStorage(RedisStorage):
+        """RedisStorage с сохраняемым собственным TTL ключа и тем же форматом данных."""
+
+        def _ttl_key(self, key: StorageKey) -> str:
+            return self.key_builder.build(key) + ":ttl"
+
+        async def _ttl(self, key: StorageKey) -> Optional[int]:
+            value = await self.redis.get(self._ttl_key(key))
+            return int(value) if value is not None else self.data_ttl
+
+        async def get_record(self, key: StorageKey) -> tuple[Optional[str], Dict[str, Any]]:
+            state_raw, data_raw = await self.redis.mget(
+                self.key_builder.build(key, "state"), self.key_builder.build(key, "data")
+            )
+            if isinstance(state_raw, bytes):
+                state_raw = state_raw.decode("utf-8")
+            if isinstance(data_raw, bytes):
+                data_raw = data_raw.decode("utf-8")
+            return state_raw, self.json_loads(data_raw) if data_raw else {}
+
+        async def set_record(
+            self, key: StorageKey, state: Optional[str], data: Dict[str, Any]
+        ) -> None:
+            state_key = self.key_builder.build(key, "state")
+            data_key = self.key_builder.build(key, "data")
+            ttl = await self._ttl(key)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if state is None:
+                    pipe.delete(state_key)
+                else:
+                    pipe.set(state_key, state, ex=ttl)
+                if data:
+                    pipe.set(data_key, self.json_dumps(data), ex=ttl)
+                else:
+                    pipe.delete(data_key)
+                if state is None and not data:
+                    pipe.delete(self._ttl_key(key))
+                elif ttl:
+                    # Собственный срок живёт столько же, сколько сама запись
+                    pipe.expire(self._ttl_key(key), ttl)
+                await pipe.execute()
+
+        async def set_ttl(self, key: StorageKey, seconds: Optional[int]) -> None:
+            ttl_key = self._ttl_key(key)
+            if seconds is None:
+                await self.redis.delete(ttl_key)
+                seconds = self.data_ttl
+            else:
+                await self.redis.set(ttl_key, seconds, ex=seconds or None)
+            if seconds:
+                for part in ("state", "data"):
+                    await self.redis.expire(self.key_builder.build(key, part), seconds)
+
+    return TTLRedisStorage
+
+
+_UNSET = object()
+_pending_writes: ContextVar[Optional[dict]] = ContextVar("fsm_pending_writes", default=None)
+
+
+class CoalescingStorage(BaseStorage):
+    """Объединяет чтения и записи FSM в пределах обработки одного апдейта.
+
+    Внутри :class:`FSMWriteCoalescingMiddleware` первое обращение к ключу
+    читает запись целиком, последующие ``get_*``/``set_*``/``update_data``
+    работают с копией в памяти, а в хранилище уходит одна запись после
+    обработчика. Вне middleware (фоновые задачи, режим polling) операции
+    идут напрямую.
+
+    Middleware подключается только там, где апдейты одного чата
+    обрабатываются строго по очереди (``ChatOrderedUpdateQueue``): до
+    окончания обработчика его изменения не видны другим апдейтам, и
+    параллельный обработчик того же чата затёр бы их своей записью.
+    """
+
+    def __init__(self, backend: BaseStorage):
+        self.backend = backend
+
+    async def _entry(self, key: StorageKey) -> Optional[dict]:
+        pending = _pending_writes.get()
+        if pending is None:
+            return None
+        entry = pending.get(key)
+        if entry is None:
+            state, data = await self.backend.get_record(key)
+            entry = {"state": state, "data": data, "dirty": False}
+            pending[key] = entry
+        return entry
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        if entry is None:
+            await self.backend.set_state(key, state)
+            return
+        entry["state"] = _state_name(state)
+        entry["dirty"] = True
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = await self._entry(key)
+        if entry is None:
+            return await self.backend.get_state(key)
+        return entry["state"]
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        entry = await self._entry(key)
+        if entry is None:
+            await self.backend.set_data(key, data)
+            return
+        entry["data"] = data.copy()
+        entry["dirty"] = True
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = await self._entry(key)
+        if entry is None:
+            return await self.backend.get_data(key)
+        return entry["data"].copy()
+
+    async def set_ttl(self, key: StorageKey, seconds: Optional[int]) -> None:
+        entry = await self._entry(key)
+        if entry is not None and entry["dirty"]:
+            # Срок ставится на уже записанную строку — сначала сохраняем изменения
+            await self._flush_entry(key, entry)
+        await self.backend.set_ttl(key, seconds)
+
+    async def _flush_entry(self, key: StorageKey, entry: dict) -> None:
+        await self.backend.set_record(key, entry["state"], entry["data"])
+        entry["dirty"] = False
+
+    async def flush(self, pending: dict) -> None:
+        for key, entry in pending.items():
+            if entry["dirty"]:
+                await self._flush_entry(key, entry)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+class FSMWriteCoalescingMiddleware(BaseMiddleware):
+    """Открывает буфер FSM на время обработки апдейта и сохраняет его в конце."""
+
+    def __init__(self, storage: CoalescingStorage):
+        super().__init__()
+        self.storage = storage
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any],
+    ) -> Any:
+        pending: dict = {}
+        token = _pending_writes.set(pending)
+        try:
+            return await handler(event, data)
+        finally:
+            _pending_writes.reset(token)
+            try:
+                await self.storage.flush(pending)
+            except Exception as exc:
+                logger.error("Не удалось сохранить состояние FSM: %s", exc)
+
+
+async def expire_state(state: FSMContext, seconds: Optional[int]) -> None:
+    """Ограничивает срок жизни состояния пользователя ``seconds`` секундами."""
+
+    set_ttl = getattr(state.storage, "set_ttl", None)
+    if set_ttl is None:
+        logger.warning("Хранилище FSM %s не поддерживает TTL", type(state.storage).__name__)
+        return
+    await set_ttl(state.key, seconds)
+
+
+def create_fsm_storage() -> CoalescingStorage:
+    """Создаёт хранилище FSM по настройке FSM_STORAGE (postgres или redis)."""
+
+    ttl = FSM_STATE_TTL_HOURS * 3600 if FSM_STATE_TTL_HOURS > 0 else None
+    if FSM_STORAGE == "redis":
+        storage_class = _redis_storage_class()
+        backend = storage_class.from_url(
+            FSM_REDIS_URL,
+            key_builder=DefaultKeyBuilder(with_destiny=True),
+            state_ttl=ttl,
+            data_ttl=ttl,
+            json_loads=loads_data,
+            json_dumps=dumps_data,
+        )
+        logger.info("Состояния FSM хранятся в Redis: %s", FSM_REDIS_URL)
+    else:
+        backend = PostgresStorage(default_ttl=ttl)
+        logger.info("Состояния FSM хранятся в Postgres (TTL %s ч)", FSM_STATE_TTL_HOURS)
+    return CoalescingStorage(backend)
+
+
+async def run_fsm_sweeper(storage: BaseStorage) -> None:
+    """Периодическая очистка просроченных состояний (Redis удаляет их сам)."""
+
+    backend = getattr(storage, "backend", storage)
+    if isinstance(backend, PostgresStorage):
+        await backend.run_sweeper(FSM_SWEEP_INTERVAL_SECONDS)
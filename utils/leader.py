@@ -0,0 +1,121 @@
+"""Выбор лидера для фоновых задач, которые должны работать в одном экземпляре.
+
+Лидерство — сессионная advisory-блокировка PostgreSQL на отдельном
+соединении. Пока соединение живо, блокировку держит один процесс, сколько бы
+экземпляров бота ни было запущено. Если лидер падает, PostgreSQL снимает
+блокировку вместе с его сессией, и один из ожидающих процессов подхватывает
+задачу при следующей попытке.
+"""
+
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+
+from config import DB_CONFIG, LEADER_RETRY_SECONDS
+from utils.logger import get_logger
+from utils.metrics import registry
+
+logger = get_logger(__name__)
+
+# Как часто лидер проверяет, что его соединение (а значит, и блокировка) живо
+_HEALTH_CHECK_SECONDS = 5.0
+_HEALTH_CHECK_TIMEOUT = 5.0
+# Keepalive на стороне сервера: сессия процесса, пропавшего без закрытия
+# соединения (обрыв сети, kill -9 вместе с хостом), завершается примерно за 25 с
+_SERVER_SETTINGS = {
+    "application_name": "bot-leader",
+    "tcp_keepalives_idle": "10",
+    "tcp_keepalives_interval": "5",
+    "tcp_keepalives_count": "3",
+}
+
+LEADER = registry.gauge(
+    "bot_leader", "1, если процесс выполняет одиночную фоновую задачу", ("job",)
+)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Стабильный 64-битный ключ блокировки по имени задачи."""
+
+    digest = hashlib.sha256(f"bot-leader:{name}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class SingletonJob:
+    """Фоновая задача, которая выполняется только в процессе-лидере.
+
+    ``run()`` работает бесконечно: пытается взять блокировку раз в
+    ``retry_seconds`` секунд, а получив её, запускает ``job()`` и следит за
+    соединением. Потеря соединения означает потерю блокировки — задача
+    отменяется, и процесс снова становится претендентом. Если ``job()``
+    завершилась сама, блокировка отпускается и задача перезапускается
+    после паузы (возможно, уже в другом процессе).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[None]],
+        retry_seconds: float = LEADER_RETRY_SECONDS,
+    ):
+        self.name = name
+        self.job = job
+        self.retry_seconds = max(retry_seconds, 1)
+        self.key = advisory_lock_key(name)
+        self.is_leader = False
+
+    async def _connect(self) -> asyncpg.Connection:
+        return await asyncpg.connect(**DB_CONFIG, server_settings=_SERVER_SETTINGS)
+
+    async def _lead(self, conn: asyncpg.Connection) -> None:
+        task = asyncio.create_task(self.job(), name=f"leader-{self.name}")
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=_HEALTH_CHECK_SECONDS)
+                if done:
+                    exc = task.exception()
+                    if exc is not None:
+                        logger.error("Одиночная задача %s завершилась с ошибкой: %s", self.name, exc)
+                    else:
+                        logger.warning("Одиночная задача %s завершилась", self.name)
+                    await conn.execute("SELECT pg_advisory_unlock($1)", self.key)
+                    return
+                await asyncio.wait_for(conn.fetchval("SELECT 1"), _HEALTH_CHECK_TIMEOUT)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def run(self) -> None:
+        conn: Optional[asyncpg.Connection] = None
+        try:
+            while True:
+                try:
+                    if conn is None or conn.is_closed():
+                        conn = await self._connect()
+                    acquired = await conn.fetchval("SELECT pg_try_advisory_lock($1)", self.key)
+                    if acquired:
+                        self.is_leader = True
+                        LEADER.set(1, job=self.name)
+                        logger.info("Процесс стал лидером задачи %s", self.name)
+                        try:
+                            await self._lead(conn)
+                        finally:
+                            self.is_leader = False
+                            LEADER.set(0, job=self.name)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.warning(
+                        "Лидерство задачи %s потеряно или недоступно: %s", self.name, exc
+                    )
+                    if conn is not None:
+                        conn.terminate()
+                        conn = None
+                await asyncio.sleep(self.retry_seconds)
+        finally:
+            if conn is not None and not conn.is_closed():
+                # Закрытие сессии снимает блокировку — другой процесс станет лидером сразу
+                conn.terminate()
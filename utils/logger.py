@@ -1,9 +1,17 @@
 import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -12,6 +20,9 @@ load_dotenv()
 _LOGGER_NAME = "app"
 _logger_configured = False
 _handlers: List[logging.Handler] = []
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_BoundedQueueHandler"] = None
+_DROP_SUMMARY_INTERVAL_SECONDS = 1.0
 
 
 def _resolve_log_level(level_name: str) -> int:
@@ -21,8 +32,81 @@ def _resolve_log_level(level_name: str) -> int:
     return logging.INFO
 
 
+class _BoundedQueueHandler(QueueHandler):
+    """QueueHandler, который при переполнении очереди отбрасывает записи.
+
+    Поток, пишущий в журнал (обычно event loop), никогда не ждёт диск: запись
+    кладётся в очередь без блокировки, а если очередь заполнена, теряется и
+    учитывается в счётчике. Как только место освобождается, перед очередной
+    записью в журнал попадает сводка с числом пропущенных записей по уровням
+    (не чаще раза в секунду); записи между сводками не задерживаются.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._dropped: Dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+        self._next_summary_at = 0.0
+
+    def _count_dropped(self, counts: Dict[str, int]) -> None:
+        with self._dropped_lock:
+            for level, count in counts.items():
+                self._dropped[level] = self._dropped.get(level, 0) + count
+
+    def take_summary(self) -> Optional[logging.LogRecord]:
+        """Забирает накопленные счётчики пропусков в виде записи журнала."""
+
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, {}
+        if not dropped:
+            return None
+        record = logging.LogRecord(
+            name=f"{_LOGGER_NAME}.logger",
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg="Очередь журнала была переполнена, пропущено записей: %s",
+            args=(", ".join(f"{level} — {count}" for level, count in dropped.items()),),
+            exc_info=None,
+        )
+        record.dropped = dropped
+        return record
+
+    def _enqueue_summary(self) -> bool:
+        # Под постоянной перегрузкой сводка пишется не чаще раза в интервал
+        now = time.monotonic()
+        if now < self._next_summary_at:
+            return False
+        summary = self.take_summary()
+        if summary is None:
+            return True
+        try:
+            self.queue.put_nowait(self.prepare(summary))
+        except queue.Full:
+            self._count_dropped(summary.dropped)
+            return False
+        self._next_summary_at = now + _DROP_SUMMARY_INTERVAL_SECONDS
+        return True
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._dropped:
+            # Откладывается только сводка: сама запись идёт в очередь, если есть место
+            self._enqueue_summary()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count_dropped({record.levelname: 1})
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Штатный put_nowait упал бы на заполненной очереди; ждём места,
+        # чтобы остановка дописала все записи, а не прервалась
+        self.queue.put(self._sentinel)
+
+
 def _configure_logger() -> logging.Logger:
-    global _logger_configured
+    global _logger_configured, _listener, _queue_handler
 
     base_logger = logging.getLogger(_LOGGER_NAME)
     if base_logger.handlers:
@@ -41,9 +125,15 @@ def _configure_logger() -> logging.Logger:
     backup_count = int(os.getenv("LOG_BACKUP_COUNT", "7"))
     time_rotation = os.getenv("LOG_TIME_ROTATION", "midnight")
     time_rotation_interval = int(os.getenv("LOG_TIME_ROTATION_INTERVAL", "1"))
+    queue_size = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Рабочие процессы супервизора пишут каждый в свои файлы: ротация одного
+    # файла из нескольких процессов портит журнал
+    process_name = os.getenv("LOG_PROCESS_NAME", "").strip()
+    file_suffix = f"-{process_name}" if process_name else ""
+    process_prefix = f"{process_name} - " if process_name else ""
 
     formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        fmt=f"%(asctime)s - {process_prefix}%(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
@@ -54,7 +144,7 @@ def _configure_logger() -> logging.Logger:
     stream_handler.setLevel(log_level)
     stream_handler.setFormatter(formatter)
 
-    main_log_path = log_dir / "bot.log"
+    main_log_path = log_dir / f"bot{file_suffix}.log"
     if rotation_mode == "time":
         file_handler: logging.Handler = TimedRotatingFileHandler(
             main_log_path,
@@ -73,7 +163,9 @@ def _configure_logger() -> logging.Logger:
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
 
-    error_handler = logging.FileHandler(log_dir / "bot_error.log", encoding="utf-8")
+    error_handler = logging.FileHandler(
+        log_dir / f"bot_error{file_suffix}.log", encoding="utf-8"
+    )
     error_handler.setLevel(logging.WARNING)
     error_handler.setFormatter(formatter)
 
@@ -82,18 +174,17 @@ def _configure_logger() -> logging.Logger:
         "file": file_handler,
         "error": error_handler,
     }
+    _handlers.extend(handlers.values())
 
-    for handler in handlers.values():
-        base_logger.addHandler(handler)
-        _handlers.append(handler)
+    # Запись на диск и ротация выполняются в потоке QueueListener,
+    # вызывающий код только кладёт запись в очередь
+    log_queue: queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+    _queue_handler = _BoundedQueueHandler(log_queue)
+    _queue_handler.setLevel(log_level)
+    base_logger.addHandler(_queue_handler)
 
-    def _close_handlers() -> None:
-        for handler in _handlers:
-            try:
-                handler.flush()
-                handler.close()
-            except Exception:
-                pass
+    _listener = _DrainingQueueListener(log_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
 
     atexit.register(_close_handlers)
 
@@ -101,6 +192,68 @@ def _configure_logger() -> logging.Logger:
     return base_logger
 
 
+def shutdown_logging() -> None:
+    """Дописывает накопленные в очереди записи; дальнейшие пишутся напрямую."""
+
+    global _listener, _queue_handler
+
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    # Сначала переключаем логгер на прямую запись, чтобы записи, сделанные
+    # во время остановки, не остались в очереди без читателя
+    base_logger = logging.getLogger(_LOGGER_NAME)
+    for handler in _handlers:
+        base_logger.addHandler(handler)
+    queue_handler, _queue_handler = _queue_handler, None
+    if queue_handler is not None:
+        base_logger.removeHandler(queue_handler)
+    try:
+        # stop() дожидается, пока поток обработает всё, что уже в очереди
+        listener.stop()
+    except Exception:
+        pass
+    summary = queue_handler.take_summary() if queue_handler is not None else None
+    if summary is not None:
+        base_logger.handle(summary)
+    for handler in _handlers:
+        try:
+            handler.flush()
+        except Exception:
+            pass
+
+
+def _close_handlers() -> None:
+    shutdown_logging()
+    for handler in _handlers:
+        try:
+            handler.flush()
+            handler.close()
+        except Exception:
+            pass
+
+
+class lazy:
+    """Аргумент журнала, вычисляемый только при форматировании записи.
+
+    ``logger.debug("Данные: %s", lazy(expensive, value))`` не вызывает
+    ``expensive``, если уровень DEBUG выключен. Для значений, требующих
+    ``await``, используйте проверку ``logger.isEnabledFor``.
+    """
+
+    __slots__ = ("_func", "_args")
+
+    def __init__(self, func: Callable[..., Any], *args: Any):
+        self._func = func
+        self._args = args
+
+    def __str__(self) -> str:
+        return str(self._func(*self._args))
+
+    def __repr__(self) -> str:
+        return repr(self._func(*self._args))
+
+
 def get_logger(name: str) -> logging.Logger:
     _configure_logger()
     return logging.getLogger(f"{_LOGGER_NAME}.{name}")
@@ -0,0 +1,144 @@
+"""Сторож задержки event loop: находит код, который блокирует цикл."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from config import LOOP_LAG_THRESHOLD_MS
+from utils.logger import get_logger
+from utils.metrics import registry, task_handlers
+
+logger = get_logger(__name__)
+
+# Как часто цикл отмечается «живым» и как часто поток проверяет отметку
+_HEARTBEAT_INTERVAL = 0.1
+_STACK_LIMIT = 30
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+LOOP_LAG = registry.histogram(
+    "bot_event_loop_lag_seconds",
+    "Задержка запуска задач в event loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_BLOCKED = registry.counter(
+    "bot_event_loop_blocked_total",
+    "Случаи блокировки event loop дольше порога",
+    ("handler",),
+)
+
+
+def _blocking_stack(frame) -> str:
+    # Кадры самого asyncio (run_forever, _run_once и т.д.) не интересны
+    entries = traceback.extract_stack(frame)
+    start = 0
+    for index, entry in enumerate(entries):
+        if entry.filename.startswith(_ASYNCIO_DIR):
+            start = index + 1
+    entries = entries[start:] or entries
+    return "".join(traceback.format_list(entries[-_STACK_LIMIT:]))
+
+
+class LoopMonitor:
+    """Замеряет задержку event loop и ловит блокирующие вызовы.
+
+    Задача в цикле раз в ``_HEARTBEAT_INTERVAL`` обновляет отметку времени и
+    пишет фактическое опоздание пробуждения в гистограмму. Отдельный поток
+    следит за отметкой: если цикл не отвечает дольше ``threshold`` секунд,
+    поток снимает стек потока цикла (это и есть блокирующий код) и пишет его
+    в журнал вместе с именем обработчика текущей задачи (его выставляет
+    middleware метрик). Один эпизод блокировки логируется один раз, его
+    полная длительность — по окончании.
+    """
+
+    def __init__(self, threshold: Optional[float]):
+        self.threshold = threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    def start(self) -> None:
+        if not self.enabled:
+            logger.info("Сторож event loop отключён (LOOP_LAG_THRESHOLD_MS=0)")
+            return
+        if self._heartbeat_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Сторож event loop запущен, порог блокировки %.0f мс", self.threshold * 1000
+        )
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + _HEARTBEAT_INTERVAL
+            await asyncio.sleep(_HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+            LOOP_LAG.observe(max(now - expected, 0.0))
+            self._last_beat = now
+
+    def _capture(self) -> tuple[str, Optional[str]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = _blocking_stack(frame) if frame is not None else ""
+        handler = None
+        try:
+            # Читаем без синхронизации: это лишь снимок для диагностики
+            task = asyncio.current_task(self._loop)
+            handler = task_handlers.get(task) if task is not None else None
+        except (RuntimeError, TypeError):
+            pass
+        return stack, handler
+
+    def _watch(self) -> None:
+        blocked_since: Optional[float] = None
+        handler: Optional[str] = None
+        while not self._stop.wait(_HEARTBEAT_INTERVAL / 2):
+            stalled = time.monotonic() - self._last_beat - _HEARTBEAT_INTERVAL
+            if stalled < self.threshold:
+                if blocked_since is not None:
+                    logger.warning(
+                        "Event loop был заблокирован %.0f мс (обработчик: %s)",
+                        (time.monotonic() - blocked_since) * 1000,
+                        handler or "нет",
+                    )
+                    blocked_since = None
+                continue
+            if blocked_since is not None:
+                continue
+            blocked_since = self._last_beat + _HEARTBEAT_INTERVAL
+            stack, handler = self._capture()
+            LOOP_BLOCKED.inc(handler=handler or "none")
+            logger.warning(
+                "Event loop не отвечает %.0f мс, обработчик: %s, стек блокирующего кода:\n%s",
+                stalled * 1000,
+                handler or "нет",
+                stack,
+            )
+
+
+loop_monitor = LoopMonitor(LOOP_LAG_THRESHOLD_MS / 1000 if LOOP_LAG_THRESHOLD_MS > 0 else None)
@@ -0,0 +1,84 @@
+"""Отправка файлов руководств с повторным использованием telegram_file_id.
+
+Нужна и админ-разделу руководств, и пользовательскому меню, поэтому живёт
+здесь, а не в одном из пакетов обработчиков.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InlineKeyboardMarkup, Message
+
+from config import PUBLIC_MEDIA_ROOT
+from database.db import set_manual_file_telegram_id
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def manual_file_path(file_path: str) -> Path:
+    """Абсолютный путь файла руководства (в базе хранится путь от PUBLIC_MEDIA_ROOT)."""
+
+    candidate = Path(file_path)
+    if candidate.is_absolute():
+        return candidate
+    return Path(PUBLIC_MEDIA_ROOT) / candidate
+
+
+def _sent_file_id(sent: Message, file_type: Optional[str]) -> Optional[str]:
+    if file_type == "image":
+        return sent.photo[-1].file_id if sent.photo else None
+    # Видео без метаданных Telegram может сохранить как анимацию или документ
+    media = sent.video or sent.animation or sent.document
+    return media.file_id if media else None
+
+
+async def send_manual_record(
+    message: Message,
+    record,
+    *,
+    caption: Optional[str] = None,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+) -> Message:
+    """Отправляет файл руководства, по возможности без повторной загрузки.
+
+    После первой отправки с диска сохраняется ``telegram_file_id``, и дальше
+    файл отправляется по нему. Если Telegram отклоняет сохранённый
+    идентификатор, файл загружается заново, а идентификатор обновляется.
+    """
+
+    file_type = record.get("file_type")
+    if file_type == "image":
+        send = message.answer_photo
+    elif file_type == "video":
+        send = message.answer_video
+    else:
+        send = message.answer_document
+
+    cached_id = record.get("telegram_file_id")
+    if cached_id:
+        try:
+            return await send(cached_id, caption=caption, reply_markup=reply_markup)
+        except TelegramBadRequest as exc:
+            logger.warning(
+                "Telegram отклонил file_id руководства %s, загружаем заново: %s",
+                record["file_name"],
+                exc,
+            )
+
+    sent = await send(
+        FSInputFile(manual_file_path(record["file_path"])),
+        caption=caption,
+        reply_markup=reply_markup,
+    )
+    new_id = _sent_file_id(sent, file_type)
+    if new_id and new_id != cached_id:
+        try:
+            await set_manual_file_telegram_id(record["id"], new_id)
+        except Exception as exc:
+            # Файл уже отправлен; в следующий раз он просто загрузится снова
+            logger.warning(
+                "Не удалось сохранить file_id руководства %s: %s", record["file_name"], exc
+            )
+    return sent
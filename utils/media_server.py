@@ -0,0 +1,276 @@
+"""Раздача публичных файлов (/files/...) с условными запросами и кешированием."""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import quote
+
+from aiohttp import hdrs, web
+from multidict import CIMultiDict
+
+from utils.logger import get_logger
+from utils.storage import HLS_DIR_SUFFIX, ensure_within_public_root, public_root
+
+logger = get_logger(__name__)
+
+# Повторный stat() не чаще раза в STAT_TTL секунд на файл
+STAT_TTL_SECONDS = 2.0
+_MAX_ENTRIES = 4096
+_HASH_CHUNK_SIZE = 1 << 20
+
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Ссылки без версии переспрашивают сервер, но благодаря ETag получают 304 без тела
+_REVALIDATE_CACHE = "public, no-cache"
+
+# Проверяются по ETag содержимого в MediaServer и не передаются в FileResponse
+_CONDITIONAL_HEADERS = (
+    hdrs.IF_MATCH,
+    hdrs.IF_NONE_MATCH,
+    hdrs.IF_MODIFIED_SINCE,
+    hdrs.IF_UNMODIFIED_SINCE,
+    hdrs.IF_RANGE,
+)
+
+_EXTRA_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+}
+
+
+@dataclass
+class _FileEntry:
+    size: int
+    mtime_ns: int
+    mtime: float
+    etag: str
+    checked_at: float
+
+
+def _content_type(path: Path) -> str:
+    return (
+        _EXTRA_CONTENT_TYPES.get(path.suffix.lower())
+        or mimetypes.guess_type(path.name)[0]
+        or "application/octet-stream"
+    )
+
+
+def _is_inline(content_type: str) -> bool:
+    return content_type.startswith(("image/", "video/", "audio/")) or (
+        content_type == _EXTRA_CONTENT_TYPES[".m3u8"]
+    )
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    # Для If-None-Match допустимо слабое сравнение, для If-Match и If-Range —
+    # только сильное (RFC 9110, 13.1)
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+class _StrongETagFileResponse(web.FileResponse):
+    """FileResponse, отдающий ETag по содержимому вместо mtime/size.
+
+    Собственные проверки aiohttp сравнивают If-Match/If-None-Match/If-Range
+    с тегом из mtime/size, поэтому ответ готовится по копии запроса без
+    условных заголовков: они уже проверены в ``MediaServer.handle``.
+    """
+
+    def __init__(self, path: Path, etag: str, request_headers: CIMultiDict, **kwargs):
+        super().__init__(path, **kwargs)
+        self._content_etag = etag
+        self._request_headers = request_headers
+
+    async def prepare(self, request: web.BaseRequest):
+        return await super().prepare(request.clone(headers=self._request_headers))
+
+    @property
+    def etag(self):
+        return super().etag
+
+    @etag.setter
+    def etag(self, value) -> None:
+        # aiohttp выставляет свой тег из mtime/size при подготовке ответа
+        web.StreamResponse.etag.fset(self, self._content_etag)
+
+
+class MediaServer:
+    """Отдаёт файлы из PUBLIC_MEDIA_ROOT.
+
+    Результаты stat() и SHA-256 содержимого кешируются в памяти (LRU), хеш
+    пересчитывается только при смене размера или mtime. По сильному ETag и
+    Last-Modified отвечает 304 без чтения файла; If-Match и If-Range тоже
+    сравниваются с этим тегом. Файлы HLS-пакетов и ссылки вида ``?v=<etag>``
+    считаются адресованными по содержимому и кешируются клиентом бессрочно.
+    Изображения и видео отдаются inline, остальное — как вложение.
+    """
+
+    def __init__(self, root: Path, stat_ttl: float = STAT_TTL_SECONDS):
+        self.root = root
+        self.stat_ttl = stat_ttl
+        self._entries: "OrderedDict[Path, _FileEntry]" = OrderedDict()
+        self._hashing: dict[Path, asyncio.Task] = {}
+
+    def _resolve(self, path_fragment: str) -> Path:
+        if not path_fragment:
+            raise web.HTTPNotFound()
+        candidate = self.root / Path(path_fragment)
+        try:
+            ensure_within_public_root(candidate)
+        except ValueError:
+            logger.warning("Попытка доступа к файлу вне публичного каталога: %s", candidate)
+            raise web.HTTPNotFound() from None
+        return candidate
+
+    async def _entry(self, path: Path) -> _FileEntry:
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now - entry.checked_at < self.stat_ttl:
+            self._entries.move_to_end(path)
+            return entry
+
+        try:
+            stat = await asyncio.to_thread(os.stat, path)
+        except OSError:
+            self._entries.pop(path, None)
+            raise web.HTTPNotFound() from None
+        if not os.path.isfile(path):
+            raise web.HTTPNotFound()
+
+        if (
+            entry is not None
+            and entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+        ):
+            entry.checked_at = now
+            self._entries.move_to_end(path)
+            return entry
+
+        task = self._hashing.get(path)
+        if task is None:
+            # Одновременные запросы одного файла ждут общий подсчёт хеша
+            task = asyncio.create_task(asyncio.to_thread(_hash_file, path))
+            self._hashing[path] = task
+            task.add_done_callback(lambda _: self._hashing.pop(path, None))
+        try:
+            etag = await asyncio.shield(task)
+        except OSError:
+            raise web.HTTPNotFound() from None
+
+        entry = _FileEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            mtime=stat.st_mtime,
+            etag=etag,
+            checked_at=now,
+        )
+        self._entries[path] = entry
+        self._entries.move_to_end(path)
+        while len(self._entries) > _MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _precondition_failed(request: web.Request, entry: _FileEntry) -> bool:
+        if_match = request.headers.get(hdrs.IF_MATCH)
+        if if_match is not None:
+            return not _etag_matches(if_match, entry.etag, weak=False)
+        if_unmodified_since = request.if_unmodified_since
+        return (
+            if_unmodified_since is not None
+            and int(entry.mtime) > if_unmodified_since.timestamp()
+        )
+
+    @staticmethod
+    def _range_allowed(request: web.Request, entry: _FileEntry) -> bool:
+        """Условие If-Range: при несовпадении Range игнорируется и файл отдаётся целиком."""
+
+        if_range = request.headers.get(hdrs.IF_RANGE)
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith(('"', "W/")):
+            return _etag_matches(if_range, entry.etag, weak=False)
+        since = request.if_range
+        return since is not None and int(entry.mtime) <= since.timestamp()
+
+    @classmethod
+    def _file_request_headers(cls, request: web.Request, entry: _FileEntry) -> CIMultiDict:
+        forwarded = CIMultiDict(request.headers)
+        for name in _CONDITIONAL_HEADERS:
+            forwarded.popall(name, None)
+        if not cls._range_allowed(request, entry):
+            forwarded.popall(hdrs.RANGE, None)
+        return forwarded
+
+    @staticmethod
+    def _not_modified(request: web.Request, entry: _FileEntry) -> bool:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, entry.etag)
+        if_modified_since = request.if_modified_since
+        return (
+            if_modified_since is not None
+            and int(entry.mtime) <= if_modified_since.timestamp()
+        )
+
+    @staticmethod
+    def _is_content_addressed(request: web.Request, path: Path, entry: _FileEntry) -> bool:
+        if path.suffix.lower() != ".m3u8" and path.parent.name.endswith(HLS_DIR_SUFFIX):
+            return True
+        return request.query.get("v") == entry.etag
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        path = self._resolve(request.match_info.get("path", "").strip())
+        entry = await self._entry(path)
+        content_type = _content_type(path)
+        headers = {
+            "ETag": f'"{entry.etag}"',
+            "Last-Modified": formatdate(entry.mtime, usegmt=True),
+            "Cache-Control": _IMMUTABLE_CACHE
+            if self._is_content_addressed(request, path, entry)
+            else _REVALIDATE_CACHE,
+        }
+
+        if self._precondition_failed(request, entry):
+            return web.Response(status=412, headers=headers)
+        if self._not_modified(request, entry):
+            return web.Response(status=304, headers=headers)
+
+        disposition = "inline" if _is_inline(content_type) else "attachment"
+        headers["Content-Type"] = content_type
+        headers["Content-Disposition"] = (
+            f"{disposition}; filename*=UTF-8''{quote(path.name)}"
+        )
+        return _StrongETagFileResponse(
+            path,
+            entry.etag,
+            self._file_request_headers(request, entry),
+            headers=headers,
+        )
+
+
+media_server = MediaServer(public_root())
@@ -0,0 +1,430 @@
+"""Метрики задержек и ошибок в текстовом формате Prometheus.
+
+Собственный минимальный реестр без внешних зависимостей: счётчики,
+датчики и гистограммы с метками. Значения живут в памяти процесса и
+отдаются маршрутом ``/metrics`` в режиме PROD.
+"""
+
+import asyncio
+import hmac
+import math
+import re
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiohttp import web
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Для каждой комбинации меток: счётчики по корзинам, сумма, количество
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self) -> Iterable[str]:
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            plain = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{plain} {_format_value(total)}"
+            yield f"{self.name}_count{plain} {count}"
+
+
+class MetricsRegistry:
+    """Набор метрик процесса и функций, обновляющих датчики перед выгрузкой."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Функция вызывается перед каждой выгрузкой, чтобы обновить датчики."""
+
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as exc:
+                logger.warning("Ошибка сборщика метрик %s: %s", collector, exc)
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+UPDATES_TOTAL = registry.counter(
+    "bot_updates_total", "Обработанные апдейты по типу события", ("event",)
+)
+UPDATE_DURATION = registry.histogram(
+    "bot_update_duration_seconds", "Полное время обработки апдейта", ("event",)
+)
+UPDATES_IN_FLIGHT = registry.gauge(
+    "bot_updates_in_flight", "Апдейты в обработке", ("event",)
+)
+HANDLER_DURATION = registry.histogram(
+    "bot_handler_duration_seconds",
+    "Время работы обработчика",
+    ("router", "handler"),
+)
+HANDLER_ERRORS = registry.counter(
+    "bot_handler_errors_total",
+    "Исключения, вышедшие из обработчика",
+    ("router", "handler", "error"),
+)
+HANDLERS_IN_FLIGHT = registry.gauge(
+    "bot_handlers_in_flight", "Обработчики, выполняющиеся сейчас", ("router", "handler")
+)
+DB_QUERY_DURATION = registry.histogram(
+    "bot_db_query_duration_seconds",
+    "Время выполнения запросов к PostgreSQL",
+    ("operation", "table"),
+)
+DB_QUERY_ERRORS = registry.counter(
+    "bot_db_query_errors_total",
+    "Запросы к PostgreSQL, завершившиеся ошибкой",
+    ("operation", "table", "error"),
+)
+BOT_API_DURATION = registry.histogram(
+    "bot_api_request_duration_seconds",
+    "Время запросов к Bot API",
+    ("method",),
+)
+BOT_API_ERRORS = registry.counter(
+    "bot_api_request_errors_total",
+    "Запросы к Bot API, завершившиеся ошибкой",
+    ("method", "error"),
+)
+
+
+# Имя обработчика, внутри которого выполняется код (router.handler)
+current_handler: ContextVar[Optional[str]] = ContextVar("current_handler", default=None)
+# То же имя по задаче — для чтения из других потоков, где контекст задачи недоступен
+task_handlers: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def _event_type(update) -> str:
+    return getattr(update, "event_type", None) or type(update).__name__
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Внешний middleware апдейтов: общее время, число и апдейты в обработке."""
+
+    async def __call__(self, handler, update, data):
+        event = _event_type(update)
+        UPDATES_IN_FLIGHT.inc(event=event)
+        started = time.perf_counter()
+        try:
+            return await handler(update, data)
+        finally:
+            UPDATE_DURATION.observe(time.perf_counter() - started, event=event)
+            UPDATES_IN_FLIGHT.dec(event=event)
+            UPDATES_TOTAL.inc(event=event)
+
+
+def handler_labels(handler_object) -> Dict[str, str]:
+    """Метки router/handler по функции-обработчику aiogram."""
+
+    callback = getattr(handler_object, "callback", None)
+    if callback is None:
+        return {"router": "unknown", "handler": "unknown"}
+    module = getattr(callback, "__module__", "") or ""
+    return {
+        "router": module.rsplit(".", 1)[-1] or "unknown",
+        "handler": getattr(callback, "__name__", type(callback).__name__),
+    }
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Внутренний middleware: задержка и ошибки конкретного обработчика."""
+
+    async def __call__(self, handler, event, data):
+        labels = handler_labels(data.get("handler"))
+        HANDLERS_IN_FLIGHT.inc(**labels)
+        name = f"{labels['router']}.{labels['handler']}"
+        token = current_handler.set(name)
+        task = asyncio.current_task()
+        previous = task_handlers.get(task)
+        task_handlers[task] = name
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as exc:
+            HANDLER_ERRORS.inc(error=type(exc).__name__, **labels)
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, **labels)
+            HANDLERS_IN_FLIGHT.dec(**labels)
+            current_handler.reset(token)
+            if previous is None:
+                task_handlers.pop(task, None)
+            else:
+                task_handlers[task] = previous
+
+
+def setup_dispatcher_metrics(dp) -> None:
+    """Подключает сбор метрик ко всем типам событий диспетчера."""
+
+    dp.update.outer_middleware.register(UpdateMetricsMiddleware())
+    handler_middleware = HandlerMetricsMiddleware()
+    for name, observer in dp.observers.items():
+        # Внутренние middleware диспетчера действуют и на обработчики вложенных роутеров
+        if name not in ("update", "error"):
+            observer.middleware.register(handler_middleware)
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: время и ошибки каждого вызова Bot API."""
+
+    async def __call__(self, make_request, bot, method):
+        api_method = getattr(method, "__api_method__", type(method).__name__)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as exc:
+            BOT_API_ERRORS.inc(method=api_method, error=type(exc).__name__)
+            raise
+        finally:
+            BOT_API_DURATION.observe(time.perf_counter() - started, method=api_method)
+
+
+def setup_bot_metrics(bot) -> None:
+    bot.session.middleware(BotApiMetricsMiddleware())
+
+
+_SQL_TABLE_RE = re.compile(
+    r"\b(?:FROM|INTO|UPDATE|JOIN|TABLE(?:\s+IF\s+(?:NOT\s+)?EXISTS)?)\s+([A-Za-z_][\w.]*)",
+    re.IGNORECASE,
+)
+
+
+def query_labels(query: str) -> Dict[str, str]:
+    """Метки operation/table по тексту SQL (первое ключевое слово и первая таблица)."""
+
+    stripped = query.lstrip(" \t\r\n(")
+    operation = stripped.split(None, 1)[0].upper() if stripped else "UNKNOWN"
+    match = _SQL_TABLE_RE.search(query)
+    return {"operation": operation, "table": match.group(1).lower() if match else "-"}
+
+
+def record_query(record) -> None:
+    """Обработчик asyncpg ``add_query_logger``: время и ошибки запросов."""
+
+    labels = query_labels(record.query)
+    DB_QUERY_DURATION.observe(record.elapsed, **labels)
+    if record.exception is not None:
+        DB_QUERY_ERRORS.inc(error=type(record.exception).__name__, **labels)
+
+
+def _with_label(sample: str, name: str, value: str) -> str:
+    label = f'{name}="{_escape_label(value)}"'
+    metric, brace, rest = sample.partition("{")
+    if brace:
+        return f"{metric}{{{label},{rest}"
+    metric, _, rest = sample.partition(" ")
+    return f"{metric}{{{label}}} {rest}"
+
+
+def merge_expositions(sources: Iterable[Tuple[str, str]], label: str = "process") -> str:
+    """Объединяет выгрузки нескольких процессов в одну.
+
+    Каждый сэмпл получает метку ``label`` с именем своего процесса. HELP и
+    TYPE метрики выводятся один раз, а её сэмплы из всех процессов идут
+    подряд, как требует текстовый формат Prometheus.
+    """
+
+    headers: Dict[str, Dict[str, str]] = {}
+    samples: Dict[str, list[str]] = {}
+    for source, text in sources:
+        family = None
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith("#"):
+                parts = line.split(" ", 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = parts[2]
+                    headers.setdefault(family, {}).setdefault(parts[1], line)
+                    samples.setdefault(family, [])
+                continue
+            if family is None:
+                family = re.split(r"[{ ]", line, 1)[0]
+            samples.setdefault(family, []).append(_with_label(line, label, source))
+
+    lines = []
+    for family, family_samples in samples.items():
+        family_headers = headers.get(family, {})
+        lines.extend(
+            family_headers[kind] for kind in ("HELP", "TYPE") if kind in family_headers
+        )
+        lines.extend(family_samples)
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_token_matches(request: web.Request, token: str) -> bool:
+    return hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+
+
+def create_metrics_handler(
+    token: Optional[str] = None,
+    remote_sources: Optional[Callable[[], Awaitable[list[Tuple[str, str]]]]] = None,
+) -> Callable[[web.Request], Awaitable[web.Response]]:
+    """aiohttp-обработчик выгрузки; при заданном ``token`` требует его в запросе.
+
+    ``remote_sources`` возвращает выгрузки других процессов (имя, текст):
+    они добавляются к метрикам этого процесса, а он сам помечается ``front``.
+    """
+
+    async def metrics_handler(request: web.Request) -> web.Response:
+        if token and not _metrics_token_matches(request, token):
+            raise web.HTTPUnauthorized()
+        if remote_sources is None:
+            body = registry.render()
+        else:
+            remote = await remote_sources()
+            body = merge_expositions([("front", registry.render()), *remote])
+        return web.Response(
+            body=body.encode("utf-8"),
+            headers={
+                "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+                "Cache-Control": "no-store",
+            },
+        )
+
+    return metrics_handler
@@ -0,0 +1,174 @@
+"""Профилирование работающего процесса без перезапуска.
+
+Сэмплирующий профилировщик опрашивает стеки потоков из отдельного потока
+и собирает их в формате collapsed stacks (``кадр;кадр;кадр N``), который
+читают flamegraph.pl, speedscope и аналоги. Память снимается через
+``tracemalloc``: каждый снимок сравнивается с предыдущим.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_MAX_SECONDS = 300
+_SAMPLE_INTERVAL = 0.005
+_TRACEMALLOC_FRAMES = 25
+_TOP_ALLOCATIONS = 40
+
+
+class ProfilerBusy(RuntimeError):
+    """Профилирование уже идёт."""
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    parts = path.replace("\\", "/").rsplit("/", 2)
+    short = "/".join(parts[-2:]) if len(parts) > 1 else path
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик всех потоков процесса."""
+
+    def __init__(self, interval: float = _SAMPLE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _sample(self, seconds: float) -> tuple[Counter, int]:
+        stacks: Counter = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                thread_name = names.get(thread_id, str(thread_id))
+                stack = ";".join([thread_name, *_collapse(frame)])
+                stacks[stack] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return stacks, samples
+
+    async def profile(self, seconds: float) -> tuple[str, str]:
+        """Профилирует ``seconds`` секунд; возвращает (collapsed stacks, сводку)."""
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Профилирование уже запущено")
+        try:
+            seconds = max(1.0, min(float(seconds), PROFILE_MAX_SECONDS))
+            logger.info("Запущено профилирование на %.0f с", seconds)
+            stacks, samples = await asyncio.to_thread(self._sample, seconds)
+        finally:
+            self._lock.release()
+        collapsed = "\n".join(
+            f"{stack} {count}" for stack, count in stacks.most_common()
+        )
+        summary = self._summary(stacks, samples, seconds)
+        logger.info("Профилирование завершено, снимков стека: %s", samples)
+        return collapsed + "\n", summary
+
+    @staticmethod
+    def _summary(stacks: Counter, samples: int, seconds: float) -> str:
+        # Собственное время функции: сколько раз она была верхним кадром
+        self_time: Counter = Counter()
+        for stack, count in stacks.items():
+            thread_name, _, rest = stack.partition(";")
+            leaf = rest.rsplit(";", 1)[-1] if rest else "?"
+            self_time[f"[{thread_name}] {leaf}"] += count
+        lines = [f"Профиль за {seconds:.0f} с, опросов: {samples}", "Самые частые верхние кадры:"]
+        for label, count in self_time.most_common(15):
+            share = count / samples * 100 if samples else 0.0
+            lines.append(f"{share:5.1f}%  {label}")
+        return "\n".join(lines)
+
+
+class MemoryProfiler:
+    """Снимки tracemalloc и разница с предыдущим снимком."""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._started_here = False
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            self._started_here = True
+            logger.info("tracemalloc запущен (%s кадров)", _TRACEMALLOC_FRAMES)
+        self._previous = None
+
+    def stop(self) -> None:
+        if tracemalloc.is_tracing() and self._started_here:
+            tracemalloc.stop()
+            logger.info("tracemalloc остановлен")
+        self._started_here = False
+        self._previous = None
+
+    def _snapshot_report(self) -> str:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Отслеживается {current / 1024 / 1024:.1f} МБ, пик {peak / 1024 / 1024:.1f} МБ",
+            "",
+            f"Крупнейшие места выделения памяти (топ {_TOP_ALLOCATIONS}):",
+        ]
+        for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]:
+            lines.append(str(stat))
+        if self._previous is not None:
+            lines += ["", "Рост с предыдущего снимка:"]
+            for stat in snapshot.compare_to(self._previous, "lineno")[:_TOP_ALLOCATIONS]:
+                lines.append(str(stat))
+            lines += ["", "Стеки с наибольшим ростом:"]
+            for stat in snapshot.compare_to(self._previous, "traceback")[:10]:
+                lines.append(f"{stat.size_diff / 1024:+.1f} КиБ, блоков {stat.count_diff:+d}:")
+                lines.extend(f"    {line}" for line in stat.traceback.format())
+        self._previous = snapshot
+        return "\n".join(lines) + "\n"
+
+    async def snapshot(self) -> str:
+        """Снимок и отчёт; подсчёт статистики выполняется в отдельном потоке."""
+
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc не запущен")
+        return await asyncio.to_thread(self._snapshot_report)
+
+
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
+
+
+def report_filename(prefix: str, extension: str) -> str:
+    return f"{prefix}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}"
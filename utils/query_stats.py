@@ -0,0 +1,149 @@
+"""Статистика запросов к PostgreSQL по нормализованному тексту SQL."""
+
+import itertools
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from config import DB_SLOW_QUERY_MS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Длительности для p95 берутся из последних N выполнений каждого запроса
+_SAMPLE_SIZE = 512
+_MAX_QUERIES = 1000
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """Текст запроса без литералов и лишних пробелов: ключ статистики."""
+
+    normalized = _STRING_RE.sub("?", query)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?, ...)", normalized)
+    return _SPACE_RE.sub(" ", normalized).strip().rstrip(";")
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class QueryStat:
+    id: int
+    sql: str
+    count: int = 0
+    errors: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    slow: int = 0
+    samples: deque = field(default_factory=lambda: deque(maxlen=_SAMPLE_SIZE))
+    # Исходный текст и аргументы для EXPLAIN: последний медленный вызов,
+    # а пока медленных не было — последний вызов вообще
+    sample_query: Optional[str] = None
+    sample_args: tuple = ()
+    last_seen: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p95(self) -> float:
+        return _percentile(self.samples, 0.95)
+
+
+class QueryStats:
+    """Накопитель времени запросов, подключаемый как query logger asyncpg.
+
+    Запросы дольше ``slow_threshold`` секунд пишутся в журнал, а их текст и
+    аргументы запоминаются, чтобы по команде администратора получить план
+    через EXPLAIN (без ANALYZE — запрос при этом не выполняется).
+    """
+
+    def __init__(self, slow_threshold: Optional[float]):
+        self.slow_threshold = slow_threshold
+        self._stats: dict[str, QueryStat] = {}
+        self._ids = itertools.count(1)
+        self.started_at = time.time()
+
+    def record(self, record) -> None:
+        query = record.query
+        if query.lstrip().upper().startswith("EXPLAIN"):
+            return
+        key = normalize_sql(query)
+        stat = self._stats.get(key)
+        if stat is None:
+            if len(self._stats) >= _MAX_QUERIES:
+                self._evict()
+            stat = self._stats[key] = QueryStat(id=next(self._ids), sql=key)
+        elapsed = record.elapsed
+        stat.count += 1
+        stat.total += elapsed
+        stat.max = max(stat.max, elapsed)
+        stat.samples.append(elapsed)
+        stat.last_seen = time.time()
+        if record.exception is not None:
+            stat.errors += 1
+        is_slow = self.slow_threshold is not None and elapsed >= self.slow_threshold
+        if is_slow or not stat.slow:
+            stat.sample_query = query
+            stat.sample_args = tuple(record.args or ())
+        if is_slow:
+            stat.slow += 1
+            logger.warning(
+                "Медленный запрос %.0f мс (выполнений %s, p95 %.0f мс): %s",
+                elapsed * 1000,
+                stat.count,
+                stat.p95 * 1000,
+                key[:500],
+            )
+
+    def _evict(self) -> None:
+        # Вытесняем запрос, который давно не выполнялся и занял меньше всего времени
+        victim = min(self._stats.values(), key=lambda stat: (stat.total, stat.last_seen))
+        self._stats.pop(victim.sql, None)
+
+    def top(self, limit: int = 10, order: str = "total") -> list[QueryStat]:
+        keys = {
+            "total": lambda stat: stat.total,
+            "p95": lambda stat: stat.p95,
+            "count": lambda stat: stat.count,
+            "max": lambda stat: stat.max,
+        }
+        return sorted(self._stats.values(), key=keys[order], reverse=True)[:limit]
+
+    def get(self, stat_id: int) -> Optional[QueryStat]:
+        return next((stat for stat in self._stats.values() if stat.id == stat_id), None)
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self.started_at = time.time()
+
+    @staticmethod
+    def explainable(stat: QueryStat) -> bool:
+        return stat.sql.lstrip(" (").upper().startswith(_EXPLAINABLE)
+
+    async def explain(self, pool, stat: QueryStat) -> str:
+        """План последнего медленного (а если их не было — последнего) вызова запроса."""
+
+        if not self.explainable(stat) or stat.sample_query is None:
+            raise ValueError("Для этого запроса EXPLAIN не поддерживается")
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(f"EXPLAIN {stat.sample_query}", *stat.sample_args)
+        return "\n".join(row[0] for row in rows)
+
+
+query_stats = QueryStats(DB_SLOW_QUERY_MS / 1000 if DB_SLOW_QUERY_MS > 0 else None)
@@ -3,12 +3,19 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterable, Optional, Tuple, Union
 
 from config import PUBLIC_MEDIA_ROOT, PUBLIC_MEDIA_URL
 
 PathLike = Union[str, Path]
 
+# Derived files stored next to a video: "clip.mp4" -> "clip.poster.jpg", "clip.preview.mp4"
+POSTER_SUFFIX = ".poster.jpg"
+PREVIEW_SUFFIX = ".preview.mp4"
+# HLS package directory: "clip.hls/index.m3u8" plus init.mp4 and seg_*.m4s
+HLS_DIR_SUFFIX = ".hls"
+HLS_PLAYLIST_NAME = "index.m3u8"
+
 _PUBLIC_ROOT_PATH = Path(PUBLIC_MEDIA_ROOT).resolve()
 _PUBLIC_ROOT_PATH.mkdir(parents=True, exist_ok=True)
 
@@ -49,3 +56,51 @@ def public_root() -> Path:
 
     return _PUBLIC_ROOT_PATH
 
+
+
+def path_from_public_url(url: Optional[str]) -> Optional[Path]:
+    """Map a URL produced by :func:`build_public_url` back to the filesystem path."""
+
+    base = PUBLIC_MEDIA_URL.rstrip("/")
+    if not url or not base or not url.startswith(f"{base}/"):
+        return None
+    candidate = (_PUBLIC_ROOT_PATH / url[len(base) + 1 :]).resolve()
+    try:
+        candidate.relative_to(_PUBLIC_ROOT_PATH)
+    except ValueError:
+        return None
+    return candidate
+
+
+def video_derivative_paths(video_path: PathLike) -> Dict[str, Path]:
+    """Return where the poster, the preview clip and the HLS playlist of ``video_path`` are stored."""
+
+    video = Path(video_path)
+    stem = video.with_suffix("")
+    return {
+        "poster": stem.with_name(stem.name + POSTER_SUFFIX),
+        "preview": stem.with_name(stem.name + PREVIEW_SUFFIX),
+        "hls": stem.with_name(stem.name + HLS_DIR_SUFFIX) / HLS_PLAYLIST_NAME,
+    }
+
+
+def video_derivative_urls(video_url: Optional[str]) -> Dict[str, str]:
+    """Return public URLs of the existing poster/preview/HLS playlist for a stored video URL."""
+
+    video_path = path_from_public_url(video_url)
+    if video_path is None:
+        return {}
+    return {
+        kind: build_public_url(path)
+        for kind, path in video_derivative_paths(video_path).items()
+        if path.exists()
+    }
+
+
+def video_derivative_links(video_urls: Iterable[Optional[str]]) -> Tuple[str, str]:
+    """Return comma-separated poster and preview URLs for export columns, like the videos themselves."""
+
+    derivatives = [video_derivative_urls(url) for url in video_urls if url]
+    posters = [item["poster"] for item in derivatives if "poster" in item]
+    previews = [item["preview"] for item in derivatives if "preview" in item]
+    return ", ".join(posters), ", ".join(previews)
@@ -0,0 +1,234 @@
+"""Несколько процессов-обработчиков за одним фронтальным процессом.
+
+Фронт принимает вебхук и по ``chat_id % N`` пересылает апдейт одному из
+N рабочих процессов, слушающих локальные порты. Апдейты одного чата всегда
+попадают в один процесс, поэтому их порядок и состояние FSM не
+перемешиваются между процессами. Общие данные процессы хранят в PostgreSQL
+(FSM, заявки, справочники), в памяти каждого процесса — только кеши.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from typing import Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+from utils.logger import get_logger
+from utils.metrics import registry
+
+logger = get_logger(__name__)
+
+# Переменная окружения с именем процесса: по ней логгер выбирает свои файлы
+PROCESS_NAME_ENV = "LOG_PROCESS_NAME"
+_MONITOR_INTERVAL_SECONDS = 1.0
+# Процесс, упавший быстрее этого срока, перезапускается с задержкой
+_RESTART_BACKOFF_SECONDS = 5.0
+_STOP_TIMEOUT_SECONDS = 40.0
+_FORWARD_TIMEOUT_SECONDS = 15.0
+_SCRAPE_TIMEOUT = aiohttp.ClientTimeout(total=5.0)
+
+FORWARDED_UPDATES = registry.counter(
+    "bot_supervisor_forwarded_total", "Апдейты, переданные рабочим процессам", ("worker", "status")
+)
+WORKER_RESTARTS = registry.counter(
+    "bot_supervisor_worker_restarts_total", "Перезапуски рабочих процессов", ("worker",)
+)
+WORKER_UP = registry.gauge(
+    "bot_supervisor_worker_up",
+    "1, если рабочий процесс отдал метрики при последнем опросе",
+    ("worker",),
+)
+
+
+def raw_update_shard_key(payload: dict) -> int:
+    """Ключ шарда по сырому JSON апдейта: чат, иначе пользователь, иначе update_id.
+
+    Совпадает с ключом FSM aiogram: для событий без чата состояние хранится
+    по пользователю. Полный разбор Update во фронте не нужен.
+    """
+
+    for name, event in payload.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and chat.get("id") is not None:
+            return int(chat["id"])
+        user = event.get("from") or event.get("user")
+        if isinstance(user, dict) and user.get("id") is not None:
+            return int(user["id"])
+        break
+    return int(payload.get("update_id", 0))
+
+
+class _WorkerSlot:
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.port = port
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+
+
+class ShardSupervisor:
+    """Запускает рабочие процессы, следит за ними и маршрутизирует апдейты.
+
+    ``target(index, port)`` выполняется в отдельном процессе (метод запуска
+    spawn) и должен поднять HTTP-сервер с POST ``/webhook`` на
+    ``127.0.0.1:port``. Упавший процесс перезапускается; пока он
+    недоступен, апдейты его шарда получают 503 и Telegram доставит их
+    повторно.
+
+    :meth:`scrape_metrics` опрашивает ``/metrics`` процессов, чтобы фронт
+    отдавал метрики всех процессов одной выгрузкой.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[int, int], None],
+        workers: int,
+        base_port: int,
+        metrics_token: Optional[str] = None,
+    ):
+        self.target = target
+        self.metrics_token = metrics_token
+        self.slots = [_WorkerSlot(index, base_port + index) for index in range(max(workers, 1))]
+        self._context = multiprocessing.get_context("spawn")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        process = self._context.Process(
+            target=self.target,
+            args=(slot.index, slot.port),
+            name=f"bot-worker-{slot.index}",
+        )
+        # Дочерний процесс наследует окружение в момент запуска
+        previous = os.environ.get(PROCESS_NAME_ENV)
+        os.environ[PROCESS_NAME_ENV] = f"worker-{slot.index}"
+        try:
+            process.start()
+        finally:
+            if previous is None:
+                os.environ.pop(PROCESS_NAME_ENV, None)
+            else:
+                os.environ[PROCESS_NAME_ENV] = previous
+        slot.process = process
+        slot.started_at = time.monotonic()
+        logger.info(
+            "Рабочий процесс %s запущен (PID %s, порт %s)", slot.index, process.pid, slot.port
+        )
+
+    async def start(self, app: Optional[web.Application] = None) -> None:
+        self._stopping = False
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=_FORWARD_TIMEOUT_SECONDS)
+        )
+        for slot in self.slots:
+            self._spawn(slot)
+        self._monitor_task = asyncio.create_task(self._monitor(), name="shard-supervisor")
+        logger.info("Супервизор запущен, рабочих процессов: %s", len(self.slots))
+
+    async def stop(self, app: Optional[web.Application] = None) -> None:
+        """Останавливает процессы через SIGTERM: каждый дорабатывает принятые апдейты."""
+
+        self._stopping = True
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        processes = [slot.process for slot in self.slots if slot.process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            await asyncio.to_thread(process.join, _STOP_TIMEOUT_SECONDS)
+            if process.is_alive():
+                logger.warning("Процесс %s не завершился вовремя, принудительная остановка", process.name)
+                process.kill()
+                await asyncio.to_thread(process.join, 5)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        logger.info("Рабочие процессы остановлены")
+
+    async def _monitor(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(_MONITOR_INTERVAL_SECONDS)
+            for slot in self.slots:
+                process = slot.process
+                if process is None or process.is_alive() or self._stopping:
+                    continue
+                lifetime = time.monotonic() - slot.started_at
+                logger.error(
+                    "Рабочий процесс %s завершился с кодом %s после %.0f с, перезапуск",
+                    slot.index,
+                    process.exitcode,
+                    lifetime,
+                )
+                process.close()
+                slot.process = None
+                WORKER_RESTARTS.inc(worker=str(slot.index))
+                if lifetime < _RESTART_BACKOFF_SECONDS:
+                    await asyncio.sleep(_RESTART_BACKOFF_SECONDS)
+                if not self._stopping:
+                    self._spawn(slot)
+
+    async def _scrape_slot(self, slot: _WorkerSlot) -> Optional[tuple[str, str]]:
+        headers = {}
+        if self.metrics_token:
+            headers["Authorization"] = f"Bearer {self.metrics_token}"
+        try:
+            async with self._session.get(
+                f"http://127.0.0.1:{slot.port}/metrics",
+                headers=headers,
+                timeout=_SCRAPE_TIMEOUT,
+            ) as response:
+                response.raise_for_status()
+                text = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.warning("Не удалось получить метрики рабочего процесса %s: %s", slot.index, exc)
+            WORKER_UP.set(0, worker=str(slot.index))
+            return None
+        WORKER_UP.set(1, worker=str(slot.index))
+        return f"worker-{slot.index}", text
+
+    async def scrape_metrics(self) -> list[tuple[str, str]]:
+        """Выгрузки ``/metrics`` доступных рабочих процессов: (``worker-N``, текст)."""
+
+        if self._session is None:
+            return []
+        results = await asyncio.gather(*(self._scrape_slot(slot) for slot in self.slots))
+        return [result for result in results if result is not None]
+
+    def slot_for(self, key: int) -> _WorkerSlot:
+        return self.slots[key % len(self.slots)]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """POST вебхука во фронте: пересылает тело апдейта процессу его шарда."""
+
+        body = await request.read()
+        try:
+            key = raw_update_shard_key(json.loads(body))
+        except (ValueError, TypeError, AttributeError) as exc:
+            logger.error("Не удалось разобрать апдейт вебхука: %s", exc)
+            return web.json_response({})
+        slot = self.slot_for(key)
+        try:
+            async with self._session.post(
+                f"http://127.0.0.1:{slot.port}/webhook",
+                data=body,
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.warning("Рабочий процесс %s недоступен: %s", slot.index, exc)
+            status = 503
+        FORWARDED_UPDATES.inc(worker=str(slot.index), status=str(status))
+        if status != 200:
+            # 503 от процесса — его очередь переполнена; Telegram повторит доставку
+            return web.Response(status=503, headers={"Retry-After": "5"})
+        return web.json_response({})
@@ -0,0 +1,380 @@
+"""Очередь сжатия видео с ограниченным числом одновременных кодирований."""
+
+import asyncio
+import inspect
+import itertools
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import IO, Awaitable, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: ограничение действует только внутри процесса
+    fcntl = None
+
+from config import TRANSCODE_SLOT_DIR, TRANSCODE_THREADS_PER_ENCODE, TRANSCODE_WORKERS
+from utils.logger import get_logger
+from utils.video import compress_video, needs_compression
+
+logger = get_logger(__name__)
+
+# Чем меньше значение, тем раньше задача попадёт к свободному воркеру
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Как часто воркер проверяет, освободился ли слот кодирования на машине
+_SLOT_POLL_SECONDS = 0.5
+
+
+# Увеличивается при изменении логики кодирования, чтобы не переиспользовать
+# результаты, полученные прежней версией
+TRANSCODE_CACHE_VERSION = 1
+_CACHE_KEY_OPTIONS = ("target_size_mb", "audio_bitrate_kbps", "preset")
+
+
+def transcode_params_key(**options) -> str:
+    """Строка параметров сжатия для кеша результатов (с учётом значений по умолчанию)."""
+
+    signature = inspect.signature(compress_video)
+    params = {name: signature.parameters[name].default for name in _CACHE_KEY_OPTIONS}
+    params.update((name, options[name]) for name in _CACHE_KEY_OPTIONS if name in options)
+    return f"v{TRANSCODE_CACHE_VERSION}:" + ",".join(
+        f"{name}={params[name]}" for name in _CACHE_KEY_OPTIONS
+    )
+
+
+class TranscodeCancelled(Exception):
+    """Задача сжатия отменена пользователем до завершения."""
+
+
+@dataclass
+class TranscodeJob:
+    job_id: str
+    input_file: str
+    priority: int
+    sequence: int
+    owner_id: Optional[int]
+    options: dict
+    future: asyncio.Future
+    state: str = "queued"
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    progress: Optional[float] = None
+    started_at: Optional[float] = None
+    # Сжатие дало новый файл; False — результатом остался исходник
+    encoded: bool = False
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Оценка оставшегося времени по доле выполнения с начала кодирования."""
+
+        if not self.progress or self.started_at is None:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed * (1 - self.progress) / self.progress
+
+
+def _default_worker_count(threads_per_encode: int) -> int:
+    cores = os.cpu_count() or 1
+    return max(1, cores // max(threads_per_encode, 1))
+
+
+def _resolve_from_task(job: TranscodeJob, task: asyncio.Task) -> None:
+    if job.future.done():
+        return
+    if task.cancelled():
+        job.future.set_exception(TranscodeCancelled(job.job_id))
+    elif task.exception() is not None:
+        job.future.set_exception(task.exception())
+    else:
+        result = task.result()
+        job.encoded = result.encoded
+        job.future.set_result(result.path)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Отменённую задачу могут больше никогда не ожидать — не шумим в логах
+    if not future.cancelled():
+        future.exception()
+
+
+class MachineSlots:
+    """Общий для всех процессов машины лимит одновременных кодирований.
+
+    Слот — файл ``slot-N.lock`` в ``directory``, занятый блокировкой
+    ``flock``. Блокировку снимает ядро при закрытии файла, поэтому слот
+    упавшего процесса освобождается сам. Без ``fcntl`` (Windows) лимит
+    действует только внутри процесса.
+    """
+
+    def __init__(self, count: int, directory: str):
+        self.count = count
+        self.directory = Path(directory)
+        self._files: dict[int, IO] = {}
+        self._held: set[int] = set()
+
+    def _slot_file(self, index: int) -> IO:
+        slot_file = self._files.get(index)
+        if slot_file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            slot_file = self._files[index] = open(self.directory / f"slot-{index}.lock", "a+")
+        return slot_file
+
+    def _try_acquire(self) -> Optional[int]:
+        for index in range(self.count):
+            # flock повторно на том же файле проходит, поэтому свои слоты пропускаем
+            if index in self._held:
+                continue
+            try:
+                fcntl.flock(self._slot_file(index).fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            self._held.add(index)
+            return index
+        return None
+
+    async def acquire(self, abandoned: Callable[[], bool]) -> Optional[int]:
+        """Ждёт свободный слот; None — слоты не используются или ``abandoned()``."""
+
+        if fcntl is None:
+            return None
+        while not abandoned():
+            index = self._try_acquire()
+            if index is not None:
+                return index
+            await asyncio.sleep(_SLOT_POLL_SECONDS)
+        return None
+
+    def release(self, index: Optional[int]) -> None:
+        if index is None or index not in self._held:
+            return
+        self._held.discard(index)
+        fcntl.flock(self._files[index].fileno(), fcntl.LOCK_UN)
+
+
+class TranscodeService:
+    """Пул воркеров, забирающих задачи сжатия из очереди с приоритетами.
+
+    Каждое кодирование ограничено ``threads_per_encode`` потоками libx264,
+    а число одновременных кодирований — ``workers``, поэтому несколько
+    одновременных загрузок больше не занимают все ядра. Лимит общий для всех
+    процессов бота на машине (``MachineSlots``): рабочие процессы супервизора
+    не умножают его на своё число.
+    """
+
+    def __init__(self, workers: int, threads_per_encode: int, slot_dir: str):
+        self.threads_per_encode = max(threads_per_encode, 1)
+        self.workers = workers if workers > 0 else _default_worker_count(
+            self.threads_per_encode
+        )
+        self._slots = MachineSlots(self.workers, slot_dir)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._jobs: dict[str, TranscodeJob] = {}
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+    @property
+    def queue_depth(self) -> int:
+        """Число задач в очереди и в работе."""
+
+        return len(self._jobs)
+
+    @property
+    def waiting(self) -> int:
+        """Число задач, ещё не взятых воркерами."""
+
+        return sum(1 for job in self._jobs.values() if job.state == "queued")
+
+    def _ensure_started(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index), name=f"transcode-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(
+            "Запущен пул сжатия видео: воркеров %s, потоков на кодирование %s",
+            self.workers,
+            self.threads_per_encode,
+        )
+
+    def _notify(self) -> None:
+        # Будим всех ожидающих и заводим новое событие для следующего изменения
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def submit(
+        self,
+        input_file: str,
+        *,
+        priority: int = PRIORITY_NORMAL,
+        owner_id: Optional[int] = None,
+        **options,
+    ) -> TranscodeJob:
+        """Ставит файл в очередь на сжатие; аргументы ``options`` уходят в compress_video."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        job = TranscodeJob(
+            job_id=uuid.uuid4().hex[:12],
+            input_file=str(input_file),
+            priority=priority,
+            sequence=next(self._sequence),
+            owner_id=owner_id,
+            options=options,
+            future=future,
+        )
+
+        target_size_mb = options.get("target_size_mb", 75)
+        if not needs_compression(job.input_file, target_size_mb):
+            # Файл уже в бюджете: не более чем быстрая переупаковка, очередь не нужна
+            job.state = "direct"
+            job.task = asyncio.create_task(compress_video(job.input_file, **options))
+            job.task.add_done_callback(partial(_resolve_from_task, job))
+            return job
+
+        self._ensure_started()
+        self._jobs[job.job_id] = job
+        self._queue.put_nowait((job.priority, job.sequence, job))
+        logger.info(
+            "Задача сжатия %s (%s) поставлена в очередь, позиция %s",
+            job.job_id,
+            job.input_file,
+            self.position(job),
+        )
+        self._notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscodeJob]:
+        return self._jobs.get(job_id)
+
+    def position(self, job: TranscodeJob) -> int:
+        """0 — задача уже кодируется, N — номер в очереди ожидания."""
+
+        if job.state != "queued":
+            return 0
+        ahead = sum(
+            1
+            for other in self._jobs.values()
+            if other.state == "queued"
+            and (other.priority, other.sequence) < (job.priority, job.sequence)
+        )
+        return ahead + 1
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.future.done() or job.state == "cancelled":
+            return False
+        previous_state = job.state
+        job.state = "cancelled"
+        if previous_state == "running" and job.task is not None:
+            # Результат выставит воркер, когда ffmpeg будет остановлен
+            job.task.cancel()
+        else:
+            self._jobs.pop(job_id, None)
+            job.future.set_exception(TranscodeCancelled(job_id))
+            self._notify()
+        logger.info("Задача сжатия %s отменена (%s)", job_id, previous_state)
+        return True
+
+    def _snapshot(self, job: TranscodeJob) -> tuple[int, Optional[int]]:
+        percent = int(job.progress * 100) if job.progress is not None else None
+        return self.position(job), percent
+
+    def _on_progress(self, job: TranscodeJob, fraction: float) -> None:
+        job.progress = min(max(fraction, 0.0), 1.0)
+        self._notify()
+
+    async def wait(
+        self,
+        job: TranscodeJob,
+        on_update: Optional[Callable[[TranscodeJob], Awaitable[None]]] = None,
+    ) -> str:
+        """Ожидает результат, вызывая ``on_update`` при смене места в очереди или процента."""
+
+        last_snapshot = self._snapshot(job)
+        try:
+            while not job.future.done():
+                changed = asyncio.ensure_future(self._changed.wait())
+                try:
+                    await asyncio.wait(
+                        {job.future, changed}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    changed.cancel()
+                if job.future.done():
+                    break
+                snapshot = self._snapshot(job)
+                if on_update and snapshot != last_snapshot:
+                    last_snapshot = snapshot
+                    await on_update(job)
+        except asyncio.CancelledError:
+            self.cancel(job.job_id)
+            raise
+        return job.future.result()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            slot = None
+            try:
+                if job.state == "cancelled":
+                    continue
+                slot = await self._slots.acquire(lambda: job.state == "cancelled")
+                if job.state == "cancelled":
+                    continue
+                job.state = "running"
+                job.started_at = time.monotonic()
+                self._notify()
+                job.task = asyncio.create_task(
+                    compress_video(
+                        job.input_file,
+                        threads=self.threads_per_encode,
+                        queue_depth=self.waiting,
+                        progress_callback=partial(self._on_progress, job),
+                        **job.options,
+                    )
+                )
+                try:
+                    result = await job.task
+                except asyncio.CancelledError:
+                    if not job.future.done():
+                        job.future.set_exception(TranscodeCancelled(job.job_id))
+                    # Отмена самого воркера (остановка сервиса) должна пройти дальше
+                    if job.state != "cancelled" or asyncio.current_task().cancelling():
+                        raise
+                except Exception as exc:
+                    logger.error("Ошибка сжатия в задаче %s: %s", job.job_id, exc)
+                    job.future.set_exception(exc)
+                else:
+                    job.encoded = result.encoded
+                    job.future.set_result(result.path)
+            finally:
+                self._slots.release(slot)
+                self._jobs.pop(job.job_id, None)
+                self._queue.task_done()
+                self._notify()
+
+    async def stop(self) -> None:
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+
+transcode_service = TranscodeService(
+    workers=TRANSCODE_WORKERS,
+    threads_per_encode=TRANSCODE_THREADS_PER_ENCODE,
+    slot_dir=TRANSCODE_SLOT_DIR or os.path.join(tempfile.gettempdir(), "bot-transcode-slots"),
+)
@@ -0,0 +1,235 @@
+"""Приём вебхука с немедленным ответом и обработкой апдейтов в фоне.
+
+Telegram ждёт ответа на запрос вебхука не дольше минуты и при ошибке или
+таймауте доставляет апдейт повторно. Поэтому вебхук только разбирает
+апдейт, кладёт его в очередь своего чата и сразу отвечает 200. Апдейты
+одного чата обрабатываются строго по очереди, разные чаты — параллельно,
+но не более чем ``workers`` одновременно.
+"""
+
+import asyncio
+from collections import deque
+from typing import Hashable, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from aiohttp import web
+
+from config import WEBHOOK_DRAIN_TIMEOUT_SECONDS
+from utils.logger import get_logger
+from utils.metrics import registry
+
+logger = get_logger(__name__)
+
+# Сколько вебхук ждёт места в переполненной очереди, прежде чем вернуть 503
+_ENQUEUE_TIMEOUT_SECONDS = 5.0
+# Кнопки управления уже идущей долгой операцией: их обработчик должен
+# сработать, пока обработчик той же операции ещё ждёт её в очереди чата
+UNORDERED_CALLBACK_PREFIXES = ("transcode_cancel:",)
+
+PENDING_UPDATES = registry.gauge(
+    "bot_webhook_pending_updates", "Принятые, но ещё не обработанные апдейты"
+)
+REJECTED_UPDATES = registry.counter(
+    "bot_webhook_rejected_total", "Апдейты, отклонённые из-за переполнения очереди"
+)
+
+
+def is_control_update(update: Update) -> bool:
+    """Нажатие кнопки из ``UNORDERED_CALLBACK_PREFIXES``.
+
+    Такие апдейты обрабатываются сразу, мимо очереди чата и пула воркеров:
+    иначе отмена сжатия видео ждала бы обработчик, который это сжатие ждёт.
+    """
+
+    callback = update.callback_query
+    return callback is not None and (callback.data or "").startswith(
+        UNORDERED_CALLBACK_PREFIXES
+    )
+
+
+def update_chat_key(update: Update) -> Hashable:
+    """Ключ очереди: чат, иначе пользователь, иначе сам апдейт (без упорядочивания)."""
+
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat_id is not None:
+        return context.chat_id
+    if context.user_id is not None:
+        return ("user", context.user_id)
+    return ("update", update.update_id)
+
+
+class ChatOrderedUpdateQueue:
+    """Очереди апдейтов по чатам и пул воркеров с общим ограничением.
+
+    Чат с ожидающими апдейтами стоит в общей очереди готовых чатов не более
+    одного раза; воркер берёт чат, обрабатывает один его апдейт и, если у
+    чата есть ещё, ставит его в конец очереди готовых. Так апдейты одного
+    пользователя не обгоняют друг друга, а долгий обработчик (сжатие видео)
+    занимает один воркер, не задерживая остальные чаты.
+
+    Если принятых апдейтов больше ``limit``, вебхук ждёт освобождения места
+    и при неудаче отвечает 503 — Telegram повторит доставку позже.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        workers: int,
+        limit: int,
+        drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT_SECONDS,
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.workers = max(workers, 1)
+        self.limit = max(limit, 1)
+        self.drain_timeout = max(drain_timeout, 0)
+        self._chats: dict[Hashable, deque] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._pending = 0
+        self._space = asyncio.Condition()
+        self._worker_tasks: list[asyncio.Task] = []
+        self._in_flight: set[int] = set()
+        self._control_tasks: set[asyncio.Task] = set()
+        self._accepting = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def start(self, app: Optional[web.Application] = None) -> None:
+        if self._worker_tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._accepting = True
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"update-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(
+            "Фоновая обработка апдейтов запущена: воркеров %s, лимит очереди %s",
+            self.workers,
+            self.limit,
+        )
+
+    async def stop(self, app: Optional[web.Application] = None) -> None:
+        """Перестаёт принимать апдейты и даёт воркерам доработать принятые.
+
+        Обработчики, не успевшие за ``drain_timeout`` секунд (например, ждущие
+        сжатия видео), отменяются явно; Telegram эти апдейты уже подтвердил,
+        поэтому они пишутся в журнал.
+        """
+
+        self._accepting = False
+        if self._pending:
+            logger.info(
+                "Ожидаем обработки %s принятых апдейтов (не дольше %.0f с)",
+                self._pending,
+                self.drain_timeout,
+            )
+            try:
+                await asyncio.wait_for(self._wait_drained(), self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Не обработано %s апдейтов к моменту остановки, обработчики отменяются: %s",
+                    self._pending,
+                    self._pending_update_ids(),
+                )
+        tasks = self._worker_tasks + list(self._control_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def _pending_update_ids(self) -> list[int]:
+        update_ids = [update.update_id for queue in self._chats.values() for update in queue]
+        update_ids.extend(self._in_flight)
+        return sorted(update_ids)
+
+    async def _wait_drained(self) -> None:
+        async with self._space:
+            await self._space.wait_for(lambda: self._pending == 0)
+
+    async def put(self, update: Update) -> bool:
+        """Ставит апдейт в очередь его чата; False, если места так и не появилось."""
+
+        if not self._accepting:
+            return False
+        if self._pending >= self.limit:
+            try:
+                async with self._space:
+                    await asyncio.wait_for(
+                        self._space.wait_for(lambda: self._pending < self.limit),
+                        _ENQUEUE_TIMEOUT_SECONDS,
+                    )
+            except asyncio.TimeoutError:
+                REJECTED_UPDATES.inc()
+                logger.warning(
+                    "Очередь апдейтов переполнена (%s), апдейт %s отклонён",
+                    self._pending,
+                    update.update_id,
+                )
+                return False
+
+        self._pending += 1
+        PENDING_UPDATES.set(self._pending)
+        if is_control_update(update):
+            task = asyncio.create_task(self._run(update))
+            self._control_tasks.add(task)
+            task.add_done_callback(self._control_tasks.discard)
+            return True
+
+        key = update_chat_key(update)
+        chat_queue = self._chats.get(key)
+        if chat_queue is None:
+            chat_queue = self._chats[key] = deque()
+            # Чата не было среди ожидающих — он становится готовым к обработке
+            self._ready.put_nowait(key)
+        chat_queue.append(update)
+        return True
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as exc:
+            logger.exception("Ошибка обработки апдейта %s: %s", update.update_id, exc)
+
+    async def _run(self, update: Update) -> None:
+        self._in_flight.add(update.update_id)
+        try:
+            await self._process(update)
+        finally:
+            self._in_flight.discard(update.update_id)
+            self._pending -= 1
+            PENDING_UPDATES.set(self._pending)
+            async with self._space:
+                self._space.notify_all()
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            chat_queue = self._chats[key]
+            update = chat_queue.popleft()
+            try:
+                await self._run(update)
+            finally:
+                if chat_queue:
+                    self._ready.put_nowait(key)
+                else:
+                    self._chats.pop(key, None)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Обработчик POST вебхука: разбирает апдейт и сразу отвечает."""
+
+        try:
+            payload = await request.json(loads=self.bot.session.json_loads)
+            update = Update.model_validate(payload, context={"bot": self.bot})
+        except Exception as exc:
+            # Повторная доставка того же тела не поможет — подтверждаем и пишем в журнал
+            logger.error("Не удалось разобрать апдейт вебхука: %s", exc)
+            return web.json_response({})
+        if not await self.put(update):
+            return web.Response(status=503, headers={"Retry-After": "5"})
+        return web.json_response({})
@@ -1,16 +1,30 @@
 import asyncio
 import os
-import subprocess
+import shutil
+import struct
+from collections import deque
+from dataclasses import dataclass, replace
 from pathlib import Path
 from time import perf_counter
-from typing import Optional
+from typing import Callable, Optional
 
 import ffmpeg
 
+from config import (
+    VIDEO_HLS_SEGMENT_SECONDS,
+    VIDEO_PREVIEW_SECONDS,
+    VIDEO_REMUX_TOLERANCE_PERCENT,
+)
+from utils.cache import cache_manager
 from utils.logger import get_logger
+from utils.storage import video_derivative_paths
 
 logger = get_logger(__name__)
 
+MAX_VIDEO_WIDTH = 1280
+# Дорожки, которые можно переложить в MP4 без перекодирования
+_COPYABLE_AUDIO_CODECS = {"aac", "mp3"}
+
 
 class _FFmpegExecutionError(RuntimeError):
     """Обёртка для ошибок запуска ffmpeg."""
@@ -20,50 +34,171 @@ def _null_sink() -> str:
     return "NUL" if os.name == "nt" else "/dev/null"
 
 
-async def _probe_duration(path: Path) -> Optional[float]:
-    """Возвращает длительность ролика в секундах."""
+@dataclass
+class MediaInfo:
+    """Параметры ролика, важные для выбора способа обработки."""
+
+    size: int
+    duration: Optional[float]
+    format_name: str
+    bit_rate: Optional[int]
+    video_codec: Optional[str]
+    pix_fmt: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    video_bit_rate: Optional[int]
+    audio_codec: Optional[str]
+    faststart: bool
+    fps: Optional[float] = None
+
+    @property
+    def is_mp4(self) -> bool:
+        return "mp4" in self.format_name or "mov" in self.format_name
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "", "N/A") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "", "N/A") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_faststart_mp4(path: Path) -> bool:
+    """Проверяет, что атом moov записан перед mdat (воспроизведение до полной загрузки)."""
 
-    def _probe() -> Optional[float]:
+    try:
+        with path.open("rb") as file_obj:
+            while True:
+                header = file_obj.read(8)
+                if len(header) < 8:
+                    return False
+                size, kind = struct.unpack(">I4s", header)
+                if kind == b"moov":
+                    return True
+                if kind == b"mdat":
+                    return False
+                if size == 1:
+                    size = struct.unpack(">Q", file_obj.read(8))[0]
+                    file_obj.seek(size - 16, os.SEEK_CUR)
+                elif size < 8:
+                    return False
+                else:
+                    file_obj.seek(size - 8, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return False
+
+
+async def _probe_media(path: Path) -> Optional[MediaInfo]:
+    """Возвращает кодеки, формат пикселей, разрешение и битрейты ролика."""
+
+    def _probe() -> Optional[MediaInfo]:
         try:
             info = ffmpeg.probe(str(path))
         except ffmpeg.Error as exc:  # pragma: no cover - ffprobe сообщает stderr
             logger.error(
-                "Не удалось получить длительность %s: %s",
+                "Не удалось получить параметры %s: %s",
                 path,
                 exc.stderr.decode(errors="ignore") if exc.stderr else exc,
             )
             return None
-        duration = info.get("format", {}).get("duration")
-        try:
-            return float(duration) if duration is not None else None
-        except (TypeError, ValueError):
-            logger.error("Некорректная длительность %s: %s", path, duration)
+        except FileNotFoundError:  # pragma: no cover - зависит от окружения
+            logger.error("Исполняемый файл ffprobe не найден")
             return None
 
+        fmt = info.get("format", {})
+        streams = info.get("streams", [])
+        video = next((st for st in streams if st.get("codec_type") == "video"), {})
+        audio = next((st for st in streams if st.get("codec_type") == "audio"), {})
+        format_name = fmt.get("format_name", "") or ""
+        media = MediaInfo(
+            size=path.stat().st_size,
+            duration=_to_float(fmt.get("duration")),
+            format_name=format_name,
+            bit_rate=_to_int(fmt.get("bit_rate")),
+            video_codec=video.get("codec_name"),
+            pix_fmt=video.get("pix_fmt"),
+            width=_to_int(video.get("width")),
+            height=_to_int(video.get("height")),
+            video_bit_rate=_to_int(video.get("bit_rate")),
+            audio_codec=audio.get("codec_name"),
+            faststart=False,
+        )
+        numerator, _, denominator = (video.get("avg_frame_rate") or "").partition("/")
+        fps_num, fps_den = _to_float(numerator), _to_float(denominator or "1")
+        if fps_num and fps_den:
+            media.fps = fps_num / fps_den
+        if media.is_mp4:
+            media.faststart = _is_faststart_mp4(path)
+        if media.duration is None:
+            logger.error("Некорректная длительность %s: %s", path, fmt.get("duration"))
+        return media
+
     return await asyncio.to_thread(_probe)
 
 
-async def _run_ffmpeg_cmd(args: list[str], description: str) -> None:
-    """Запускает ffmpeg с указанными аргументами и логирует результат."""
+ProgressCallback = Callable[[float], None]
 
-    def _execute() -> tuple[float, str, str, int]:
-        start = perf_counter()
-        try:
-            completed = subprocess.run(
-                args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=False,
-            )
-        except FileNotFoundError as exc:  # pragma: no cover - зависит от окружения
-            raise FileNotFoundError("Исполняемый файл ffmpeg не найден") from exc
+# Из stderr храним только хвост: при -loglevel error этого достаточно для диагностики
+_STDERR_TAIL_LINES = 50
+
+
+async def _run_ffmpeg_cmd(
+    args: list[str],
+    description: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> None:
+    """Запускает ffmpeg с указанными аргументами и логирует результат.
+
+    Вывод ``-progress pipe:1`` разбирается построчно по мере кодирования:
+    ``on_progress`` получает уже обработанное время ролика в секундах.
+    При отмене вызывающей задачи процесс ffmpeg принудительно завершается.
+    """
+
+    command = [args[0], "-progress", "pipe:1", "-nostats", *args[1:]]
+    start = perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError as exc:  # pragma: no cover - зависит от окружения
+        raise FileNotFoundError("Исполняемый файл ffmpeg не найден") from exc
+
+    stderr_tail: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
 
-        duration = perf_counter() - start
-        stdout_text = completed.stdout.decode(errors="ignore")
-        stderr_text = completed.stderr.decode(errors="ignore")
-        return duration, stdout_text, stderr_text, completed.returncode
+    async def _read_progress() -> None:
+        async for raw_line in process.stdout:
+            key, _, value = raw_line.decode(errors="ignore").strip().partition("=")
+            # out_time_ms в ffmpeg исторически тоже содержит микросекунды
+            if on_progress and key in ("out_time_us", "out_time_ms"):
+                microseconds = _to_int(value)
+                if microseconds is not None and microseconds >= 0:
+                    on_progress(microseconds / 1_000_000)
 
-    duration, stdout_text, stderr_text, returncode = await asyncio.to_thread(_execute)
+    async def _read_stderr() -> None:
+        async for raw_line in process.stderr:
+            stderr_tail.append(raw_line.decode(errors="ignore").rstrip())
+
+    try:
+        await asyncio.gather(_read_progress(), _read_stderr())
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        logger.info("FFmpeg остановлен по отмене (%s)", description)
+        raise
+
+    duration = perf_counter() - start
+    stderr_text = "\n".join(stderr_tail)
 
     if returncode != 0:
         logger.error(
@@ -76,10 +211,9 @@ async def _run_ffmpeg_cmd(args: list[str], description: str) -> None:
         raise _FFmpegExecutionError(stderr_text or description)
 
     logger.debug(
-        "FFmpeg завершил %s за %.2f с: stdout=%s, stderr=%s",
+        "FFmpeg завершил %s за %.2f с: stderr=%s",
         description,
         duration,
-        stdout_text,
         stderr_text,
     )
 
@@ -91,73 +225,233 @@ def _cleanup_pass_logs(passlog: Path) -> None:
         artifact.unlink(missing_ok=True)
 
 
-async def compress_video(
-    input_file: str,
-    target_size_mb: int = 75,
-    audio_bitrate_kbps: int = 96,
-    preset: str = "slow",
-) -> str:
-    """Сжимает видео до заданного размера (≈target_size_mb) и возвращает итоговый путь."""
+def _can_stream_copy(info: MediaInfo) -> bool:
+    return (
+        info.video_codec == "h264"
+        and info.pix_fmt == "yuv420p"
+        and info.width is not None
+        and info.width <= MAX_VIDEO_WIDTH
+    )
 
-    source_path = Path(input_file)
-    if not source_path.exists():
-        logger.warning("Файл для сжатия не найден: %s", input_file)
-        return input_file
 
-    target_bytes = target_size_mb * 1024 * 1024
-    original_size = source_path.stat().st_size
-    if original_size <= target_bytes:
-        logger.debug(
-            "Файл %s уже меньше или равен целевому размеру (%.2f МБ <= %s МБ), "
-            "сжатие не требуется",
-            input_file,
-            original_size / (1024 * 1024),
-            target_size_mb,
-        )
-        return input_file
+def _fits_copy_budget(info: MediaInfo, target_bytes: int) -> bool:
+    """Видеопоток уже подходит, а перерасход размера не больше допуска."""
+
+    tolerance = 1 + max(VIDEO_REMUX_TOLERANCE_PERCENT, 0) / 100
+    return _can_stream_copy(info) and info.size <= target_bytes * tolerance
+
+
+async def _remux_faststart(
+    source_path: Path, temp_output: Path, info: MediaInfo, audio_bitrate_kbps: int
+) -> bool:
+    """Перекладывает потоки в MP4 с moov в начале файла без перекодирования видео."""
 
+    if info.audio_codec is None or info.audio_codec in _COPYABLE_AUDIO_CODECS:
+        audio_args = ["-c:a", "copy"]
+    else:
+        audio_args = ["-c:a", "aac", "-b:a", f"{audio_bitrate_kbps}k"]
+    args = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(source_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-c:v",
+        "copy",
+        *audio_args,
+        "-movflags",
+        "+faststart",
+        "-f",
+        "mp4",
+        str(temp_output),
+    ]
+    start_time = perf_counter()
+    try:
+        await _run_ffmpeg_cmd(args, f"remux {source_path.name}")
+    except (FileNotFoundError, _FFmpegExecutionError):
+        temp_output.unlink(missing_ok=True)
+        return False
+    except asyncio.CancelledError:
+        temp_output.unlink(missing_ok=True)
+        raise
+    if not temp_output.exists():
+        return False
     logger.info(
-        "Начинаем двухпроходное сжатие %s (%.2f МБ) до ~%s МБ",
-        input_file,
-        original_size / (1024 * 1024),
-        target_size_mb,
+        "Видео %s переупаковано без перекодирования (%.2f МБ) за %.2f с",
+        source_path,
+        temp_output.stat().st_size / (1024 * 1024),
+        perf_counter() - start_time,
     )
+    return True
 
-    duration = await _probe_duration(source_path)
-    if not duration or duration <= 0:
-        logger.warning("Не удалось определить длительность %s. Используем исходный файл", input_file)
-        return input_file
 
-    # Расчёт битрейта
+@dataclass
+class CompressionResult:
+    """Итог сжатия: путь к файлу и признак того, что он получен заново.
+
+    ``encoded`` ложно, если возвращён нетронутый исходник (сжатие не
+    потребовалось или ffmpeg не справился). Путь сам по себе этого не
+    говорит: результат для ``.mp4`` записывается на место исходника.
+    """
+
+    path: str
+    encoded: bool
+
+
+def _replace_source(
+    source_path: Path, temp_output: Path, input_file: str
+) -> CompressionResult:
+    """Ставит результат на место исходника (с расширением .mp4)."""
+
+    final_path = (
+        source_path
+        if source_path.suffix.lower() == ".mp4"
+        else source_path.with_suffix(".mp4")
+    )
+
+    try:
+        source_path.unlink(missing_ok=True)
+        temp_output.replace(final_path)
+        return CompressionResult(str(final_path), encoded=True)
+    except Exception:  # pragma: no cover - защитный блок
+        logger.exception("Не удалось заменить исходный файл %s", input_file)
+        temp_output.unlink(missing_ok=True)
+        return CompressionResult(input_file, encoded=False)
+
+
+@dataclass
+class EncodingPlan:
+    """Выбранный способ кодирования: один проход CRF с потолком или два прохода ABR."""
+
+    mode: str
+    width: int
+    video_bitrate_kbps: int
+    maxrate_kbps: int
+    bufsize_kbps: int
+    preset: str
+    crf: Optional[int] = None
+
+
+# Ступени ширины, на которые опускаемся, если битрейта мало для исходного разрешения
+_RESOLUTION_LADDER = (1280, 960, 854, 640, 480)
+# Бит на пиксель кадра: ниже минимума H.264 заметно «сыпется», выше порога CRF
+# бюджета хватает с запасом и точное попадание в размер двумя проходами не нужно.
+_MIN_BITS_PER_PIXEL = 0.05
+_CRF_BITS_PER_PIXEL = 0.1
+_CRF_VALUE = 23
+_LONG_CLIP_SECONDS = 15 * 60
+_MIN_VIDEO_BITRATE_KBPS = 300
+# Первый проход x264 идёт с упрощёнными настройками и занимает меньшую часть времени
+_FIRST_PASS_SHARE = 0.4
+_FAST_PRESETS = {"ultrafast", "superfast", "veryfast", "faster", "fast", "medium"}
+
+
+def _video_bitrate_budget(
+    target_bytes: int, duration: float, audio_bitrate_kbps: int, input_file: str
+) -> int:
     reserve_ratio = 0.96
     audio_bitrate = max(audio_bitrate_kbps, 32) * 1000
     total_bits_budget = target_bytes * 8 * reserve_ratio
     video_bits = total_bits_budget - audio_bitrate * duration
-    min_video_bitrate_kbps = 300
     if video_bits <= 0:
         logger.warning(
             "Недостаточно бюджета битрейта для %s, используем минимальный уровень",
             input_file,
         )
-        video_bitrate_kbps = min_video_bitrate_kbps
+        return _MIN_VIDEO_BITRATE_KBPS
+    return max(int(video_bits / duration / 1000), _MIN_VIDEO_BITRATE_KBPS)
+
+
+def _bits_per_pixel(bitrate_kbps: int, width: int, aspect: float, fps: float) -> float:
+    height = max(width * aspect, 1)
+    return bitrate_kbps * 1000 / (width * height * fps)
+
+
+def choose_encoding_plan(
+    info: MediaInfo, video_bitrate_kbps: int, preset: str, queue_depth: int = 0
+) -> EncodingPlan:
+    """Подбирает разрешение, режим и preset по длительности, битрейту и загрузке очереди.
+
+    Разрешение понижается по ступеням, пока на пиксель не придётся достаточно
+    бит. Щедрый бюджет кодируется одним проходом CRF с ``maxrate``; тесный —
+    двумя проходами ABR, которые точнее попадают в размер. Когда в очереди
+    ждут другие задачи, длинные ролики тоже идут одним проходом, а медленные
+    preset заменяются на ``medium``.
+    """
+
+    source_width = info.width or MAX_VIDEO_WIDTH
+    aspect = (info.height / info.width) if info.width and info.height else 9 / 16
+    fps = info.fps or 30.0
+    max_width = min(source_width, MAX_VIDEO_WIDTH)
+
+    # Сначала исходная ширина (не больше MAX_VIDEO_WIDTH), затем ступени ниже неё
+    width = max_width
+    for candidate in (max_width, *(c for c in _RESOLUTION_LADDER if c < max_width)):
+        width = candidate
+        if _bits_per_pixel(video_bitrate_kbps, width, aspect, fps) >= _MIN_BITS_PER_PIXEL:
+            break
+    bpp = _bits_per_pixel(video_bitrate_kbps, width, aspect, fps)
+
+    busy = queue_depth > 0
+    long_clip = (info.duration or 0) >= _LONG_CLIP_SECONDS
+    if bpp >= _CRF_BITS_PER_PIXEL or (busy and long_clip):
+        mode = "crf"
     else:
-        video_bitrate_kbps = max(int(video_bits / duration / 1000), min_video_bitrate_kbps)
+        mode = "abr2"
 
-    maxrate_kbps = int(video_bitrate_kbps * 1.45)
-    bufsize_kbps = int(video_bitrate_kbps * 3)
+    if busy and preset not in _FAST_PRESETS:
+        preset = "medium"
 
-    logger.info(
-        "Битрейты для %s: видео ~%s kbps, макс %s kbps, буфер %s kbps, аудио %s kbps",
-        input_file,
-        video_bitrate_kbps,
-        maxrate_kbps,
-        bufsize_kbps,
-        audio_bitrate_kbps,
+    if mode == "crf":
+        maxrate_kbps = video_bitrate_kbps
+        bufsize_kbps = video_bitrate_kbps * 2
+    else:
+        maxrate_kbps = int(video_bitrate_kbps * 1.45)
+        bufsize_kbps = video_bitrate_kbps * 3
+
+    return EncodingPlan(
+        mode=mode,
+        width=width,
+        video_bitrate_kbps=video_bitrate_kbps,
+        maxrate_kbps=maxrate_kbps,
+        bufsize_kbps=bufsize_kbps,
+        preset=preset,
+        crf=_CRF_VALUE if mode == "crf" else None,
     )
 
-    temp_output = source_path.with_name(f"{source_path.stem}_compressed.mp4")
+
+async def _encode_with_plan(
+    source_path: Path,
+    temp_output: Path,
+    plan: EncodingPlan,
+    audio_bitrate_kbps: int,
+    threads: Optional[int],
+    duration: float,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> bool:
+    """Кодирует по плану в ``temp_output``; при ошибке ffmpeg возвращает False.
+
+    ``progress_callback`` получает долю выполнения 0..1 с учётом обоих проходов.
+    """
+
+    def _stage(offset: float, weight: float) -> Optional[ProgressCallback]:
+        if progress_callback is None:
+            return None
+        return lambda seconds: progress_callback(
+            offset + weight * min(seconds / duration, 1.0)
+        )
+
     passlog = source_path.with_name(f"{source_path.stem}_passlog")
-    null_output = _null_sink()
+    if plan.mode == "crf":
+        rate_args = ["-crf", str(plan.crf)]
+    else:
+        rate_args = ["-b:v", f"{plan.video_bitrate_kbps}k"]
 
     base_args = [
         "ffmpeg",
@@ -169,57 +463,213 @@ async def compress_video(
         str(source_path),
         "-c:v",
         "libx264",
-        "-b:v",
-        f"{video_bitrate_kbps}k",
+        *rate_args,
         "-maxrate",
-        f"{maxrate_kbps}k",
+        f"{plan.maxrate_kbps}k",
         "-bufsize",
-        f"{bufsize_kbps}k",
+        f"{plan.bufsize_kbps}k",
         "-preset",
-        preset,
+        plan.preset,
         "-vf",
-        "scale='min(1280,iw)':-2",
+        f"scale='min({plan.width},iw)':-2",
         "-pix_fmt",
         "yuv420p",
         "-movflags",
         "+faststart",
-        "-passlogfile",
-        str(passlog),
     ]
-
-    start_time = perf_counter()
+    if threads:
+        base_args += ["-threads", str(threads)]
+    audio_args = ["-c:a", "aac", "-b:a", f"{audio_bitrate_kbps}k"]
 
     try:
-        logger.info("FFmpeg pass 1 для %s", input_file)
-        pass1_args = base_args + ["-an", "-pass", "1", "-f", "mp4", null_output]
-        await _run_ffmpeg_cmd(pass1_args, f"pass1 {source_path.name}")
-
-        logger.info("FFmpeg pass 2 для %s", input_file)
-        pass2_args = base_args + [
-            "-c:a",
-            "aac",
-            "-b:a",
-            f"{audio_bitrate_kbps}k",
-            "-pass",
-            "2",
-            str(temp_output),
-        ]
-        await _run_ffmpeg_cmd(pass2_args, f"pass2 {source_path.name}")
+        if plan.mode == "crf":
+            logger.info("FFmpeg CRF %s для %s", plan.crf, source_path)
+            await _run_ffmpeg_cmd(
+                base_args + audio_args + [str(temp_output)],
+                f"crf {source_path.name}",
+                _stage(0.0, 1.0),
+            )
+        else:
+            pass_args = base_args + ["-passlogfile", str(passlog)]
+            logger.info("FFmpeg pass 1 для %s", source_path)
+            await _run_ffmpeg_cmd(
+                pass_args + ["-an", "-pass", "1", "-f", "mp4", _null_sink()],
+                f"pass1 {source_path.name}",
+                _stage(0.0, _FIRST_PASS_SHARE),
+            )
+            logger.info("FFmpeg pass 2 для %s", source_path)
+            await _run_ffmpeg_cmd(
+                pass_args + audio_args + ["-pass", "2", str(temp_output)],
+                f"pass2 {source_path.name}",
+                _stage(_FIRST_PASS_SHARE, 1 - _FIRST_PASS_SHARE),
+            )
     except FileNotFoundError:
         logger.error(
             "Исполняемый файл ffmpeg не найден. Проверьте, что он установлен в системе."
         )
         temp_output.unlink(missing_ok=True)
-        return input_file
+        return False
     except _FFmpegExecutionError:
         temp_output.unlink(missing_ok=True)
-        return input_file
+        return False
+    except asyncio.CancelledError:
+        temp_output.unlink(missing_ok=True)
+        raise
     finally:
         _cleanup_pass_logs(passlog)
 
     if not temp_output.exists():
-        logger.warning("FFmpeg не создал выходной файл для %s", input_file)
-        return input_file
+        logger.warning("FFmpeg не создал выходной файл для %s", source_path)
+        return False
+    return True
+
+
+def needs_compression(input_file: str, target_size_mb: int = 75) -> bool:
+    """Проверяет, превышает ли файл целевой размер (отсутствующий файл сжимать нечего)."""
+
+    try:
+        return Path(input_file).stat().st_size > target_size_mb * 1024 * 1024
+    except OSError:
+        return False
+
+
+async def compress_video(
+    input_file: str,
+    target_size_mb: int = 75,
+    audio_bitrate_kbps: int = 96,
+    preset: str = "slow",
+    threads: Optional[int] = None,
+    queue_depth: int = 0,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> CompressionResult:
+    """Сжимает видео до заданного размера (≈target_size_mb).
+
+    Возвращает путь к итоговому файлу и признак ``encoded`` — был ли файл
+    перекодирован или переупакован, а не отдан как есть.
+
+    ``queue_depth`` — число задач, ожидающих сжатия; под нагрузкой выбирается
+    более быстрый способ кодирования. ``progress_callback`` получает долю
+    выполнения 0..1 по ходу перекодирования.
+    """
+
+    # Префикс без расширения закрепляет исходник, промежуточный *_compressed.mp4
+    # и журналы проходов, чтобы очистка кеша не удалила их посреди сжатия.
+    with cache_manager.pin(Path(input_file).with_suffix("")):
+        return await _compress_video(
+            input_file,
+            target_size_mb,
+            audio_bitrate_kbps,
+            preset,
+            threads,
+            queue_depth,
+            progress_callback,
+        )
+
+
+async def _compress_video(
+    input_file: str,
+    target_size_mb: int,
+    audio_bitrate_kbps: int,
+    preset: str,
+    threads: Optional[int],
+    queue_depth: int,
+    progress_callback: Optional[ProgressCallback],
+) -> CompressionResult:
+    source_path = Path(input_file)
+    if not source_path.exists():
+        logger.warning("Файл для сжатия не найден: %s", input_file)
+        return CompressionResult(input_file, encoded=False)
+
+    target_bytes = target_size_mb * 1024 * 1024
+    original_size = source_path.stat().st_size
+    temp_output = source_path.with_name(f"{source_path.stem}_compressed.mp4")
+    info = await _probe_media(source_path)
+
+    if original_size <= target_bytes:
+        if (
+            info
+            and _can_stream_copy(info)
+            and not (info.is_mp4 and info.faststart)
+            and await _remux_faststart(source_path, temp_output, info, audio_bitrate_kbps)
+        ):
+            return _replace_source(source_path, temp_output, input_file)
+        logger.debug(
+            "Файл %s уже меньше или равен целевому размеру (%.2f МБ <= %s МБ), "
+            "сжатие не требуется",
+            input_file,
+            original_size / (1024 * 1024),
+            target_size_mb,
+        )
+        return CompressionResult(input_file, encoded=False)
+
+    if info and _fits_copy_budget(info, target_bytes):
+        logger.info(
+            "Видео %s (%s/%s, %sx%s) укладывается в бюджет с допуском, "
+            "выполняем переупаковку без перекодирования",
+            input_file,
+            info.video_codec,
+            info.pix_fmt,
+            info.width,
+            info.height,
+        )
+        if await _remux_faststart(source_path, temp_output, info, audio_bitrate_kbps):
+            return _replace_source(source_path, temp_output, input_file)
+
+    duration = info.duration if info else None
+    if not duration or duration <= 0:
+        logger.warning("Не удалось определить длительность %s. Используем исходный файл", input_file)
+        return CompressionResult(input_file, encoded=False)
+
+    video_bitrate_kbps = _video_bitrate_budget(
+        target_bytes, duration, audio_bitrate_kbps, input_file
+    )
+    plan = choose_encoding_plan(info, video_bitrate_kbps, preset, queue_depth)
+
+    logger.info(
+        "Сжатие %s (%.2f МБ, %.0f с) до ~%s МБ: %s, ширина до %s, видео ~%s kbps "
+        "(макс %s kbps), аудио %s kbps, preset %s, очередь %s",
+        input_file,
+        original_size / (1024 * 1024),
+        duration,
+        target_size_mb,
+        "один проход CRF" if plan.mode == "crf" else "два прохода ABR",
+        plan.width,
+        plan.video_bitrate_kbps,
+        plan.maxrate_kbps,
+        audio_bitrate_kbps,
+        plan.preset,
+        queue_depth,
+    )
+
+    start_time = perf_counter()
+    if not await _encode_with_plan(
+        source_path,
+        temp_output,
+        plan,
+        audio_bitrate_kbps,
+        threads,
+        duration,
+        progress_callback,
+    ):
+        return CompressionResult(input_file, encoded=False)
+
+    if plan.mode == "crf" and temp_output.stat().st_size > target_bytes:
+        logger.info(
+            "Однопроходное сжатие %s превысило бюджет (%.2f МБ), повторяем в два прохода",
+            input_file,
+            temp_output.stat().st_size / (1024 * 1024),
+        )
+        plan = replace(plan, mode="abr2", crf=None)
+        if not await _encode_with_plan(
+            source_path,
+            temp_output,
+            plan,
+            audio_bitrate_kbps,
+            threads,
+            duration,
+            progress_callback,
+        ):
+            return CompressionResult(input_file, encoded=False)
 
     final_size_mb = temp_output.stat().st_size / (1024 * 1024)
     logger.info(
@@ -229,17 +679,159 @@ async def compress_video(
         perf_counter() - start_time,
     )
 
-    final_path = (
-        source_path
-        if source_path.suffix.lower() == ".mp4"
-        else source_path.with_suffix(".mp4")
+    return _replace_source(source_path, temp_output, input_file)
+
+
+_POSTER_WIDTH = 640
+_PREVIEW_WIDTH = 480
+_PREVIEW_MAXRATE_KBPS = 400
+# Постер и превью — фоновая работа, не отнимаем ядра у основного сжатия
+_DERIVATIVE_THREADS = 2
+
+
+async def create_video_derivatives(video_file: str) -> dict[str, Path]:
+    """Создаёт рядом с видео постер JPEG, короткое превью и (по настройке) HLS-пакет.
+
+    Кадр для постера и начало превью берутся на 10% длительности, чтобы
+    не попасть на чёрный первый кадр. Возвращает пути созданных файлов;
+    ошибки ffmpeg логируются и не прерывают работу вызывающего кода.
+    """
+
+    video_path = Path(video_file)
+    targets = video_derivative_paths(video_path)
+    info = await _probe_media(video_path)
+    duration = info.duration if info and info.duration else 0.0
+    offset = f"{duration * 0.1:.2f}"
+    scale_filter = "scale='min({width},iw)':-2"
+    base_args = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+
+    jobs = {
+        "poster": base_args
+        + [
+            "-ss",
+            offset,
+            "-i",
+            str(video_path),
+            "-frames:v",
+            "1",
+            "-vf",
+            scale_filter.format(width=_POSTER_WIDTH),
+            "-q:v",
+            "4",
+            str(targets["poster"]),
+        ]
+    }
+    if VIDEO_PREVIEW_SECONDS > 0:
+        jobs["preview"] = base_args + [
+            "-ss",
+            offset,
+            "-t",
+            str(VIDEO_PREVIEW_SECONDS),
+            "-i",
+            str(video_path),
+            "-an",
+            "-vf",
+            scale_filter.format(width=_PREVIEW_WIDTH),
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-crf",
+            "32",
+            "-maxrate",
+            f"{_PREVIEW_MAXRATE_KBPS}k",
+            "-bufsize",
+            f"{_PREVIEW_MAXRATE_KBPS * 2}k",
+            "-pix_fmt",
+            "yuv420p",
+            "-threads",
+            str(_DERIVATIVE_THREADS),
+            "-movflags",
+            "+faststart",
+            str(targets["preview"]),
+        ]
+
+    created: dict[str, Path] = {}
+    if VIDEO_HLS_SEGMENT_SECONDS > 0:
+        playlist = await package_hls(video_path, targets["hls"])
+        if playlist is not None:
+            created["hls"] = playlist
+    for kind, args in jobs.items():
+        try:
+            await _run_ffmpeg_cmd(args, f"{kind} {video_path.name}")
+        except (FileNotFoundError, _FFmpegExecutionError) as exc:
+            logger.warning("Не удалось создать %s для %s: %s", kind, video_path, exc)
+            targets[kind].unlink(missing_ok=True)
+            continue
+        except asyncio.CancelledError:
+            targets[kind].unlink(missing_ok=True)
+            raise
+        if targets[kind].exists():
+            created[kind] = targets[kind]
+
+    logger.debug(
+        "Производные файлы видео %s: %s",
+        video_path,
+        ", ".join(created) or "нет",
     )
+    return created
 
+
+async def package_hls(video_path: Path, playlist: Path) -> Optional[Path]:
+    """Нарезает видео в HLS (fMP4-сегменты и плейлист VOD) без перекодирования.
+
+    Пакет собирается во временном каталоге и переименовывается целиком,
+    поэтому по ссылке никогда не отдаётся недописанный плейлист.
+    """
+
+    package_dir = playlist.parent
+    temp_dir = package_dir.with_name(package_dir.name + ".tmp")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+    args = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(video_path),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-c",
+        "copy",
+        "-f",
+        "hls",
+        "-hls_time",
+        str(VIDEO_HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type",
+        "vod",
+        "-hls_segment_type",
+        "fmp4",
+        "-hls_flags",
+        "independent_segments",
+        "-hls_fmp4_init_filename",
+        "init.mp4",
+        "-hls_segment_filename",
+        str(temp_dir / "seg_%05d.m4s"),
+        str(temp_dir / playlist.name),
+    ]
     try:
-        source_path.unlink(missing_ok=True)
-        temp_output.replace(final_path)
-        return str(final_path)
-    except Exception:  # pragma: no cover - защитный блок
-        logger.exception("Не удалось заменить исходный файл %s", input_file)
-        temp_output.unlink(missing_ok=True)
-        return input_file
+        await _run_ffmpeg_cmd(args, f"hls {video_path.name}")
+        shutil.rmtree(package_dir, ignore_errors=True)
+        os.replace(temp_dir, package_dir)
+    except (FileNotFoundError, _FFmpegExecutionError, OSError) as exc:
+        logger.warning("Не удалось подготовить HLS для %s: %s", video_path, exc)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None
+    except asyncio.CancelledError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    logger.info(
+        "HLS для %s готов: %s сегментов",
+        video_path,
+        sum(1 for _ in package_dir.glob("seg_*.m4s")),
+    )
+    return playlist